@@ -0,0 +1,27 @@
+"""index token denylist exp
+
+Revision ID: 3e9a51c7d2f4
+Revises: c41a7e2d9b63
+Create Date: 2026-10-19 16:02:47.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9a51c7d2f4'
+down_revision: Union[str, None] = 'c41a7e2d9b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_token_denylist_exp'), 'token_denylist', ['exp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_token_denylist_exp'), table_name='token_denylist')
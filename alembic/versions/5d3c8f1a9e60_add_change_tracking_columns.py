@@ -0,0 +1,55 @@
+"""add change tracking columns
+
+Revision ID: 5d3c8f1a9e60
+Revises: 8b2f6d0e4a17
+Create Date: 2026-10-19 18:12:44.530117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d3c8f1a9e60'
+down_revision: Union[str, None] = '8b2f6d0e4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRECISE_DATETIME = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Naive UTC like models.types.utcnow; MySQL's CURRENT_TIMESTAMP is in the
+    # session time zone, SQLite's is already UTC
+    now = 'UTC_TIMESTAMP(6)' if op.get_context().dialect.name == 'mysql' else 'CURRENT_TIMESTAMP'
+    for table in ('categories', 'incomes', 'expenses'):
+        op.add_column(table, sa.Column('updated_at', PRECISE_DATETIME, nullable=True))
+        op.add_column(table, sa.Column('deleted_at', PRECISE_DATETIME, nullable=True))
+        op.execute(f'UPDATE {table} SET updated_at = {now}')
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=PRECISE_DATETIME, nullable=False)
+        op.create_index(f'ix_{table}_user_id_updated_at', table, ['user_id', 'updated_at'], unique=False)
+
+    for table in ('incomes', 'expenses'):
+        op.drop_index(f'ix_{table}_user_id_date', table_name=table)
+        op.create_index(f'ix_{table}_user_id_date', table, ['user_id', 'date', 'amount', 'deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('incomes', 'expenses'):
+        op.drop_index(f'ix_{table}_user_id_date', table_name=table)
+        op.create_index(f'ix_{table}_user_id_date', table, ['user_id', 'date', 'amount'], unique=False)
+        op.execute(f'DELETE FROM {table} WHERE deleted_at IS NOT NULL')
+    # Deleted categories that rows still point at stay, as live ones
+    op.execute('DELETE FROM categories WHERE deleted_at IS NOT NULL AND id NOT IN '
+               '(SELECT category_id FROM incomes UNION SELECT category_id FROM expenses)')
+
+    for table in ('categories', 'incomes', 'expenses'):
+        op.drop_index(f'ix_{table}_user_id_updated_at', table_name=table)
+        op.drop_column(table, 'deleted_at')
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,34 @@
+"""add composite ledger indexes
+
+Revision ID: 7fd849aff5b4
+Revises: 1b45f0f2584b
+Create Date: 2026-10-19 13:40:12.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7fd849aff5b4'
+down_revision: Union[str, None] = '1b45f0f2584b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('incomes', 'expenses'):
+        op.create_index(f'ix_{table}_user_id_date', table, ['user_id', 'date', 'amount'], unique=False)
+        op.create_index(f'ix_{table}_user_id_category_id_date', table, ['user_id', 'category_id', 'date'], unique=False)
+        # The composite indexes lead with user_id, so they also back the foreign key
+        op.drop_index(f'ix_{table}_user_id', table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('incomes', 'expenses'):
+        op.create_index(f'ix_{table}_user_id', table, ['user_id'], unique=False)
+        op.drop_index(f'ix_{table}_user_id_category_id_date', table_name=table)
+        op.drop_index(f'ix_{table}_user_id_date', table_name=table)
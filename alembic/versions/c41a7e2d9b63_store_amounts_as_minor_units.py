@@ -0,0 +1,43 @@
+"""store amounts as minor units
+
+Revision ID: c41a7e2d9b63
+Revises: 7fd849aff5b4
+Create Date: 2026-10-19 14:05:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e2d9b63'
+down_revision: Union[str, None] = '7fd849aff5b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Number of decimal places kept in minor units (see src/models/types.py)
+CURRENCY_SCALE = 2
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('incomes', 'expenses'):
+        op.alter_column(table, 'amount',
+                   existing_type=sa.Integer(),
+                   type_=sa.BigInteger(),
+                   existing_nullable=False)
+        op.execute(f'UPDATE {table} SET amount = amount * {10 ** CURRENCY_SCALE}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Integer division drops the cents: DIV on MySQL, / of two integers elsewhere
+    divide = 'DIV' if op.get_context().dialect.name == 'mysql' else '/'
+    for table in ('incomes', 'expenses'):
+        op.execute(f'UPDATE {table} SET amount = amount {divide} {10 ** CURRENCY_SCALE}')
+        op.alter_column(table, 'amount',
+                   existing_type=sa.BigInteger(),
+                   type_=sa.Integer(),
+                   existing_nullable=False)
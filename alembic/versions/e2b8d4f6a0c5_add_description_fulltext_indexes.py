@@ -0,0 +1,32 @@
+"""add description fulltext indexes
+
+Revision ID: e2b8d4f6a0c5
+Revises: a7c4e9b2d1f3
+Create Date: 2026-10-19 21:26:41.302915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8d4f6a0c5'
+down_revision: Union[str, None] = 'a7c4e9b2d1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FULLTEXT is MySQL only, SQLite searches through the FTS5 table instead
+    if op.get_context().dialect.name == 'mysql':
+        op.create_index('ix_incomes_description_fulltext', 'incomes', ['description'], unique=False, mysql_prefix='FULLTEXT')
+        op.create_index('ix_expenses_description_fulltext', 'expenses', ['description'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == 'mysql':
+        op.drop_index('ix_expenses_description_fulltext', table_name='expenses')
+        op.drop_index('ix_incomes_description_fulltext', table_name='incomes')
@@ -0,0 +1,26 @@
+import os
+
+# The application settings are required at import time; provide harmless
+# defaults so the benchmarks and the data generator run without a .env file.
+for name, value in {
+    "DATABASE_URL": "sqlite:///./bench.db",
+    "ASYNC_DATABASE_URL": "sqlite+aiosqlite:///./bench.db",
+    "JWT_SECRET": "benchmark-secret",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    "REFRESH_TOKEN_EXPIRE_DAYS": "7",
+    "GEMINI_API_KEY": "",
+    "REDIS_URL": "",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+    "MAIL_PORT": "25",
+    "MAIL_SERVER": "localhost",
+    "MAIL_STARTTLS": "false",
+    "MAIL_SSL_TLS": "false",
+    "USE_CREDENTIALS": "false",
+    "VALIDATE_CERTS": "false",
+    # Load tests log in from a single client address
+    "RATE_LIMIT_ENABLED": "false",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,59 @@
+"""Measures JWT verifications per second for each token backend.
+
+Run from the repository root:
+
+    poetry run python -m benchmarks.bench_jwt
+
+Rows are the HS backends for --algorithm, then RS256 and EdDSA. `cold`
+verifies a different token every time (the LRU never hits), `cached`
+repeats one token the way a client reuses its bearer token between requests.
+"""
+import argparse
+import time
+import timeit
+
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from src.services.token_services import BACKENDS, AsymmetricBackend, TokenService
+
+SECRET = "benchmark-secret"
+
+
+def rate(func, number: int) -> float:
+    return number / timeit.timeit(func, number=number)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithm", default="HS256")
+    parser.add_argument("--number", type=int, default=20_000)
+    args = parser.parse_args()
+
+    claims = {"sub": "benchmark", "scopes": [], "iat": int(time.time()), "exp": int(time.time()) + 3600,
+              "token_type": "access", "jti": "2f1c1f5e-3a52-4a4e-9d0a-6d3c2f1b9e77"}
+    factories = {name: lambda backend_class=backend_class: backend_class(SECRET, args.algorithm)
+                 for name, backend_class in BACKENDS.items()}
+    factories["RS256"] = lambda: AsymmetricBackend(
+        [rsa.generate_private_key(public_exponent=65537, key_size=2048)], "RS256"
+    )
+    factories["EdDSA"] = lambda: AsymmetricBackend([ed25519.Ed25519PrivateKey.generate()], "EdDSA")
+
+    for name, factory in factories.items():
+        try:
+            backend = factory()
+        except ImportError:
+            print(f"{name:<6} not installed")
+            continue
+
+        tokens = [backend.encode({**claims, "jti": str(i)}) for i in range(args.number)]
+        encode_rate = rate(lambda: backend.encode(claims), args.number)
+        cold = iter(tokens)
+        cold_rate = rate(lambda: backend.decode(next(cold)), args.number)
+        service = TokenService(backend)
+        cached_rate = rate(lambda: service.decode(tokens[0]), args.number)
+        print(f"{name:<6} encode={encode_rate:>10,.0f}/s  verify cold={cold_rate:>10,.0f}/s  "
+              f"cached={cached_rate:>10,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Measures the cost of the metrics subsystem.
+
+Run from the repository root with the application environment loaded:
+
+    poetry run python -m benchmarks.bench_metrics
+"""
+import asyncio
+import time
+import timeit
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.metrics import Counter, Histogram
+from src.middleware import MetricsMiddleware
+
+REQUESTS = 2000
+
+
+def bench_primitives():
+    counter = Counter("bench_total", "Bench.", ("route",))
+    histogram = Histogram("bench_seconds", "Bench.", ("route",))
+    runs = 1_000_000
+    inc_time = timeit.timeit(lambda: counter.inc("/incomes/"), number=runs)
+    observe_time = timeit.timeit(lambda: histogram.observe(0.0123, "/incomes/"), number=runs)
+    print(f"Counter.inc        {inc_time / runs * 1e9:8.1f} ns/op")
+    print(f"Histogram.observe  {observe_time / runs * 1e9:8.1f} ns/op")
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+async def time_requests(app: FastAPI) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(100):  # warm up
+            await client.get(f"/items/{i}")
+        start = time.perf_counter()
+        for i in range(REQUESTS):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter() - start) / REQUESTS
+
+
+async def bench_middleware():
+    baseline = await time_requests(build_app(with_metrics=False))
+    instrumented = await time_requests(build_app(with_metrics=True))
+    print(f"request without metrics  {baseline * 1e6:8.1f} us")
+    print(f"request with metrics     {instrumented * 1e6:8.1f} us")
+    print(f"overhead                 {(instrumented - baseline) * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    bench_primitives()
+    asyncio.run(bench_middleware())
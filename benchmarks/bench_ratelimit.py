@@ -0,0 +1,81 @@
+"""Measures the cost of rate limiting.
+
+Run from the repository root with the application environment loaded:
+
+    poetry run python -m benchmarks.bench_ratelimit
+    poetry run python -m benchmarks.bench_ratelimit --redis-url redis://localhost:6379
+
+Clients are spread over many IPs with a budget they never exhaust, so every
+request pays for a full bucket update and none is rejected.
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+
+from src.config.settings import settings
+from src.ratelimit import MemoryBackend, Rate, RedisBackend, rate_limiter
+
+REQUESTS = 2000
+RATE = Rate.parse("1000000/minute")
+
+
+async def bench_backend(name: str, backend, keys: int = 10_000, number: int = 50_000):
+    start = time.perf_counter()
+    for i in range(number):
+        await backend.acquire(f"ratelimit:bench:ip:10.0.{i % keys // 256}.{i % 256}", RATE)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} acquire {elapsed / number * 1e6:8.1f} us/op  {number / elapsed:>10,.0f} ops/s")
+
+
+def build_app(with_limit: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login(request: Request):
+        if with_limit:
+            await rate_limiter.hit("bench", request, "benchmark-user")
+        return {"ok": True}
+
+    return app
+
+
+async def time_requests(app: FastAPI) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(100):  # warm up
+            await client.post("/login")
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            await client.post("/login")
+        return (time.perf_counter() - start) / REQUESTS
+
+
+async def bench_requests():
+    settings.RATE_LIMIT_ENABLED = True
+    settings.RATE_LIMITS = {**settings.RATE_LIMITS, "bench": "1000000/minute"}
+    baseline = await time_requests(build_app(with_limit=False))
+    limited = await time_requests(build_app(with_limit=True))
+    print(f"request without limit  {baseline * 1e6:8.1f} us")
+    print(f"request with limit     {limited * 1e6:8.1f} us ({rate_limiter.backend.__class__.__name__})")
+    print(f"overhead               {(limited - baseline) * 1e6:8.1f} us/request")
+
+
+async def main(args):
+    await bench_backend("memory", MemoryBackend())
+    if args.redis_url:
+        from redis import asyncio as aioredis
+
+        redis = aioredis.from_url(args.redis_url)
+        await bench_backend("redis", RedisBackend(redis, MemoryBackend()), number=5_000)
+        settings.REDIS_URL = args.redis_url
+    else:
+        settings.RATE_LIMIT_BACKEND = "memory"
+    await bench_requests()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", help="also measure the Redis backend")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""Measures list serialization: how FastAPI's default path and the cache's
+old JsonCoder compare with TypeAdapters, ORJSONResponse and ORJSONCoder, and
+with list routes returning the adapter's JSON as a Response (json_response).
+
+Run from the repository root:
+
+    poetry run python -m benchmarks.bench_serialization --rows 100
+
+`miss` is the work after the query on a cache miss: validating the rows,
+encoding them for the cache and rendering the response body. `hit` decodes
+the cached bytes, validates them and renders the response. `render` is
+FastAPI's serialize_response for a route with a response_model, including
+the dump of returned models back to dicts (_prepare_response_content).
+"""
+import argparse
+import datetime
+import timeit
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import _prepare_response_content
+from fastapi.utils import create_model_field
+from fastapi_cache.coder import JsonCoder
+
+from src.cache import ORJSONCoder
+from src.fields import json_response
+from src.models.incomes_model import IncomeModel
+from src.schemas.history_schema import HistoryOut, HistoryOutList
+from src.schemas.incomes_schema import IncomeOut, IncomeOutList
+
+RESPONSE_FIELD = create_model_field("Response_get_incomes", list[IncomeOut], mode="serialization")
+
+
+def make_rows(count: int) -> list[IncomeModel]:
+    start = datetime.datetime(2025, 1, 1, 9, 30)
+    return [
+        IncomeModel(
+            id=i, amount=Decimal(f"{1000 + i}.{i % 100:02d}"), description=f"income {i}",
+            date=start + datetime.timedelta(hours=i), category_id=1, user_id=1,
+        )
+        for i in range(count)
+    ]
+
+
+def render(response_class, value) -> bytes:
+    # What FastAPI does with a return value when the route has a response_model
+    value = _prepare_response_content(value, exclude_unset=False)
+    validated, errors = RESPONSE_FIELD.validate(value, {}, loc=("response",))
+    assert not errors
+    return response_class(RESPONSE_FIELD.serialize(validated)).body
+
+
+def history_rows(rows: list[IncomeModel]) -> list[dict]:
+    return [
+        {"type": "income", "amount": row.amount, "description": row.description, "date": row.date,
+         "category": "salary"}
+        for row in rows
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--number", type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    models = IncomeOutList.validate_python(rows)
+    old_cached = JsonCoder.encode(rows)
+    new_cached = ORJSONCoder.encode(models)
+    raw_cached = ORJSONCoder.encode(json_response(IncomeOutList, rows))
+
+    cases = {
+        "validate per row": lambda: [IncomeOut.model_validate(row) for row in rows],
+        "validate TypeAdapter": lambda: IncomeOutList.validate_python(rows),
+        "history per row": lambda: [HistoryOut(**row) for row in history_rows(rows)],
+        "history TypeAdapter": lambda: HistoryOutList.validate_python(history_rows(rows)),
+        "render JSONResponse": lambda: render(JSONResponse, models),
+        "render ORJSONResponse": lambda: render(ORJSONResponse, models),
+        "cache encode JsonCoder": lambda: JsonCoder.encode(rows),
+        "cache encode ORJSONCoder": lambda: ORJSONCoder.encode(models),
+        "miss before": lambda: (JsonCoder.encode(rows), render(JSONResponse, rows)),
+        "miss response_model": lambda: (
+            ORJSONCoder.encode(models := IncomeOutList.validate_python(rows)), render(ORJSONResponse, models)
+        ),
+        "miss json_response": lambda: ORJSONCoder.encode(json_response(IncomeOutList, rows)),
+        "hit before": lambda: render(JSONResponse, JsonCoder.decode(old_cached)),
+        "hit response_model": lambda: render(ORJSONResponse, ORJSONCoder.decode(new_cached)),
+        "hit json_response": lambda: ORJSONCoder.decode(raw_cached).body,
+    }
+    print(f"{args.rows} rows, microseconds per call")
+    for name, func in cases.items():
+        elapsed = timeit.timeit(func, number=args.number)
+        print(f"{name:<26} {elapsed / args.number * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measures cold start: import time of the app and time to first request.
+
+Every run is a fresh interpreter, so module caches and connection pools start
+empty the way they do on a new autoscaled instance. Run from the repository
+root:
+
+    poetry run python -m benchmarks.bench_startup --runs 10
+
+Use `python -X importtime -c "import src.main"` to see which imports dominate.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ("import", "startup", "first_request", "first_db_request")
+
+
+def child():
+    start = time.perf_counter()
+    from src.main import app
+    timings = {"import": time.perf_counter() - start}
+
+    from httpx import ASGITransport, AsyncClient
+
+    async def serve():
+        phase_start = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings["startup"] = time.perf_counter() - phase_start
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                phase_start = time.perf_counter()
+                await client.get("/")
+                timings["first_request"] = time.perf_counter() - phase_start
+
+                # Unknown user: one query, no bcrypt
+                phase_start = time.perf_counter()
+                response = await client.post("/auth/login", data={"username": "nobody", "password": "x"})
+                timings["first_db_request"] = time.perf_counter() - phase_start
+                assert response.status_code in (401, 404), response.text
+
+    asyncio.run(serve())
+    print(json.dumps(timings))
+
+
+def create_schema():
+    import benchmarks  # noqa: F401  (default settings)
+    from sqlalchemy import create_engine
+    from src.config.database import base
+    from src.config.settings import settings
+    import src.models  # noqa: F401
+
+    engine = create_engine(settings.DATABASE_URL)
+    base.metadata.create_all(engine)
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    create_schema()
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "0"}
+    samples = {phase: [] for phase in PHASES}
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+            check=True, capture_output=True, text=True, env=env,
+        ).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        for phase in PHASES:
+            samples[phase].append(timings[phase])
+
+    for phase in PHASES:
+        values = samples[phase]
+        print(f"{phase:<18} median={statistics.median(values) * 1000:8.1f}ms "
+              f"min={min(values) * 1000:8.1f}ms max={max(values) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compares load test results against a stored baseline.
+
+    poetry run python -m benchmarks.compare bench_results.json benchmarks/baseline.json
+    poetry run python -m benchmarks.compare run1.json run2.json run3.json benchmarks/baseline.json
+
+Given several result files (repeated runs), each scenario is compared by
+the median of its runs, which a single noisy run cannot move. Exits with
+status 1 when a gated scenario regresses past its threshold, so CI fails
+the build. Use --update to overwrite the baseline's results with the
+current ones (thresholds are kept).
+"""
+import argparse
+import json
+import statistics
+import sys
+
+# Metrics compared against the baseline, and the relative slowdown allowed
+# unless the baseline overrides it.
+DEFAULT_THRESHOLDS = {"p50_ms": 0.35, "p95_ms": 0.5}
+
+
+def median_results(runs: list[dict]) -> dict:
+    # Median of every metric over the runs; errors take the worst run
+    results = {}
+    for name in runs[0]["results"]:
+        samples = [run["results"][name] for run in runs if name in run["results"]]
+        results[name] = {
+            metric: (max if metric == "errors" else statistics.median)(sample[metric] for sample in samples)
+            for metric in samples[0]
+        }
+    return {"meta": {**runs[0]["meta"], "runs": len(runs)}, "results": results}
+
+
+def compare(results: dict, baseline: dict) -> tuple[list[str], list[str]]:
+    gated = baseline.get("gated", [])
+    thresholds = {**DEFAULT_THRESHOLDS, **baseline.get("thresholds", {})}
+    failures, warnings = [], []
+
+    for name, expected in baseline["results"].items():
+        current = results["results"].get(name)
+        if current is None:
+            warnings.append(f"{name}: missing from results")
+            continue
+        is_gated = any(pattern in name for pattern in gated)
+        if current["errors"] > expected.get("errors", 0):
+            message = f"{name}: {current['errors']} errors (baseline {expected.get('errors', 0)})"
+            (failures if is_gated else warnings).append(message)
+        for metric, allowed in thresholds.items():
+            limit = expected[metric] * (1 + allowed)
+            if current[metric] > limit:
+                message = (f"{name}: {metric} {current[metric]:.2f} > {limit:.2f} "
+                           f"(baseline {expected[metric]:.2f}, +{allowed:.0%} allowed)")
+                (failures if is_gated else warnings).append(message)
+    return failures, warnings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("results", nargs="+", help="one or more load_test outputs of the same configuration")
+    parser.add_argument("baseline")
+    parser.add_argument("--update", action="store_true")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for path in args.results:
+        with open(path) as results_file:
+            runs.append(json.load(results_file))
+    results = median_results(runs)
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    if args.update:
+        baseline["meta"] = results["meta"]
+        baseline["results"] = results["results"]
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"baseline {args.baseline} updated")
+        return 0
+
+    failures, warnings = compare(results, baseline)
+    for warning in warnings:
+        print(f"WARN {warning}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        print(f"{len(failures)} performance regression(s) in gated scenarios")
+        return 1
+    print("no gated performance regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Generates large synthetic ledgers: users, categories, incomes and expenses,
+bulk-loaded with batched Core inserts.
+
+    poetry run python -m benchmarks.datagen --database-url sqlite+aiosqlite:///./ledger.db \\
+        --users 1000 --transactions-per-user 10000 --distribution pareto --heavy-users 0.01
+
+Transactions per user follow the chosen distribution around the requested
+mean: "uniform" gives every user the same count, "lognormal" and "pareto"
+produce the long tail seen in production, and --heavy-users multiplies the
+count of a fraction of users by --heavy-factor.
+"""
+import argparse
+import asyncio
+import datetime
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from src.config.database import base
+from src.models.user_model import UserModel
+from src.models.categories_model import CategoryModel
+from src.models.incomes_model import IncomeModel
+from src.models.expenses_model import ExpenseModel
+from src.models.search_index import fill_fts_index
+from src.services.password_services import PasswordService
+
+DEFAULT_PASSWORD = "benchmark-password"
+
+INCOME_CATEGORIES = ["Salary", "Freelance", "Dividends", "Rent", "Refunds"]
+EXPENSE_CATEGORIES = ["Groceries", "Transport", "Utilities", "Dining", "Health", "Travel", "Leisure"]
+DISTRIBUTIONS = ("uniform", "lognormal", "pareto")
+
+
+@dataclass
+class LedgerSpec:
+    users: int
+    transactions_per_user: int
+    distribution: str = "uniform"
+    skew: float = 1.0
+    heavy_users: float = 0.0
+    heavy_factor: float = 10.0
+    income_share: float = 0.2
+    end: datetime.datetime = field(default_factory=lambda: datetime.datetime.now().replace(microsecond=0))
+    days: int = 365
+    batch_size: int = 5000
+    seed: int = 0
+
+    @property
+    def start(self) -> datetime.datetime:
+        return self.end - datetime.timedelta(days=self.days)
+
+
+def transaction_counts(spec: LedgerSpec, rng: random.Random) -> list[int]:
+    mean = spec.transactions_per_user
+    if spec.distribution == "uniform":
+        counts = [mean] * spec.users
+    elif spec.distribution == "lognormal":
+        # exp(mu + sigma^2 / 2) is the mean of a lognormal distribution
+        mu = math.log(max(mean, 1)) - spec.skew ** 2 / 2
+        counts = [round(rng.lognormvariate(mu, spec.skew)) for _ in range(spec.users)]
+    elif spec.distribution == "pareto":
+        # alpha / (alpha - 1) is the mean of a Pareto distribution with x_m = 1
+        alpha = 1 + 1 / spec.skew
+        scale = mean * (alpha - 1) / alpha
+        counts = [round(rng.paretovariate(alpha) * scale) for _ in range(spec.users)]
+    else:
+        raise ValueError(f"unknown distribution {spec.distribution!r}")
+
+    for index in rng.sample(range(spec.users), round(spec.users * spec.heavy_users)):
+        counts[index] = round(counts[index] * spec.heavy_factor)
+    return counts
+
+
+def batched(rows, batch_size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+async def _prepare_bulk_load(conn: AsyncConnection):
+    # Durability does not matter for generated data; trade it for load speed
+    if conn.dialect.name == "sqlite":
+        await conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        await conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+    elif conn.dialect.name == "mysql":
+        await conn.exec_driver_sql("SET unique_checks = 0, foreign_key_checks = 0")
+
+
+async def bulk_insert(conn: AsyncConnection, table, rows, batch_size: int) -> int:
+    inserted = 0
+    for batch in batched(rows, batch_size):
+        await conn.execute(insert(table), batch)
+        await conn.commit()
+        inserted += len(batch)
+    return inserted
+
+
+def _transactions(spec: LedgerSpec, rng: random.Random, user_ids, counts, categories, kind: str):
+    share = spec.income_share if kind == "income" else 1 - spec.income_share
+    start = spec.start
+    span = int((spec.end - start).total_seconds())
+    # Incomes are fewer and larger than expenses; both have a long tail
+    mu, sigma = (11.0, 0.8) if kind == "income" else (8.5, 1.1)
+    timedelta = datetime.timedelta
+    lognormvariate, randrange, choice = rng.lognormvariate, rng.randrange, rng.choice
+    for user_id, count in zip(user_ids, counts):
+        category_ids = categories[(user_id, kind)]
+        # At least one of each kind, so every user has a row of each to pick
+        for n in range(max(1, round(count * share))):
+            yield {
+                "amount": max(1, round(lognormvariate(mu, sigma))),
+                "description": f"{kind} {n}",
+                "date": start + timedelta(seconds=randrange(span)),
+                "category_id": choice(category_ids),
+                "user_id": user_id,
+            }
+
+
+async def seed_database(engine: AsyncEngine, spec: LedgerSpec, progress=None) -> list[int]:
+    rng = random.Random(spec.seed)
+    async with engine.begin() as conn:
+        await conn.run_sync(base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        await _prepare_bulk_load(conn)
+        offset = (await conn.execute(select(UserModel.id).order_by(UserModel.id.desc()).limit(1))).scalar() or 0
+
+        password = PasswordService.hash_password(DEFAULT_PASSWORD)
+        await bulk_insert(conn, UserModel.__table__, (
+            {
+                "username": f"user{offset + i}",
+                "full_name": f"User {offset + i}",
+                "email": f"user{offset + i}@example.com",
+                "password": password,
+            }
+            for i in range(spec.users)
+        ), spec.batch_size)
+        user_ids = (await conn.execute(
+            select(UserModel.id).where(UserModel.id > offset).order_by(UserModel.id)
+        )).scalars().all()
+
+        await bulk_insert(conn, CategoryModel.__table__, (
+            {"name": f"{name} {user_id}", "type": kind, "user_id": user_id}
+            for user_id in user_ids
+            for kind, names in (("income", INCOME_CATEGORIES), ("expense", EXPENSE_CATEGORIES))
+            for name in names
+        ), spec.batch_size)
+        categories: dict[tuple[int, str], list[int]] = {}
+        for category_id, user_id, kind in await conn.execute(
+            select(CategoryModel.id, CategoryModel.user_id, CategoryModel.type).where(CategoryModel.user_id > offset)
+        ):
+            categories.setdefault((user_id, kind), []).append(category_id)
+
+        counts = transaction_counts(spec, rng)
+        for kind, model in (("income", IncomeModel), ("expense", ExpenseModel)):
+            rows = _transactions(spec, rng, user_ids, counts, categories, kind)
+            inserted = 0
+            for batch in batched(rows, spec.batch_size):
+                await conn.execute(insert(model.__table__), batch)
+                await conn.commit()
+                inserted += len(batch)
+                if progress:
+                    progress(kind, inserted)
+
+        # The bulk insert skips the write services that keep search indexed
+        await conn.run_sync(fill_fts_index, offset)
+        await conn.commit()
+    return user_ids
+
+
+async def main(args):
+    spec = LedgerSpec(
+        users=args.users,
+        transactions_per_user=args.transactions_per_user,
+        distribution=args.distribution,
+        skew=args.skew,
+        heavy_users=args.heavy_users,
+        heavy_factor=args.heavy_factor,
+        income_share=args.income_share,
+        end=args.end,
+        days=args.days,
+        batch_size=args.batch_size,
+        seed=args.seed,
+    )
+    engine = create_async_engine(args.database_url)
+    if args.drop:
+        async with engine.begin() as conn:
+            await conn.run_sync(base.metadata.drop_all)
+
+    start = time.perf_counter()
+
+    def progress(kind: str, inserted: int):
+        if inserted % (spec.batch_size * 20) == 0:
+            elapsed = time.perf_counter() - start
+            print(f"{kind:<8} {inserted:>12,} rows  {elapsed:8.1f}s", file=sys.stderr)
+
+    await seed_database(engine, spec, progress)
+    await engine.dispose()
+    print(f"done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./ledger.db")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions-per-user", type=int, default=1000, help="mean transactions per user")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--skew", type=float, default=1.0, help="spread of the lognormal/pareto distributions")
+    parser.add_argument("--heavy-users", type=float, default=0.0, help="fraction of users with --heavy-factor more rows")
+    parser.add_argument("--heavy-factor", type=float, default=10.0)
+    parser.add_argument("--income-share", type=float, default=0.2, help="fraction of transactions that are incomes")
+    parser.add_argument("--end", type=datetime.datetime.fromisoformat,
+                        default=datetime.datetime.now().replace(microsecond=0), help="latest transaction date")
+    parser.add_argument("--days", type=int, default=365, help="length of the date range")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drop", action="store_true", help="drop all tables first")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,329 @@
+"""Drives every router through httpx's ASGITransport at a fixed concurrency
+against a seeded database and writes latency percentiles as JSON.
+
+    poetry run python -m benchmarks.load_test --output bench_results.json
+    poetry run python -m benchmarks.compare bench_results.json benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from fastapi.routing import APIRoute
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.main import app
+from src.cache import ORJSONCoder, SingleFlightBackend, user_key_builder
+from src.dependencies import get_async_db
+from src.models.types import utcnow
+from src.schemas.token_schema import TokenData
+from src.services import auth_services
+from src.services.token_services import get_token_service
+from src.services.sync_services import SyncCursor
+
+from .datagen import DEFAULT_PASSWORD, DISTRIBUTIONS, LedgerSpec, seed_database
+
+DEFAULT_DATABASE_URL = "sqlite+aiosqlite:///./bench.db"
+
+
+class Scenario:
+    def __init__(self, method: str, path: str, build=None, authenticated: bool = True, max_requests: int | None = None):
+        self.method = method
+        self.path = path
+        self.build = build or (lambda ctx: {"url": path})
+        self.authenticated = authenticated
+        # bcrypt-bound scenarios are capped so they do not dominate the run
+        self.max_requests = max_requests
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def _transaction_body(ctx, kind: str):
+    return {
+        "amount": ctx.rng.randint(1, 1000),
+        "description": f"bench {kind}",
+        "date": datetime.datetime.now().isoformat(),
+        "category_id": ctx.rng.choice(ctx.categories[ctx.user_id][kind]),
+    }
+
+
+SCENARIOS = [
+    Scenario("GET", "/", authenticated=False),
+    Scenario("POST", "/auth/login", lambda ctx: {
+        "url": "/auth/login", "data": {"username": ctx.username, "password": DEFAULT_PASSWORD},
+    }, authenticated=False, max_requests=24),
+    Scenario("POST", "/auth/refresh", lambda ctx: {
+        "url": "/auth/refresh", "json": {"refresh_token": ctx.refresh_token},
+    }, authenticated=False),
+    Scenario("POST", "/user/register", lambda ctx: {
+        "url": "/user/register", "json": {
+            "username": f"bench-{ctx.rng.getrandbits(48):x}", "full_name": "Bench User",
+            "email": f"bench-{ctx.rng.getrandbits(48):x}@example.com", "password": DEFAULT_PASSWORD,
+        },
+    }, authenticated=False, max_requests=24),
+    Scenario("GET", "/user/me"),
+    Scenario("PUT", "/user/me", lambda ctx: {"url": "/user/me", "json": {"full_name": f"User {ctx.user_id}"}}),
+    Scenario("PUT", "/user/me/password", lambda ctx: {
+        "url": "/user/me/password", "json": {"old_password": DEFAULT_PASSWORD, "new_password": DEFAULT_PASSWORD},
+    }, max_requests=24),
+    Scenario("GET", "/user/{user_id}", lambda ctx: {"url": f"/user/{ctx.user_id}"}),
+    Scenario("GET", "/user/me/history"),
+    Scenario("GET", "/user/me/history?range", lambda ctx: {
+        "url": "/user/me/history", "params": {"from_date": ctx.month_ago, "limit": 100},
+    }),
+    Scenario("GET", "/user/balance"),
+    Scenario("GET", "/user/balance/incomes"),
+    Scenario("GET", "/user/balance/expenses"),
+    Scenario("GET", "/incomes/"),
+    Scenario("GET", "/incomes/?range", lambda ctx: {"url": "/incomes/", "params": {"from_date": ctx.month_ago}}),
+    Scenario("GET", "/incomes/{income_id}", lambda ctx: {"url": f"/incomes/{ctx.income_id}"}),
+    Scenario("POST", "/incomes/", lambda ctx: {"url": "/incomes/", "json": _transaction_body(ctx, "income")}),
+    Scenario("PUT", "/incomes/{income_id}", lambda ctx: {
+        "url": f"/incomes/{ctx.income_id}", "json": _transaction_body(ctx, "income"),
+    }),
+    Scenario("GET", "/expenses/"),
+    Scenario("GET", "/expenses/?range", lambda ctx: {"url": "/expenses/", "params": {"from_date": ctx.month_ago}}),
+    Scenario("GET", "/expenses/{expense_id}", lambda ctx: {"url": f"/expenses/{ctx.expense_id}"}),
+    Scenario("POST", "/expenses/", lambda ctx: {"url": "/expenses/", "json": _transaction_body(ctx, "expense")}),
+    Scenario("PUT", "/expenses/{expense_id}", lambda ctx: {
+        "url": f"/expenses/{ctx.expense_id}", "json": _transaction_body(ctx, "expense"),
+    }),
+    Scenario("GET", "/categories/"),
+    Scenario("GET", "/categories/{category_id}", lambda ctx: {
+        "url": f"/categories/{ctx.categories[ctx.user_id]['expense'][0]}",
+    }),
+    Scenario("POST", "/categories/", lambda ctx: {
+        "url": "/categories/", "json": {"name": f"bench {ctx.rng.getrandbits(48):x}", "type": "expense"},
+    }),
+    Scenario("PUT", "/categories/{category_id}", lambda ctx: {
+        "url": f"/categories/{ctx.categories[ctx.user_id]['expense'][0]}",
+        "json": {"name": f"bench {ctx.rng.getrandbits(48):x}", "type": "expense"},
+    }),
+    Scenario("GET", "/sync", lambda ctx: {"url": "/sync", "params": {"limit": 1000}}),
+    Scenario("GET", "/sync?since", lambda ctx: {"url": "/sync", "params": {"since": ctx.sync_token}}),
+    Scenario("POST", "/batch", lambda ctx: {"url": "/batch", "json": {"requests": [
+        {"path": path} for path in ("/user/me", "/user/balance", "/categories/", "/user/me/history")
+    ]}}),
+    Scenario("GET", "/transactions/search", lambda ctx: {
+        # datagen describes rows as "<kind> <n>"
+        "url": "/transactions/search",
+        "params": {"q": f"{ctx.rng.choice(('income', 'expense'))} {ctx.rng.randrange(50)}"},
+    }),
+    Scenario("GET", "/.well-known/jwks.json", authenticated=False),
+    Scenario("GET", "/metrics", authenticated=False),
+]
+
+# Routes deliberately left out: destructive ones, the ones that send email,
+# the exchange routes, which call the real BCRA API, and the event stream,
+# which stays open until the client disconnects.
+SKIPPED_ROUTES = {
+    "DELETE", "/auth/logout", "/auth/forgot-password", "/auth/reset-password", "/exchange", "/user/events",
+}
+
+
+class Context:
+    def __init__(self, rng: random.Random, users: dict, categories: dict, transactions: dict):
+        self.rng = rng
+        self.users = users
+        self.categories = categories
+        self.transactions = transactions
+        self.month_ago = (datetime.date.today() - datetime.timedelta(days=30)).isoformat()
+        # Built after seeding: delta syncs see only the writes of the run
+        self.sync_token = SyncCursor(utcnow()).encode()
+
+    def pick_user(self):
+        self.user_id = self.rng.choice(list(self.users))
+        self.username, self.access_token, self.refresh_token = self.users[self.user_id]
+        self.income_id = self.rng.choice(self.transactions[self.user_id]["income"])
+        self.expense_id = self.rng.choice(self.transactions[self.user_id]["expense"])
+
+
+def uncovered_routes() -> list[str]:
+    covered = {(scenario.method, scenario.path.split("?")[0]) for scenario in SCENARIOS}
+    missing = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in route.methods:
+            if (method, route.path) in covered or method in SKIPPED_ROUTES:
+                continue
+            if any(route.path.startswith(prefix) for prefix in SKIPPED_ROUTES if prefix.startswith("/")):
+                continue
+            missing.append(f"{method} {route.path}")
+    return missing
+
+
+async def build_context(engine, user_ids: list[int], sample_users: int, rng: random.Random) -> Context:
+    from sqlalchemy import select
+    from src.models.categories_model import CategoryModel
+    from src.models.incomes_model import IncomeModel
+    from src.models.expenses_model import ExpenseModel
+    from src.models.user_model import UserModel
+
+    tokens = get_token_service()
+    sampled = rng.sample(user_ids, min(sample_users, len(user_ids)))
+    users, categories, transactions = {}, {}, {}
+    async with engine.connect() as conn:
+        for user_id in sampled:
+            username = (await conn.execute(select(UserModel.username).where(UserModel.id == user_id))).scalar_one()
+            token_data = TokenData(username=username, scopes=[], issued_at=datetime.datetime.now())
+            users[user_id] = (
+                username,
+                auth_services.create_access_token(token_data, tokens),
+                auth_services.create_refresh_token(token_data, tokens),
+            )
+            categories[user_id] = {"income": [], "expense": []}
+            for category_id, kind in await conn.execute(
+                select(CategoryModel.id, CategoryModel.type).where(CategoryModel.user_id == user_id)
+            ):
+                categories[user_id][kind].append(category_id)
+            transactions[user_id] = {
+                "income": (await conn.execute(
+                    select(IncomeModel.id).where(IncomeModel.user_id == user_id).limit(100)
+                )).scalars().all(),
+                "expense": (await conn.execute(
+                    select(ExpenseModel.id).where(ExpenseModel.user_id == user_id).limit(100)
+                )).scalars().all(),
+            }
+    return Context(rng, users, categories, transactions)
+
+
+async def run_scenario(client: AsyncClient, scenario: Scenario, ctx: Context, requests: int, concurrency: int):
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            ctx.pick_user()
+            kwargs = scenario.build(ctx)
+            if scenario.authenticated:
+                kwargs["headers"] = {"Authorization": f"Bearer {ctx.access_token}"}
+            start = time.perf_counter()
+            response = await client.request(scenario.method, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+    }
+
+
+async def main(args):
+    engine = create_async_engine(args.database_url)
+    rng = random.Random(args.seed)
+    if args.database_url.startswith("sqlite") and os.path.exists(args.sqlite_path):
+        os.remove(args.sqlite_path)
+
+    seed_start = time.perf_counter()
+    spec = LedgerSpec(
+        users=args.users,
+        transactions_per_user=args.transactions_per_user,
+        distribution=args.distribution,
+        seed=args.seed,
+    )
+    user_ids = await seed_database(engine, spec)
+    print(f"seeded {args.users} users x {args.transactions_per_user} transactions "
+          f"in {time.perf_counter() - seed_start:.1f}s", file=sys.stderr)
+    ctx = await build_context(engine, user_ids, args.sample_users, rng)
+
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_bench_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = get_bench_db
+    # Measure the database paths, not the response cache
+    FastAPICache.reset()
+    FastAPICache.init(
+        SingleFlightBackend(InMemoryBackend()),
+        prefix="fastapi-cache",
+        enable=args.cache,
+        coder=ORJSONCoder,
+        key_builder=user_key_builder,
+    )
+
+    for route in uncovered_routes():
+        print(f"warning: no scenario for {route}", file=sys.stderr)
+
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for scenario in SCENARIOS:
+            if args.only and not any(part in scenario.name for part in args.only):
+                continue
+            requests = min(args.requests, scenario.max_requests or args.requests)
+            await run_scenario(client, scenario, ctx, min(args.warmup, requests), args.concurrency)
+            results[scenario.name] = await run_scenario(client, scenario, ctx, requests, args.concurrency)
+            result = results[scenario.name]
+            print(f"{scenario.name:<40} p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+                  f"rps={result['throughput_rps']:>8.1f} errors={result['errors']}", file=sys.stderr)
+
+    await engine.dispose()
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": args.database_url.split("://")[0],
+            "users": args.users,
+            "transactions_per_user": args.transactions_per_user,
+            "distribution": args.distribution,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "cache": args.cache,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"results written to {args.output}", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--transactions-per-user", type=int, default=500)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--sample-users", type=int, default=20, help="users whose tokens drive the requests")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--only", nargs="*", help="run only scenarios whose name contains one of these")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+    args.sqlite_path = args.database_url.split("///", 1)[-1]
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
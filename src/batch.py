@@ -0,0 +1,111 @@
+import asyncio
+import inspect
+import logging
+from urllib.parse import urlsplit
+
+import orjson
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.dependencies.utils import request_params_to_args
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import QueryParams
+from starlette.routing import Match
+
+from .models.user_model import UserModel
+from .schemas.batch_schema import BatchRequest, BatchResponse
+
+logger = logging.getLogger(__name__)
+
+# Reads of the caller's own data. Their endpoints take only db, current_user
+# and path or query parameters, so they can be called directly.
+BATCH_ROUTES = frozenset({
+    "/user/me",
+    "/user/me/history",
+    "/user/balance",
+    "/user/balance/incomes",
+    "/user/balance/expenses",
+    "/categories/",
+    "/categories/{category_id}",
+    "/incomes/",
+    "/incomes/{income_id}",
+    "/expenses/",
+    "/expenses/{expense_id}",
+})
+
+
+class SerializedSession:
+    """An AsyncSession runs one operation at a time. Sub-requests share one
+    through this wrapper: their queries take turns while everything else,
+    cache lookups included, runs concurrently. Results are buffered, so
+    they stay usable once the lock is released."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+        self._lock = asyncio.Lock()
+
+    async def execute(self, *args, **kwargs):
+        async with self._lock:
+            return await self._session.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def match_route(app: FastAPI, path: str) -> tuple[APIRoute | None, dict]:
+    scope = {"type": "http", "method": "GET", "path": path, "root_path": ""}
+    for route in app.router.routes:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route, child_scope.get("path_params", {})
+    return None, {}
+
+
+def error(request: BatchRequest, status: int, detail) -> BatchResponse:
+    return BatchResponse(path=request.path, status=status, body={"detail": detail})
+
+
+async def run_request(app: FastAPI, db, user: UserModel, request: BatchRequest) -> BatchResponse:
+    url = urlsplit(request.path)
+    route, path_params = match_route(app, url.path)
+    if route is None:
+        return error(request, 404, "Not Found")
+    if not isinstance(route, APIRoute) or route.path_format not in BATCH_ROUTES:
+        return error(request, 400, "This endpoint cannot be batched")
+
+    dependant = route.dependant
+    path_values, path_errors = request_params_to_args(dependant.path_params, path_params)
+    query_values, query_errors = request_params_to_args(dependant.query_params, QueryParams(url.query))
+    if path_errors or query_errors:
+        return error(request, 422, jsonable_encoder(path_errors + query_errors))
+
+    parameters = inspect.signature(route.endpoint).parameters
+    injected = {name: value for name, value in (("db", db), ("current_user", user)) if name in parameters}
+    try:
+        result = await route.endpoint(**injected, **path_values, **query_values)
+    except HTTPException as e:
+        return error(request, e.status_code, e.detail)
+    except Exception:
+        logger.error(f"Batched request {request.path} failed", exc_info=True)
+        return error(request, 500, "Internal server error. Contact support.")
+
+    if isinstance(result, Response):
+        # Already serialized (a sparse fieldset)
+        return BatchResponse(path=request.path, status=result.status_code, body=orjson.loads(result.body))
+    if route.response_field is None:
+        return BatchResponse(path=request.path, status=200, body=jsonable_encoder(result))
+    value, errors = route.response_field.validate(result, {}, loc=("response",))
+    if errors:
+        logger.error(f"Batched request {request.path} returned an invalid response: {errors}")
+        return error(request, 500, "Internal server error. Contact support.")
+    return BatchResponse(path=request.path, status=200, body=route.response_field.serialize(value))
+
+
+async def run_batch(
+    app: FastAPI, db: AsyncSession, user: UserModel, requests: list[BatchRequest]
+) -> list[BatchResponse]:
+    """Runs read sub-requests under the caller's authentication and one
+    session. Endpoints are called directly, so their @cache entries are
+    shared with ordinary requests."""
+    session = SerializedSession(db)
+    return await asyncio.gather(*(run_request(app, session, user, request) for request in requests))
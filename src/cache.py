@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import logging
+import random
+import uuid
+from typing import Any, Callable
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends import Backend
+from fastapi_cache.coder import Coder
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from .instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_JITTER = 0.1  # +-10% so entries written together do not expire together
+SINGLE_FLIGHT_TIMEOUT = 5.0  # seconds a miss waits for another request's result
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+DATA_VERSION_TTL = 60 * 60 * 48  # 48 hours, well past any cached entry
+CACHE_FORMAT = 3  # part of every key, bump when the stored encoding changes
+
+
+class InstrumentedBackend(Backend):
+    def __init__(self, backend: Backend):
+        self.backend = backend
+
+    async def get_with_ttl(self, key: str):
+        with timed("cache"):
+            return await self.backend.get_with_ttl(key)
+
+    async def get(self, key: str):
+        with timed("cache"):
+            return await self.backend.get(key)
+
+    async def set(self, key: str, value: bytes, expire: int | None = None):
+        with timed("cache"):
+            return await self.backend.set(key, value, expire)
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        return await self.backend.clear(namespace, key)
+
+
+def _orjson_default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+
+class ORJSONCoder(Coder):
+    """Stores plain JSON. A hit decodes to dicts and lists, which FastAPI
+    validates against the response model as with any other return value.
+
+    A Response returned by an endpoint (a sparse fieldset, which the
+    response model would reject) is stored as its body behind RAW_MARKER
+    and comes back as a Response, sent without validation."""
+
+    RAW_MARKER = b"\x00"  # never the first byte of a JSON document
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        if isinstance(value, Response):
+            return cls.RAW_MARKER + value.body
+        return orjson.dumps(value, default=_orjson_default)
+
+    @classmethod
+    def decode(cls, value: bytes | str) -> Any:
+        if isinstance(value, str):
+            value = value.encode()
+        if value.startswith(cls.RAW_MARKER):
+            return Response(value[len(cls.RAW_MARKER):], media_type="application/json")
+        return orjson.loads(value)
+
+
+class SingleFlightBackend(Backend):
+    """Coalesces concurrent misses on a key into one computation.
+
+    The first miss in a process returns None so the @cache decorator computes
+    the value; later misses await its set() instead. With Redis, the first
+    miss also takes a short lock, and a process that finds the lock taken
+    polls for the value another process is computing. A waiter that times
+    out (the computing request failed) falls back to computing itself."""
+
+    def __init__(self, backend: Backend, redis=None, timeout: float = SINGLE_FLIGHT_TIMEOUT):
+        self.backend = backend
+        self.redis = redis
+        self.timeout = timeout
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def get_with_ttl(self, key: str):
+        ttl, value = await self.backend.get_with_ttl(key)
+        if value is not None:
+            return ttl, value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(inflight), self.timeout)
+            except asyncio.TimeoutError:
+                return 0, None
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        if await self._acquire_lock(key):
+            # This request computes; set() hands the value to the waiters. If
+            # it fails instead, they are released when its task ends (or at
+            # the latest after the timeout) and compute on their own.
+            task = asyncio.current_task()
+            if task is not None:
+                task.add_done_callback(lambda _: self._resolve(key, (0, None), future))
+            loop.call_later(self.timeout, self._resolve, key, (0, None), future)
+            return 0, None
+
+        result = await self._wait_for_other_process(key)
+        self._resolve(key, result)
+        return result
+
+    async def get(self, key: str):
+        return await self.backend.get(key)
+
+    async def set(self, key: str, value: bytes, expire: int | None = None):
+        if expire:
+            expire = max(1, round(expire * random.uniform(1 - CACHE_TTL_JITTER, 1 + CACHE_TTL_JITTER)))
+        await self.backend.set(key, value, expire)
+        if self._resolve(key, (expire or 0, value)) and self.redis is not None:
+            await self._release_lock(key)
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        return await self.backend.clear(namespace, key)
+
+    def _resolve(self, key: str, result: tuple[int, Any], future: asyncio.Future | None = None) -> bool:
+        if future is not None and self._inflight.get(key) is not future:
+            return False  # already resolved, a newer computation may be running
+        future = self._inflight.pop(key, None)
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(result)
+        return True
+
+    async def _acquire_lock(self, key: str) -> bool:
+        if self.redis is None:
+            return True
+        try:
+            return bool(await self.redis.set(f"lock:{key}", 1, nx=True, px=int(self.timeout * 1000)))
+        except RedisError:
+            return True
+
+    async def _release_lock(self, key: str):
+        try:
+            await self.redis.delete(f"lock:{key}")
+        except RedisError:
+            pass  # expires on its own
+
+    async def _wait_for_other_process(self, key: str):
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+            ttl, value = await self.backend.get_with_ttl(key)
+            if value is not None:
+                return ttl, value
+            try:
+                if not await self.redis.exists(f"lock:{key}"):
+                    break  # the other process gave up without a value
+            except RedisError:
+                break
+        return 0, None
+
+
+def data_version_key(user_id: int) -> str:
+    return f"{FastAPICache.get_prefix()}:data-version:{user_id}"
+
+
+async def get_data_version(user_id: int) -> str:
+    try:
+        version = await FastAPICache.get_backend().get(data_version_key(user_id))
+    except Exception:
+        logger.warning(f"Could not read the cache data version of user {user_id}", exc_info=True)
+        return uuid.uuid4().hex  # bypass possibly stale entries
+    if version is None:
+        # Never "0" or another fixed value: after a flush or expiry it would
+        # repeat a version (and ETag) already handed out for other data
+        return await bump_data_version(user_id)
+    return version.decode() if isinstance(version, bytes) else version
+
+
+async def bump_data_version(user_id: int) -> str:
+    # Cached entries and ETags of the user are derived from this version, so
+    # replacing it invalidates them all at once. A random version, unlike an
+    # increment, cannot be lost to a concurrent bump.
+    version = uuid.uuid4().hex
+    try:
+        await FastAPICache.get_backend().set(data_version_key(user_id), version.encode(), DATA_VERSION_TTL)
+    except Exception:
+        logger.warning(f"Could not invalidate the cache of user {user_id}", exc_info=True)
+    return version
+
+
+async def user_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request=None,
+    response=None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> str:
+    # The default builder hashes the repr of every argument, including the
+    # session and user objects, so no two requests ever shared a key
+    user = kwargs.get("current_user")
+    params = {name: value for name, value in kwargs.items() if name not in ("db", "current_user")}
+    digest = hashlib.md5(
+        f"{CACHE_FORMAT}:{func.__module__}:{func.__qualname__}:{args}:{sorted(params.items())}".encode()
+    ).hexdigest()
+    if user is None:
+        return f"{namespace}:{digest}"
+    return f"{namespace}:user:{user.id}:{await get_data_version(user.id)}:{digest}"
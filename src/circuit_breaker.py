@@ -0,0 +1,85 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from .metrics import circuit_breaker_rejections_total, circuit_breaker_state
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit {name} is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a while.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast with CircuitOpenError. Once `reset_timeout` seconds pass, one
+    trial call is let through (half open): success closes the circuit, failure
+    opens it again. State is per process."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = CLOSED
+        self._trial_running = False
+        circuit_breaker_state.set(name, value=STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit {self.name} is now {state}")
+        self.state = state
+        circuit_breaker_state.set(self.name, value=STATE_VALUES[state])
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def before_call(self):
+        if self.state == OPEN and self.retry_after() == 0:
+            self._set_state(HALF_OPEN)
+        if self.state == OPEN or (self.state == HALF_OPEN and self._trial_running):
+            circuit_breaker_rejections_total.inc(self.name)
+            raise CircuitOpenError(self.name, self.retry_after())
+        if self.state == HALF_OPEN:
+            self._trial_running = True
+
+    def record_success(self):
+        self._trial_running = False
+        self.failures = 0
+        self._set_state(CLOSED)
+
+    def record_failure(self):
+        self._trial_running = False
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+            self._set_state(OPEN)
+
+    @asynccontextmanager
+    async def call(self, is_failure=lambda exc: True):
+        """Wraps one call to the dependency. Exceptions for which `is_failure`
+        is false (e.g. a 404) count as a healthy response."""
+        self.before_call()
+        try:
+            yield
+        except Exception as exc:
+            if is_failure(exc):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # Cancelled: neither healthy nor failing, let the next call try
+            self._trial_running = False
+            raise
+        self.record_success()
@@ -0,0 +1,51 @@
+import hashlib
+
+from fastapi import Depends, Request
+
+from .cache import get_data_version
+from .exceptions.http_errors import not_modified
+from .models.user_model import UserModel
+from .services import auth_services
+
+# Clients may store the response but must revalidate it on every use
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+# CompressionMiddleware gives each encoded body its own strong ETag, the
+# identity one plus the content coding (RFC 9110 8.8.3)
+ETAG_CODINGS = ("br", "gzip")
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    if not etag.startswith('"'):
+        return etag  # weak validators may be shared between codings
+    return f'{etag[:-1]}-{coding}"'
+
+
+def matching_etag(if_none_match: str | None, etag: str) -> str | None:
+    # If-None-Match uses the weak comparison: a W/ prefix does not matter.
+    # Returns the matched validator, so the 304 echoes the client's coding.
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    representations = {etag, *(encoded_etag(etag, coding) for coding in ETAG_CODINGS)}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate in representations:
+            return candidate
+    return None
+
+
+async def conditional_get(request: Request, current_user: UserModel = Depends(auth_services.auth_access_token)):
+    """Route dependency for GETs of user data. The ETag is derived from the
+    user's data version, which every write replaces, and the URL, so a
+    client whose copy is current gets a 304 before the endpoint runs any
+    query. ETagMiddleware puts the ETag on the 200 response."""
+    version = await get_data_version(current_user.id)
+    digest = hashlib.sha256(f"{version}:{request.url.path}?{request.url.query}".encode()).hexdigest()[:32]
+    etag = f'"{digest}"'
+    matched = matching_etag(request.headers.get("if-none-match"), etag)
+    if matched:
+        raise not_modified(matched, ETAG_CACHE_CONTROL)
+    request.state.etag = etag
@@ -1,18 +1,39 @@
+from functools import lru_cache
+
 from sqlalchemy import create_engine, MetaData
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import declarative_base, Session, sessionmaker
 from .settings import settings
 
 DB_URL = settings.DATABASE_URL
 ASYNC_DB_URL = settings.ASYNC_DATABASE_URL
 
-engine = create_engine(f"{DB_URL}")
-async_engine = create_async_engine(f"{ASYNC_DB_URL}", echo=True)
-
 base = declarative_base() # This is the base class for your models
 
 metadata = MetaData() # This is used to hold the metadata of the database schema
 
+
+# Engines (and their driver imports) are created on first use, not at import
+@lru_cache
+def get_engine():
+    return create_engine(f"{DB_URL}")
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    from ..instrumentation import instrument_engine
+
+    async_engine = create_async_engine(f"{ASYNC_DB_URL}", echo=True)
+    instrument_engine(async_engine)
+    return async_engine
+
+
 # Session factories for synchronous and asynchronous sessions
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, class_=Session) 
-AsyncSessionLocal = sessionmaker(bind=async_engine, expire_on_commit=False, class_=AsyncSession)
+@lru_cache
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=get_engine(), autocommit=False, autoflush=False, class_=Session)
+
+
+@lru_cache
+def get_async_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=get_async_engine(), expire_on_commit=False, class_=AsyncSession)
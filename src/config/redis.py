@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+from redis import asyncio as aioredis
+
+from .settings import settings
+
+
+@lru_cache
+def get_redis() -> aioredis.Redis | None:
+    # Without REDIS_URL the app runs single-node: callers fall back to
+    # process-local state.
+    if not settings.REDIS_URL:
+        return None
+    return aioredis.from_url(settings.REDIS_URL)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,10 +10,23 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
+    # RS256/EdDSA: PEM private keys, the first signs and all verify (rotation)
+    JWT_PRIVATE_KEY_FILES: list[str] = []
+    JWT_BACKEND: Literal["auto", "hmac", "jose"] = "auto"
+    JWT_VERIFIED_CACHE_SIZE: int = 1024
+    PASSWORD_RESET_MODE: Literal["table", "jwt"] = "table"
+    PASSWORD_RESET_EXPIRE_MINUTES: int = 30
     
     GEMINI_API_KEY: str
     REDIS_URL: str
 
+    BCRA_BASE_URL: str = "https://api.bcra.gob.ar/estadisticascambiarias/v1.0"
+    BCRA_CONNECT_TIMEOUT: float = 2.0
+    BCRA_READ_TIMEOUT: float = 5.0
+    # Consecutive failures that open the circuit, and seconds until a retry
+    BCRA_FAILURE_THRESHOLD: int = 5
+    BCRA_RESET_TIMEOUT: float = 30.0
+
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
     MAIL_FROM: str
@@ -22,6 +37,33 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool
     VALIDATE_CERTS: bool
 
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["auto", "memory"] = "auto"  # auto: Redis when REDIS_URL is set
+    # Per limit: the budget of each client IP and of each username/email
+    RATE_LIMITS: dict[str, str] = {
+        "login": "10/minute",
+        "register": "5/minute",
+        "forgot_password": "3/minute",
+        "reset_password": "10/minute",
+        "change_password": "5/minute",
+    }
+
+    # Deleted rows are kept this long for /sync; older tokens get a full sync
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90
+
+    # auto: MySQL FULLTEXT or SQLite FTS5, memory: in-process inverted index
+    SEARCH_BACKEND: Literal["auto", "memory"] = "auto"
+
+    # Responses stored for Idempotency-Key retries of POST /incomes and /expenses
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    PROFILING_TOKEN: str | None = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_OUTPUT_DIR: str | None = None
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
@@ -2,15 +2,15 @@ from typing import Generator, AsyncGenerator
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .config.database import SessionLocal, AsyncSessionLocal
+from .config.database import get_sessionmaker, get_async_sessionmaker
 
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
 
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+    async with get_async_sessionmaker()() as session:
+        yield session
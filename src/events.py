@@ -0,0 +1,211 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from decimal import Decimal
+
+import orjson
+from redis.exceptions import RedisError
+
+from .config.redis import get_redis
+from .schemas.types import serialize_amount
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+EVENT_QUEUE_SIZE = 100  # events buffered per stream before a slow client is told to resync
+EVENT_HEARTBEAT_INTERVAL = 15  # seconds, keeps proxies from closing an idle stream
+EVENT_RETRY_MS = 3000  # how long EventSource waits before reconnecting
+EVENT_POLL_TIMEOUT = 1.0
+EVENT_RECONNECT_DELAY = 1.0
+
+
+def event_channel(user_id: int) -> str:
+    return f"events:user:{user_id}"
+
+
+class Subscriber:
+    """Events waiting to be written to one open stream.
+
+    Balance deltas coalesce into a single running total, so a burst of writes
+    costs a slow client one balance event. Other events queue up to maxsize;
+    past that the queue is dropped and the client gets one resync event
+    telling it to refetch, rather than the worker buffering without bound."""
+
+    def __init__(self, maxsize: int = EVENT_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self.events: deque[dict] = deque()
+        self.balance_delta: Decimal | None = None
+        self.overflowed = False
+        self._ready = asyncio.Event()
+
+    def put(self, event: dict):
+        if event["type"] == "balance":
+            self.balance_delta = (self.balance_delta or Decimal(0)) + Decimal(str(event["delta"]))
+        elif not self.overflowed:
+            if len(self.events) < self.maxsize:
+                self.events.append(event)
+            else:
+                self.resync()
+                return
+        self._ready.set()
+
+    def resync(self):
+        self.overflowed = True
+        self.events.clear()
+        self.balance_delta = None  # the refetch includes the balance
+        metrics.event_stream_resyncs_total.inc()
+        self._ready.set()
+
+    async def get(self) -> list[dict]:
+        await self._ready.wait()
+        self._ready.clear()
+        if self.overflowed:
+            self.overflowed = False
+            self.balance_delta = None
+            return [{"type": "resync"}]
+        events = list(self.events)
+        self.events.clear()
+        if self.balance_delta is not None:
+            events.append({"type": "balance", "delta": serialize_amount(self.balance_delta)})
+            self.balance_delta = None
+        return events
+
+
+class EventHub:
+    """Fans published events out to this worker's open streams.
+
+    With Redis, publishing goes through a per-user channel and each worker
+    holds one pub/sub connection, subscribed to the users that have a stream
+    open on it. Without Redis the app runs single-node and events are handed
+    to local subscribers directly."""
+
+    def __init__(self):
+        self.subscribers: dict[int, set[Subscriber]] = {}
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+
+    def dispatch(self, user_id: int, events: list[dict]):
+        for subscriber in self.subscribers.get(user_id, ()):
+            for event in events:
+                subscriber.put(event)
+
+    async def publish(self, user_id: int, *events: dict):
+        redis = get_redis()
+        if redis is None:
+            self.dispatch(user_id, list(events))
+            return
+        try:
+            await redis.publish(event_channel(user_id), orjson.dumps(events))
+        except RedisError:
+            # The write already committed; streams on other workers miss it
+            logger.warning("Could not publish events for user %s", user_id, exc_info=True)
+            self.dispatch(user_id, list(events))
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int):
+        subscriber = Subscriber()
+        subscribers = self.subscribers.setdefault(user_id, set())
+        subscribers.add(subscriber)
+        metrics.event_streams_open.set(value=self.stream_count())
+        if len(subscribers) == 1:
+            await self._redis_subscribe(user_id)
+        try:
+            yield subscriber
+        finally:
+            subscribers.discard(subscriber)
+            metrics.event_streams_open.set(value=self.stream_count())
+            if not subscribers and self.subscribers.get(user_id) is subscribers:
+                del self.subscribers[user_id]
+                await self._redis_unsubscribe(user_id)
+
+    def stream_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    async def _redis_subscribe(self, user_id: int):
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            if self._pubsub is None:
+                self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            await self._pubsub.subscribe(event_channel(user_id))
+        except RedisError:
+            logger.warning("Could not subscribe to events for user %s", user_id, exc_info=True)
+            return
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def _redis_unsubscribe(self, user_id: int):
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.unsubscribe(event_channel(user_id))
+        except RedisError:
+            logger.warning("Could not unsubscribe from events for user %s", user_id, exc_info=True)
+
+    async def _read(self):
+        # Stops once no stream is open, the next subscribe starts it again
+        while self.subscribers:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=EVENT_POLL_TIMEOUT
+                )
+            except (RedisError, OSError):
+                # redis-py reconnects and resubscribes on the next call, but
+                # whatever was published meanwhile is lost
+                logger.warning("Event subscription lost its Redis connection", exc_info=True)
+                for subscribers in self.subscribers.values():
+                    for subscriber in subscribers:
+                        subscriber.resync()
+                await asyncio.sleep(EVENT_RECONNECT_DELAY)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            self.dispatch(int(channel.rsplit(":", 1)[1]), orjson.loads(message["data"]))
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+
+
+event_hub = EventHub()
+
+
+async def publish_ledger_change(user_id: int, event_type: str, payload: dict, balance_delta: Decimal):
+    events = [{"type": event_type, "data": payload}]
+    if balance_delta:
+        events.append({"type": "balance", "delta": str(balance_delta)})
+    await event_hub.publish(user_id, *events)
+
+
+def format_event(event: dict) -> bytes:
+    if event["type"] == "balance":
+        data = {"delta": event["delta"]}
+    else:
+        data = event.get("data", {})
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def event_stream(user_id: int):
+    async with event_hub.subscribe(user_id) as subscriber:
+        yield f"retry: {EVENT_RETRY_MS}\n\n".encode()
+        while True:
+            try:
+                events = await asyncio.wait_for(subscriber.get(), EVENT_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if events:
+                yield b"".join(format_event(event) for event in events)
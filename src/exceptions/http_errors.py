@@ -6,6 +6,11 @@ INVALID_OLD_PASSWORD = HTTPException(
     detail="Invalid old password",
 )
 
+INVALID_SYNC_TOKEN = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Invalid sync token",
+)
+
 # Unauthorized error (401)
 WRONG_PASSWORD = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,6 +73,16 @@ CATEGORY_ALREADY_EXISTS = HTTPException(
     detail="Category with this name already exists."
 )
 
+CATEGORY_IN_USE = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Category is used by incomes or expenses. Move or delete them first."
+)
+
+IDEMPOTENCY_KEY_IN_PROGRESS = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="A request with this Idempotency-Key is still being processed. Retry later."
+)
+
 
 # Validation error (422)
 USER_CREATION_FAILED = HTTPException(
@@ -107,6 +122,35 @@ CATEGORY_CREATION_FAILED = HTTPException(
     detail="Invalid category data. Check required fields and formats."
 )
 
+IDEMPOTENCY_KEY_REUSED = HTTPException(
+    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    detail="Idempotency-Key was already used for a different request."
+)
+
+
+def invalid_fields(allowed: list[str]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=f"Invalid fields. Use a comma-separated subset of: {', '.join(allowed)}."
+    )
+
+
+# Rate limit error (429)
+def too_many_requests(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests. Try again later.",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+# Conditional GET (304)
+def not_modified(etag: str, cache_control: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
 
 # Internal error (500)
 SERVER_ERROR = HTTPException(
@@ -0,0 +1,47 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Query, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from .exceptions.http_errors import invalid_fields
+
+FIELDS_QUERY = Query(
+    default=None,
+    description="Comma-separated fields to return, e.g. `id,amount,date`. All fields when omitted.",
+)
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> tuple[str, ...] | None:
+    """The requested fields in the model's order, or None for all of them."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested or not requested <= model.model_fields.keys():
+        raise invalid_fields(list(model.model_fields))
+    if requested == model.model_fields.keys():
+        return None
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+@lru_cache(maxsize=256)
+def sparse_list_adapter(model: type[BaseModel], fields: tuple[str, ...]) -> TypeAdapter:
+    # The same field definitions (and JSON serializers) as the full model,
+    # built once per field combination
+    sparse_model = create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (info.annotation, info) for name, info in model.model_fields.items() if name in fields},
+    )
+    return TypeAdapter(list[sparse_model])
+
+
+def json_response(adapter: TypeAdapter, rows: list[Any]) -> Response:
+    # Validated and dumped to JSON by the adapter, one pass each. FastAPI
+    # sends a returned Response as is, without a second validation against
+    # a response_model; the cache stores its body (ORJSONCoder.RAW_MARKER).
+    return Response(adapter.dump_json(adapter.validate_python(rows)), media_type="application/json")
+
+
+def sparse_response(model: type[BaseModel], fields: tuple[str, ...], rows: list[Any]) -> Response:
+    return json_response(sparse_list_adapter(model, fields), rows)
@@ -0,0 +1,115 @@
+import hashlib
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from .config.settings import settings
+from .exceptions.http_errors import IDEMPOTENCY_KEY_IN_PROGRESS, IDEMPOTENCY_KEY_REUSED
+from .locks import distributed_lock
+from .models.idempotency_key_model import IdempotencyKey
+from .models.types import utcnow
+from .models.user_model import UserModel
+
+IDEMPOTENCY_LOCK_TIMEOUT = 30  # seconds a crashed request can hold its key
+IDEMPOTENCY_LOCK_WAIT = 10  # seconds a concurrent duplicate waits for the first
+
+
+def request_hash(request: Request, payload: BaseModel) -> str:
+    body = orjson.dumps(payload.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(f"{request.method} {request.url.path}\n".encode() + body).hexdigest()
+
+
+def replay(stored: IdempotencyKey) -> Response:
+    return Response(
+        content=stored.response_body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+async def stored_response(db: AsyncSession, user_id: int, key: str, fingerprint: str) -> Response | None:
+    result = await db.execute(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    )
+    stored = result.scalar_one_or_none()
+    if stored is None:
+        return None
+    if stored.expires_at <= utcnow():
+        # Expired but not purged yet: the key starts over
+        await db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == stored.id))
+        return None
+    if stored.request_hash != fingerprint:
+        raise IDEMPOTENCY_KEY_REUSED
+    return replay(stored)
+
+
+async def run_once(
+    db: AsyncSession,
+    user: UserModel,
+    key: str | None,
+    request: Request,
+    payload: BaseModel,
+    create: Callable[..., Awaitable[Any]],
+    created: Callable[[AsyncSession, Any], Awaitable[None]],
+    schema: type[BaseModel],
+    status_code: int = 200,
+) -> BaseModel | Response:
+    """Runs a create at most once per Idempotency-Key.
+
+    `create(commit=False)` only flushes the new row; the key is inserted
+    first and stored with the row's response in the same commit, then
+    `created` runs the create's after-commit work. A retry with the same key
+    and body gets the stored response back without touching the ledger.
+    Duplicates in flight wait on a per-key lock; when it cannot be taken
+    (Redis unreachable) the unique key decides and the loser replays."""
+    if key is None:
+        return schema.model_validate(await create(commit=True))
+
+    user_id = user.id  # a rollback below expires the user
+    fingerprint = request_hash(request, payload)
+    async with distributed_lock(
+        f"idempotency:{user_id}:{key}", IDEMPOTENCY_LOCK_TIMEOUT, wait=IDEMPOTENCY_LOCK_WAIT
+    ):
+        stored = await stored_response(db, user_id, key, fingerprint)
+        if stored is not None:
+            return stored
+
+        record = IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            request_hash=fingerprint,
+            status_code=status_code,
+            response_body="",
+            expires_at=utcnow() + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+        )
+        db.add(record)
+        try:
+            # MySQL makes a duplicate insert wait for the holder's commit
+            await db.flush()
+        except IntegrityError:
+            await db.rollback()
+            stored = await stored_response(db, user_id, key, fingerprint)
+            if stored is None:
+                # The holder rolled back, the key is free again
+                raise IDEMPOTENCY_KEY_IN_PROGRESS
+            return stored
+
+        try:
+            row = await create(commit=False)
+            response = schema.model_validate(row)
+            record.response_body = orjson.dumps(response.model_dump(mode="json")).decode()
+            await db.commit()
+        except BaseException:
+            # Neither the row nor the key, so the request can be retried
+            await db.rollback()
+            raise
+        await created(db, row)
+        return response
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+from fastapi import Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_time_ns: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # phase name -> accumulated nanoseconds
+    phases: dict[str, int] = field(default_factory=dict)
+    endpoint_done_ns: int = 0
+
+    @property
+    def db_time(self) -> float:
+        return self.db_time_ns / 1e9
+
+
+# Holds the stats object of the request being served. Middleware sets a fresh
+# object and the hooks below mutate it, so concurrent requests never mix.
+current_stats: ContextVar[RequestStats | None] = ContextVar("current_stats", default=None)
+
+
+def ensure_request_stats() -> tuple[RequestStats, Token | None]:
+    # Outer middlewares own the stats object; inner ones share it
+    stats = current_stats.get()
+    if stats is not None:
+        return stats, None
+    stats = RequestStats()
+    return stats, current_stats.set(stats)
+
+
+@contextmanager
+def timed(phase: str):
+    stats = current_stats.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        stats.phases[phase] = stats.phases.get(phase, 0) + time.perf_counter_ns() - start
+
+
+# The start time lives on the statement's execution context, which is
+# discarded with it, so a failed statement leaves nothing behind on the
+# pooled connection.
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_ns = time.perf_counter_ns()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter_ns() - context._query_start_ns
+    stats = current_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_time_ns += elapsed
+
+
+def instrument_engine(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def record_cache_status(stats: RequestStats, headers: Mapping[str, str]):
+    # fastapi-cache marks every response served by a @cache endpoint
+    cache_status = headers.get("x-fastapi-cache")
+    if cache_status == "HIT":
+        stats.cache_hits += 1
+    elif cache_status == "MISS":
+        stats.cache_misses += 1
+
+
+def server_timing(stats: RequestStats, total_ns: int) -> str:
+    entries = [f"{phase};dur={duration / 1e6:.3f}" for phase, duration in stats.phases.items()]
+    if stats.db_queries:
+        entries.append(f'db;dur={stats.db_time_ns / 1e6:.3f};desc="{stats.db_queries} queries"')
+    entries.append(f"total;dur={total_ns / 1e6:.3f}")
+    return ", ".join(entries)
+
+
+class TimedRoute(APIRoute):
+    """Route class that times response serialization: everything the route
+    handler does after the endpoint function has returned."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        endpoint_call = self.dependant.call
+        if not asyncio.iscoroutinefunction(endpoint_call):
+            return
+
+        async def timed_call(**values):
+            try:
+                result = await endpoint_call(**values)
+            finally:
+                stats = current_stats.get()
+                if stats is not None:
+                    stats.endpoint_done_ns = time.perf_counter_ns()
+            if isinstance(result, Response):
+                # FastAPI only copies the headers set on injected responses
+                # (fastapi-cache's X-FastAPI-Cache) onto responses it builds
+                for value in values.values():
+                    if isinstance(value, Response) and value is not result:
+                        result.headers.raw.extend(value.headers.raw)
+            return result
+
+        self.dependant.call = timed_call
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request):
+            response = await route_handler(request)
+            stats = current_stats.get()
+            if stats is not None and stats.endpoint_done_ns:
+                stats.phases["serialize"] = time.perf_counter_ns() - stats.endpoint_done_ns
+            return response
+
+        return timed_route_handler
@@ -0,0 +1,29 @@
+from .scheduler import scheduler
+from .tasks import cleanup_expired_tokens, purge_idempotency_keys, purge_sync_tombstones
+from .mailer import send_pending_emails
+from .services.exchange_services import refresh_exchange_rates
+
+
+@scheduler.job("cleanup_expired_tokens", every=60 * 60 * 24)  # 24 hours
+async def cleanup_tokens():
+    await cleanup_expired_tokens()
+
+
+@scheduler.job("purge_sync_tombstones", every=60 * 60 * 24)  # 24 hours
+async def purge_tombstones():
+    await purge_sync_tombstones()
+
+
+@scheduler.job("purge_idempotency_keys", every=60 * 60)  # 1 hour
+async def purge_idempotency():
+    await purge_idempotency_keys()
+
+
+@scheduler.job("refresh_exchange_rates", every=60 * 30)  # 30 minutes
+async def refresh_rates():
+    await refresh_exchange_rates()
+
+
+@scheduler.job("send_pending_emails", every=5, jitter=1)
+async def send_emails():
+    await send_pending_emails()
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from redis.exceptions import LockError, RedisError
+
+from .config.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_local_locks: dict[str, asyncio.Lock] = {}
+_local_lock_users: dict[str, int] = {}
+
+
+@asynccontextmanager
+async def distributed_lock(name: str, timeout: float, wait: float = 0):
+    """Lock shared by every worker through Redis (process-local without
+    Redis). Yields whether it was acquired, after waiting up to `wait`
+    seconds for a holder to release it; the Redis key expires after
+    `timeout` seconds so a crashed holder cannot keep it forever."""
+    redis = get_redis()
+    if redis is None:
+        lock = _local_locks.setdefault(name, asyncio.Lock())
+        _local_lock_users[name] = _local_lock_users.get(name, 0) + 1
+        try:
+            if lock.locked() and not wait:
+                yield False
+                return
+            try:
+                await asyncio.wait_for(lock.acquire(), wait or None)
+            except asyncio.TimeoutError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                lock.release()
+        finally:
+            # Per-key names (idempotency keys) would otherwise pile up
+            _local_lock_users[name] -= 1
+            if not _local_lock_users[name]:
+                del _local_lock_users[name], _local_locks[name]
+        return
+
+    lock = redis.lock(f"lock:{name}", timeout=timeout, blocking=bool(wait), blocking_timeout=wait or None)
+    try:
+        acquired = await lock.acquire()
+    except RedisError:
+        logger.warning(f"Could not reach Redis to acquire lock {name}", exc_info=True)
+        acquired = False
+    if not acquired:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        try:
+            await lock.release()
+        except (LockError, RedisError):
+            # Expired or taken over meanwhile; nothing left to release
+            logger.warning(f"Lock {name} was lost before release")
@@ -0,0 +1,159 @@
+from __future__ import annotations
+import asyncio
+import datetime
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config.settings import settings
+from .dependencies import get_async_db
+from .locks import distributed_lock
+from .metrics import outbound_email_queue_depth, outbound_emails_total
+from .models.outbound_email_model import OutboundEmail
+
+if TYPE_CHECKING:
+    from aiosmtplib import SMTP
+
+logger = logging.getLogger(__name__)
+
+MAIL_BATCH_SIZE = 50
+MAIL_MAX_ATTEMPTS = 6
+MAIL_RETRY_DELAY = 30  # seconds, doubled on every attempt
+MAIL_MAX_RETRY_DELAY = 60 * 60  # 1 hour
+MAIL_POOL_SIZE = 2
+MAIL_CONNECTION_IDLE_TIMEOUT = 60  # servers drop idle clients, reconnect instead
+MAIL_LOCK_TIMEOUT = 60 * 5  # 5 minutes
+
+
+def enqueue_email(db: AsyncSession, recipient: str, subject: str, body: str, subtype: str = "html") -> OutboundEmail:
+    # Added to the caller's transaction: the mail is only queued if it commits
+    email = OutboundEmail(recipient=recipient, subject=subject, body=body, subtype=subtype)
+    db.add(email)
+    return email
+
+
+def retry_delay(attempts: int) -> float:
+    return min(MAIL_RETRY_DELAY * 2 ** (attempts - 1), MAIL_MAX_RETRY_DELAY)
+
+
+class SMTPPool:
+    """Keeps up to `size` SMTP connections open between batches."""
+
+    def __init__(self, size: int = MAIL_POOL_SIZE):
+        self.size = size
+        self._idle: list[tuple[SMTP, float]] = []
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def _connect(self) -> SMTP:
+        from aiosmtplib import SMTP
+
+        smtp = SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            validate_certs=settings.VALIDATE_CERTS,
+            username=settings.MAIL_USERNAME if settings.USE_CREDENTIALS else None,
+            password=settings.MAIL_PASSWORD if settings.USE_CREDENTIALS else None,
+        )
+        await smtp.connect()
+        return smtp
+
+    @asynccontextmanager
+    async def connection(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        async with self._semaphore:
+            smtp = None
+            while self._idle and smtp is None:
+                candidate, last_used = self._idle.pop()
+                if candidate.is_connected and time.monotonic() - last_used < MAIL_CONNECTION_IDLE_TIMEOUT:
+                    smtp = candidate
+                else:
+                    candidate.close()
+            if smtp is None:
+                smtp = await self._connect()
+            try:
+                yield smtp
+            except BaseException:
+                smtp.close()
+                raise
+            self._idle.append((smtp, time.monotonic()))
+
+    async def close(self):
+        while self._idle:
+            smtp, _ = self._idle.pop()
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+
+smtp_pool = SMTPPool()
+
+
+async def deliver(pool: SMTPPool, email: OutboundEmail):
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = email.recipient
+    message["Subject"] = email.subject
+    message.set_content(email.body, subtype=email.subtype)
+    async with pool.connection() as smtp:
+        await smtp.send_message(message)
+
+
+async def send_pending_emails(pool: SMTPPool = smtp_pool, batch_size: int = MAIL_BATCH_SIZE) -> int:
+    # One worker drains the queue at a time so no message is sent twice
+    async with distributed_lock("send_pending_emails", MAIL_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            return 0
+
+        sent = 0
+        async for db in get_async_db():
+            async with db as session:
+                while True:
+                    now = datetime.datetime.now()
+                    result = await session.execute(
+                        select(OutboundEmail)
+                        .where(OutboundEmail.status == "pending", OutboundEmail.next_attempt_at <= now)
+                        .order_by(OutboundEmail.next_attempt_at, OutboundEmail.id)
+                        .limit(batch_size)
+                    )
+                    emails = result.scalars().all()
+                    if not emails:
+                        break
+
+                    # Messages share the pooled connections, pool size at a time
+                    outcomes = await asyncio.gather(
+                        *(deliver(pool, email) for email in emails), return_exceptions=True
+                    )
+                    for email, outcome in zip(emails, outcomes):
+                        email.attempts += 1
+                        if isinstance(outcome, BaseException):
+                            email.last_error = repr(outcome)
+                            if email.attempts >= MAIL_MAX_ATTEMPTS:
+                                email.status = "failed"
+                                outbound_emails_total.inc("failed")
+                                logger.error(f"Giving up on outbound email {email.id}: {outcome!r}")
+                            else:
+                                email.next_attempt_at = now + datetime.timedelta(seconds=retry_delay(email.attempts))
+                                outbound_emails_total.inc("retry")
+                        else:
+                            email.status = "sent"
+                            email.sent_at = now
+                            sent += 1
+                            outbound_emails_total.inc("sent")
+                    await session.commit()
+                    if len(emails) < batch_size:
+                        break
+
+                depth = await session.scalar(
+                    select(func.count()).select_from(OutboundEmail).where(OutboundEmail.status == "pending")
+                )
+                outbound_email_queue_depth.set(value=depth)
+        return sent
@@ -1,16 +1,27 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from fastapi_utils.tasks import repeat_every
 from contextlib import asynccontextmanager
 
-from redis import asyncio as aioredis
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
-
-from .config.settings import settings
-from .middleware import add_process_time_header, global_exception_handler
-from .tasks import cleanup_expired_tokens
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from .config.redis import get_redis
+from .cache import InstrumentedBackend, ORJSONCoder, SingleFlightBackend, user_key_builder
+from .middleware import (
+    CompressionMiddleware,
+    ETagMiddleware,
+    ServerTimingMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    global_exception_handler,
+)
+from .jobs import scheduler
+from .mailer import smtp_pool
+from .events import event_hub
+from .services.exchange_services import close_bcra_client
 
 from .routers.auth import auth
 from .routers.user import user
@@ -19,30 +30,54 @@ from .routers.categories import categories
 from .routers.expenses import expenses
 from .routers.user_balance import balance
 from .routers.exchange import exchange
+from .routers.metrics import metrics
+from .routers.well_known import well_known
+from .routers.sync import sync
+from .routers.events import events
+from .routers.batch import batch
+from .routers.transactions import transactions
 
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    redis = aioredis.from_url(settings.REDIS_URL)
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
-
-    @repeat_every(seconds=60 * 60 * 24)  # 24 hours
-    async def schedule_cleanup():
-        await cleanup_expired_tokens()
-    await schedule_cleanup() # Run once at startup
+    # Startup only wires things up: engines and connections are created on
+    # first use and scheduled jobs run in the background
+    redis = get_redis()
+    backend = RedisBackend(redis) if redis is not None else InMemoryBackend()
+    FastAPICache.init(
+        InstrumentedBackend(SingleFlightBackend(backend, redis)),
+        prefix="fastapi-cache",
+        coder=ORJSONCoder,
+        key_builder=user_key_builder,
+    )
+    scheduler.start()
     yield
     # Shutdown
+    await scheduler.stop()
+    await smtp_pool.close()
+    await event_hub.close()
+    await close_bcra_client()
 
 
-app = FastAPI(title="InFinity Managment", version="0.1.0", lifespan=lifespan)
+app = FastAPI(
+    title="InFinity Managment",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 origins = [
     "http://localhost:3000",
     "http://localhost:8080",
 ]
 
+# ETags of conditional GETs (see conditional.py)
+app.add_middleware(ETagMiddleware)
+
+# gzip/brotli Compression Middleware
+app.add_middleware(CompressionMiddleware)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -52,19 +87,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Process Time Header Middleware
-app.middleware("http")(add_process_time_header)
+# Server-Timing Header Middleware
+app.add_middleware(ServerTimingMiddleware)
+
+# Metrics Middleware (exported on /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in Profiling Middleware (X-Profile-Token header or PROFILING_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
 
 # Global Exception Handler
 app.exception_handler(Exception)(global_exception_handler)
 
 app.include_router(auth, prefix="/auth", tags=["Auth"])
 app.include_router(balance, prefix="/user", tags=["Balance"])
+# Before the user router, whose /{user_id} would match /events
+app.include_router(events, prefix="/user", tags=["Events"])
 app.include_router(user, prefix="/user", tags=["User"])
 app.include_router(incomes, prefix="/incomes", tags=["Incomes"])
 app.include_router(categories, prefix="/categories", tags=["Categories"])
 app.include_router(expenses, prefix="/expenses", tags=["Expenses"])
 app.include_router(exchange, prefix="/exchange", tags=["Exchange"])
+app.include_router(metrics, prefix="/metrics", tags=["Metrics"])
+app.include_router(well_known, prefix="/.well-known", tags=["Auth"])
+app.include_router(sync, prefix="/sync", tags=["Sync"])
+app.include_router(batch, prefix="/batch", tags=["Batch"])
+app.include_router(transactions, prefix="/transactions", tags=["Transactions"])
 
 
 @app.get("/", tags=["Root"])
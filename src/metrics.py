@@ -0,0 +1,160 @@
+from bisect import bisect_left
+from math import inf
+
+# Metrics are only ever updated from the event loop thread, so plain dict and
+# int operations are enough: no locks are taken on the request path.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(labelnames: tuple[str, ...], labelvalues: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        for labelvalues, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, *labelvalues: str, value: float):
+        self._values[labelvalues] = value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (inf,)
+        # labelvalues -> [per-bucket counts..., sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        series = self._values.get(labelvalues)
+        if series is None:
+            series = self._values[labelvalues] = [0] * len(self.buckets) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._values.get(labelvalues)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        for labelvalues, series in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(series[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Total HTTP requests.", ("method", "route", "status"),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route"),
+))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+http_request_db_duration_seconds = registry.register(Histogram(
+    "http_request_db_duration_seconds", "Time spent executing SQL per request.", ("method", "route"),
+))
+cache_requests_total = registry.register(Counter(
+    "cache_requests_total", "Lookups on @cache endpoints by result.", ("route", "result"),
+))
+bcra_fetch_duration_seconds = registry.register(Histogram(
+    "bcra_fetch_duration_seconds", "Latency of BCRA exchange rate fetches.", ("outcome",),
+))
+background_task_duration_seconds = registry.register(Histogram(
+    "background_task_duration_seconds", "Duration of background task runs.", ("task", "outcome"),
+    buckets=LATENCY_BUCKETS + (30.0, 60.0, 300.0),
+))
+outbound_email_queue_depth = registry.register(Gauge(
+    "outbound_email_queue_depth", "Outbound emails waiting to be sent.",
+))
+outbound_emails_total = registry.register(Counter(
+    "outbound_emails_total", "Outbound email delivery attempts by result.", ("result",),
+))
+rate_limited_requests_total = registry.register(Counter(
+    "rate_limited_requests_total", "Requests rejected with 429 by rate limit.", ("limit",),
+))
+scheduler_job_runs_total = registry.register(Counter(
+    "scheduler_job_runs_total", "Scheduled job runs by result.", ("job", "result"),
+))
+circuit_breaker_state = registry.register(Gauge(
+    "circuit_breaker_state", "Circuit breaker state (0 closed, 1 open, 2 half open).", ("name",),
+))
+circuit_breaker_rejections_total = registry.register(Counter(
+    "circuit_breaker_rejections_total", "Calls rejected while a circuit breaker was open.", ("name",),
+))
+event_streams_open = registry.register(Gauge(
+    "event_streams_open", "Server-sent event streams open on this worker.",
+))
+event_stream_resyncs_total = registry.register(Counter(
+    "event_stream_resyncs_total", "Event streams told to resync after falling behind or losing Redis.",
+))
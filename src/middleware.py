@@ -1,16 +1,256 @@
+import asyncio
+import gzip
+import hmac
 import time
 import logging
+import random
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only without it
+    brotli = None
+
+from .conditional import ETAG_CACHE_CONTROL, encoded_etag
+from .config.settings import settings
+from .instrumentation import current_stats, ensure_request_stats, record_cache_status, server_timing
+from .profiling import StackSampler
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+class ServerTimingMiddleware:
+    # Emits a Server-Timing header with the auth, cache, DB and serialization
+    # phases recorded for the request, plus the legacy X-Process-Time header.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, stats_token = ensure_request_stats()
+        start_time = time.perf_counter_ns()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total_ns = time.perf_counter_ns() - start_time
+                message["headers"] = list(message.get("headers", ())) + [
+                    (b"server-timing", server_timing(stats, total_ns).encode()),
+                    (b"x-process-time", str(total_ns / 1e9).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if stats_token is not None:
+                current_stats.reset(stats_token)
+
+
+def _should_profile(headers: Headers) -> bool:
+    profile_token = headers.get("x-profile-token")
+    if profile_token and settings.PROFILING_TOKEN:
+        return hmac.compare_digest(profile_token, settings.PROFILING_TOKEN)
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+class ProfilingMiddleware:
+    # Profiles requests that send the X-Profile-Token or fall in
+    # PROFILING_SAMPLE_RATE, up to the response start; the others pass
+    # straight through. The sampler reads the event loop thread, so the
+    # stacks of requests running at the same time end up in the same
+    # artifact: profile on an otherwise idle instance for a clean flamegraph.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+
+        stats, stats_token = ensure_request_stats()
+        sampler = StackSampler()
+        sampler.start()
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total_time = time.perf_counter() - start_time
+                sampler.stop()
+                headers = MutableHeaders(raw=list(message.get("headers", ())))
+                record_cache_status(stats, headers)
+                headers["X-Profile"] = (
+                    f"total={total_time * 1000:.2f}ms; db={stats.db_time * 1000:.2f}ms; "
+                    f"queries={stats.db_queries}; cache_hits={stats.cache_hits}; "
+                    f"cache_misses={stats.cache_misses}; samples={sampler.sample_count}"
+                )
+                if settings.PROFILING_OUTPUT_DIR:
+                    headers["X-Profile-Artifact"] = await asyncio.to_thread(
+                        sampler.dump, settings.PROFILING_OUTPUT_DIR, scope["method"], scope["path"]
+                    )
+                message["headers"] = headers.raw
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            if stats_token is not None:
+                current_stats.reset(stats_token)
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: unlike @app.middleware("http") it does not spawn a
+    # task per request, which keeps the per-request overhead in microseconds.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, stats_token = ensure_request_stats()
+
+        status_code = 500
+        cache_status = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, cache_status
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"x-fastapi-cache":
+                        cache_status = value.decode().lower()
+            await send(message)
+
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            if stats_token is not None:
+                current_stats.reset(stats_token)
+            route = scope.get("route")
+            # Label by route template, never by raw path, to keep cardinality bounded
+            route_path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            metrics.http_requests_total.inc(method, route_path, str(status_code))
+            metrics.http_request_duration_seconds.observe(elapsed, method, route_path)
+            metrics.http_request_db_queries.observe(stats.db_queries, method, route_path)
+            metrics.http_request_db_duration_seconds.observe(stats.db_time, method, route_path)
+            if cache_status:
+                metrics.cache_requests_total.inc(route_path, cache_status)
+
+
+class ETagMiddleware:
+    # Puts the ETag computed by the conditional_get dependency on successful
+    # responses, replacing the weak, per-process one fastapi-cache sets.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                etag = scope.get("state", {}).get("etag")
+                if etag:
+                    headers = MutableHeaders(raw=list(message.get("headers", ())))
+                    headers["ETag"] = etag
+                    headers["Cache-Control"] = ETAG_CACHE_CONTROL
+                    message["headers"] = headers.raw
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # fast enough for per-request use, still well ahead of gzip
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and (
+        content_type.startswith(("application/json", "text/")) or "+json" in content_type
+    )
+
+
+class CompressionMiddleware:
+    # Compresses complete responses of at least minimum_size bytes with
+    # brotli when installed and accepted, else gzip. Streamed responses
+    # (more_body) pass through untouched so events are not held back.
+    def __init__(self, app, minimum_size: int | None = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, started
+            if started:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            started = True
+            headers = MutableHeaders(raw=list(start_message.get("headers", ())))
+            body = message.get("body", b"")
+            if _compressible(headers):
+                headers.add_vary_header("Accept-Encoding")
+                if not message.get("more_body", False) and len(body) >= self.minimum_size:
+                    if encoding == "br":
+                        body = brotli.compress(body, quality=BROTLI_QUALITY)
+                    else:
+                        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    if "etag" in headers:
+                        headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                    message = {"type": "http.response.body", "body": body}
+            start_message["headers"] = headers.raw
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
 
 async def global_exception_handler(request: Request, exc: Exception):
@@ -4,6 +4,7 @@ from .incomes_model import IncomeModel
 from .expenses_model import ExpenseModel
 from .history_model import HistoryModel
 from .token_denylist_model import TokenDenylist
+from .outbound_email_model import OutboundEmail
 
 __all__ = [
     "UserModel",
@@ -12,4 +13,5 @@ __all__ = [
     "ExpenseModel",
     "HistoryModel",
     "TokenDenylist",
+    "OutboundEmail",
 ]
\ No newline at end of file
@@ -1,15 +1,23 @@
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship, Mapped ,mapped_column
+from datetime import datetime
 from ..config.database import base
+from .types import PreciseDateTime, utcnow
 
 
 class CategoryModel(base):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     type: Mapped[str] = mapped_column(String(255), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    # Change tracking for /sync: set on every write, deletes are tombstones
+    updated_at: Mapped[datetime] = mapped_column(PreciseDateTime, nullable=False, default=utcnow)
+    deleted_at: Mapped[datetime | None] = mapped_column(PreciseDateTime, nullable=True)
     
     user = relationship("UserModel", back_populates="categories")
     incomes = relationship("IncomeModel", back_populates="category")
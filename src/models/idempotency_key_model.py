@@ -0,0 +1,20 @@
+from sqlalchemy import ForeignKey, Integer, String, Text, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from ..config.database import base
+
+
+class IdempotencyKey(base):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    # sha256 of the method, path and body, a key reused for another request is rejected
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    response_body: Mapped[str] = mapped_column(Text, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -1,15 +1,30 @@
-from sqlalchemy import ForeignKey, Integer, String, DateTime
+from sqlalchemy import ForeignKey, Index, Integer, String, DateTime
 from sqlalchemy.orm import relationship, Mapped, mapped_column
+from datetime import datetime
+from decimal import Decimal
 from ..config.database import base
+from .types import Money, PreciseDateTime, utcnow
 
 class IncomeModel(base):
     __tablename__ = 'incomes'
+    __table_args__ = (
+        # Serves date-filtered listings and, since it also carries amount
+        # and the tombstone, the balance SUM as an index-only scan
+        Index("ix_incomes_user_id_date", "user_id", "date", "amount", "deleted_at"),
+        Index("ix_incomes_user_id_category_id_date", "user_id", "category_id", "date"),
+        Index("ix_incomes_user_id_updated_at", "user_id", "updated_at"),
+        # /transactions/search on MySQL; SQLite uses the FTS5 table in search_index.py
+        Index("ix_incomes_description_fulltext", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Money, nullable=False)
     description: Mapped[str] = mapped_column(String(255), nullable=True)
-    date: Mapped[int] = mapped_column(DateTime, nullable=False)
+    date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     category_id: Mapped[int] = mapped_column(Integer, ForeignKey('categories.id'), nullable=False, index=True)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
+    # Change tracking for /sync: set on every write, deletes are tombstones
+    updated_at: Mapped[datetime] = mapped_column(PreciseDateTime, nullable=False, default=utcnow)
+    deleted_at: Mapped[datetime | None] = mapped_column(PreciseDateTime, nullable=True)
     
     user = relationship("UserModel", back_populates="incomes")
     category = relationship("CategoryModel", back_populates="incomes")
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import Index, Integer, String, Text, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from ..config.database import base
+
+
+class OutboundEmail(base):
+    __tablename__ = 'outbound_emails'
+    __table_args__ = (
+        # The mail worker polls for due pending messages
+        Index("ix_outbound_emails_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    recipient: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    subtype: Mapped[str] = mapped_column(String(10), nullable=False, default="html")
+    status: Mapped[str] = mapped_column(String(10), nullable=False, default="pending")  # pending, sent, failed
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
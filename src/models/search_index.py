@@ -0,0 +1,77 @@
+import sqlite3
+from functools import lru_cache
+
+from sqlalchemy import DDL, event, text
+
+from ..config.database import base
+
+# SQLite has no FULLTEXT index: descriptions are mirrored into an FTS5 table
+# by the income and expense write services, and filled from the ledger when
+# the table is created. The owner column holds "u<user id>", so a search
+# only walks the postings of the caller's own rows.
+FTS_TABLE = "transactions_fts"
+FTS_KINDS = ("income", "expense")
+FTS_SOURCES = {"income": "incomes", "expense": "expenses"}
+
+
+@lru_cache
+def fts5_available() -> bool:
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+def fts_rowid(kind: str, row_id: int) -> int:
+    # Incomes and expenses share the table, their ids are interleaved
+    return row_id * len(FTS_KINDS) + FTS_KINDS.index(kind)
+
+
+def from_fts_rowid(rowid: int) -> tuple[str, int]:
+    row_id, kind = divmod(rowid, len(FTS_KINDS))
+    return FTS_KINDS[kind], row_id
+
+
+def uses_fts(connection) -> bool:
+    return connection.dialect.name == "sqlite" and fts5_available()
+
+
+def fill_fts_index(connection, after_user_id: int = 0):
+    """Indexes the live rows of the users after `after_user_id`, which were
+    written without the services: before the table existed, or bulk loaded."""
+    if not uses_fts(connection):
+        return
+    for kind, table in FTS_SOURCES.items():
+        connection.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, owner, description) "
+                f"SELECT id * {len(FTS_KINDS)} + {FTS_KINDS.index(kind)}, 'u' || user_id, description FROM {table} "
+                "WHERE user_id > :after_user_id AND deleted_at IS NULL AND description IS NOT NULL"
+            ),
+            {"after_user_id": after_user_id},
+        )
+
+
+@event.listens_for(base.metadata, "after_create")
+def _create_fts_table(target, connection, **kw):
+    if not uses_fts(connection):
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first()
+    if exists:
+        return
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} "
+        "USING fts5(owner, description, tokenize = 'unicode61 remove_diacritics 2')"
+    ))
+    fill_fts_index(connection)
+
+
+event.listen(base.metadata, "before_drop", DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(
+    callable_=lambda ddl, target, bind, **kw: uses_fts(bind)
+))
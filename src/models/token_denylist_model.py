@@ -8,4 +8,4 @@ class TokenDenylist(base):
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
     jti: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
-    exp: Mapped[int] = mapped_column(Integer, nullable=False)
+    exp: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
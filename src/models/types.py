@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from sqlalchemy import BigInteger, DateTime
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
+
+# Amounts are stored as integer minor units (cents), so sums are exact on
+# every backend and no per-row float conversion happens in the driver.
+CURRENCY_SCALE = 2
+
+
+class Money(TypeDecorator):
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+        return int(value.scaleb(CURRENCY_SCALE).to_integral_value(ROUND_HALF_EVEN))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Decimal(int(value)).scaleb(-CURRENCY_SCALE)
+
+
+# Change tracking timestamps: microseconds on MySQL too, whose DATETIME
+# otherwise keeps whole seconds
+PreciseDateTime = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def utcnow() -> datetime:
+    # Naive UTC, unlike the local time used elsewhere: sync cursors compare
+    # these and must not see them jump back when DST ends
+    return datetime.now(timezone.utc).replace(tzinfo=None)
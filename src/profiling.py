@@ -0,0 +1,50 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class StackSampler:
+    """Samples the stack of the thread that created it (the event loop thread)
+    from a background thread and aggregates the samples in folded format, the
+    input expected by flamegraph.pl and speedscope."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._target_thread = threading.get_ident()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def dump(self, output_dir: str, method: str, path: str) -> str:
+        os.makedirs(output_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+        filename = f"{int(time.time() * 1000)}-{method.lower()}-{slug}.folded"
+        with open(os.path.join(output_dir, filename), "w") as artifact:
+            for stack, count in self.samples.most_common():
+                artifact.write(f"{stack} {count}\n")
+        return filename
@@ -0,0 +1,139 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from .config.redis import get_redis
+from .config.settings import settings
+from .exceptions.http_errors import too_many_requests
+from .metrics import rate_limited_requests_total
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 60 * 60, "day": 60 * 60 * 24}
+
+
+@dataclass(frozen=True)
+class Rate:
+    capacity: int
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        # "5/minute": bursts of 5, refilled evenly over a minute
+        amount, _, period = value.partition("/")
+        return cls(int(amount), int(amount) / PERIODS[period.strip()])
+
+
+class MemoryBackend:
+    """Token buckets in this process. The least recently used buckets are
+    dropped past max_keys, which only ever makes a limit more lenient."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, rate: Rate) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (rate.capacity, now))
+        tokens = min(rate.capacity, tokens + (now - updated_at) * rate.refill_per_second)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate.refill_per_second
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def reset(self):
+        self._buckets.clear()
+
+
+# Refill, take a token and expire idle buckets in one atomic step, on the
+# Redis clock so every worker agrees on the time
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisBackend:
+    """Cluster-wide buckets. Falls back to the process-local ones while
+    Redis is unreachable."""
+
+    def __init__(self, redis, fallback: MemoryBackend):
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self._fallback = fallback
+
+    async def acquire(self, key: str, rate: Rate) -> float:
+        try:
+            return float(await self._script(keys=[key], args=[rate.capacity, rate.refill_per_second]))
+        except RedisError:
+            logger.warning("Rate limiting with local buckets, Redis is unreachable", exc_info=True)
+            return await self._fallback.acquire(key, rate)
+
+    def reset(self):
+        self._fallback.reset()
+
+
+class RateLimiter:
+    def __init__(self):
+        self._memory = MemoryBackend()
+        self._backend: MemoryBackend | RedisBackend | None = None
+        self._rates: dict[str, Rate] = {}
+
+    @property
+    def backend(self) -> MemoryBackend | RedisBackend:
+        if self._backend is None:
+            redis = get_redis() if settings.RATE_LIMIT_BACKEND != "memory" else None
+            self._backend = RedisBackend(redis, self._memory) if redis is not None else self._memory
+        return self._backend
+
+    def rate(self, name: str) -> Rate | None:
+        if name not in self._rates and name in settings.RATE_LIMITS:
+            self._rates[name] = Rate.parse(settings.RATE_LIMITS[name])
+        return self._rates.get(name)
+
+    async def hit(self, name: str, request: Request, *identities: str | None):
+        """Takes a token from the route's bucket for the client IP and for
+        each identity (username, email). Raises 429 when one is empty."""
+        rate = self.rate(name)
+        if not settings.RATE_LIMIT_ENABLED or rate is None:
+            return
+
+        keys = [f"ratelimit:{name}:ip:{request.client.host if request.client else 'unknown'}"]
+        keys += [f"ratelimit:{name}:id:{identity.lower()}" for identity in identities if identity]
+        for key in keys:
+            retry_after = await self.backend.acquire(key, rate)
+            if retry_after > 0:
+                rate_limited_requests_total.inc(name)
+                raise too_many_requests(math.ceil(retry_after))
+
+    def reset(self):
+        self._memory.reset()
+        self._backend = None
+        self._rates.clear()
+
+
+rate_limiter = RateLimiter()
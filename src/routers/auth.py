@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
@@ -19,10 +19,13 @@ from ..exceptions.http_errors import USER_NOT_FOUND, WRONG_PASSWORD
 
 from ..services import user_services, auth_services
 from ..services.password_services import PasswordService
+from ..services.token_services import TokenService, get_token_service
+from ..instrumentation import TimedRoute
+from ..ratelimit import rate_limiter
 
 
 
-auth = APIRouter()
+auth = APIRouter(route_class=TimedRoute)
 
 
 @auth.post(
@@ -32,9 +35,12 @@ auth = APIRouter()
     description="Logs in a user and returns an access and refresh token.",
 )
 async def login_for_tokens(
+    request: Request,
     formdata: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: AsyncSession = Depends(get_async_db),
+    tokens: TokenService = Depends(get_token_service),
 ):
+    await rate_limiter.hit("login", request, formdata.username)
     user = await user_services.get_user(db, formdata.username)
     if not user:
         raise USER_NOT_FOUND
@@ -51,8 +57,8 @@ async def login_for_tokens(
         issued_at=datetime.datetime.now(),
     )
 
-    access_token = auth_services.create_access_token(token_data)
-    refresh_token = auth_services.create_refresh_token(token_data)
+    access_token = auth_services.create_access_token(token_data, tokens)
+    refresh_token = auth_services.create_refresh_token(token_data, tokens)
 
     return Token(
         access_token=access_token, refresh_token=refresh_token, token_type="bearer"
@@ -68,8 +74,9 @@ async def login_for_tokens(
 async def refresh_access_token(
     refresh_token_request: RefreshTokenRequest,
     db: AsyncSession = Depends(get_async_db),
+    tokens: TokenService = Depends(get_token_service),
 ):
-    new_token = await auth_services.auth_refresh_token(refresh_token_request.refresh_token, db)
+    new_token = await auth_services.auth_refresh_token(refresh_token_request.refresh_token, db, tokens)
     return {"access_token": new_token, "token_type": "bearer"}
 
 
@@ -83,25 +90,32 @@ async def logout(
     logout_request: LogoutRequest,
     db: AsyncSession = Depends(get_async_db),
     token: str = Depends(auth_services.oauth_bearer),
+    tokens: TokenService = Depends(get_token_service),
 ):
-    await auth_services.add_token_to_denylist(db, logout_request.refresh_token)
-    await auth_services.add_token_to_denylist(db, token)
+    await auth_services.add_token_to_denylist(db, logout_request.refresh_token, tokens)
+    await auth_services.add_token_to_denylist(db, token, tokens)
     return {"detail": "Successfully logged out"}
 
 
 @auth.post("/forgot-password")
 async def forgot_password(
     request: ForgotPasswordRequest,
-    background_tasks: BackgroundTasks,
+    http_request: Request,
     db: AsyncSession = Depends(get_async_db),
+    tokens: TokenService = Depends(get_token_service),
 ):
-    await auth_services.request_password_reset(request.email, background_tasks, db)
+    await rate_limiter.hit("forgot_password", http_request, request.email)
+    await auth_services.request_password_reset(request.email, db, tokens)
     return {"detail": "Password reset email sent"}
 
 
 @auth.post("/reset-password")
 async def reset_password(
-    request: ResetPasswordRequest, db: AsyncSession = Depends(get_async_db)
+    request: ResetPasswordRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    tokens: TokenService = Depends(get_token_service),
 ):
-    await auth_services.reset_password(request.token, request.new_password, db)
+    await rate_limiter.hit("reset_password", http_request)
+    await auth_services.reset_password(request.token, request.new_password, db, tokens)
     return {"detail": "Password has been reset successfully"}
\ No newline at end of file
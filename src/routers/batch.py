@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..batch import run_batch
+from ..dependencies import get_async_db
+from ..instrumentation import TimedRoute
+from ..models.user_model import UserModel
+from ..schemas.batch_schema import BatchIn, BatchOut
+from ..services import auth_services
+
+batch = APIRouter(route_class=TimedRoute)
+
+
+@batch.post(
+    "",
+    response_model=BatchOut,
+    summary="Run several reads in one request",
+    description=(
+        "Runs GET requests for the user's own data (profile, balance, history, categories, incomes and "
+        "expenses) with one authentication. Each response carries its own status; one failing does not "
+        "fail the others."
+    ),
+)
+async def run(
+    batch_in: BatchIn,
+    request: Request,
+    current_user: UserModel = Depends(auth_services.auth_access_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return BatchOut(responses=await run_batch(request.app, db, current_user, batch_in.requests))
@@ -10,11 +10,15 @@ from ..exceptions.http_errors import (
     CATEGORY_NOT_FOUND,
     CATEGORY_CREATION_FAILED,
     CATEGORY_ALREADY_EXISTS,
+    CATEGORY_IN_USE,
 )
-from ..schemas.categories_schema import CategoriesIn, CategoriesOut
+from ..schemas.categories_schema import CategoriesIn, CategoriesOut, CategoriesOutList
 from ..models.user_model import UserModel
+from ..conditional import conditional_get
+from ..fields import FIELDS_QUERY, json_response, parse_fields, sparse_response
+from ..instrumentation import TimedRoute
 
-categories = APIRouter()
+categories = APIRouter(route_class=TimedRoute)
 
 
 @categories.post(
@@ -36,13 +40,20 @@ async def add_category(
         raise CATEGORY_CREATION_FAILED
 
 
-@categories.get("/", response_model=List[CategoriesOut])
+@categories.get(
+    "/", response_model=None, responses={200: {"model": List[CategoriesOut]}}, dependencies=[Depends(conditional_get)]
+)
 @cache(expire=3600)
 async def list_categories(
     db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(auth_services.auth_access_token),
+    fields: str | None = FIELDS_QUERY,
 ):
-    return await categories_services.get_categories(db, current_user)
+    columns = parse_fields(fields, CategoriesOut)
+    rows = await categories_services.get_categories(db, current_user, columns)
+    if columns:
+        return sparse_response(CategoriesOut, columns, rows)
+    return json_response(CategoriesOutList, rows)
 
 
 @categories.get("/{category_id}", response_model=CategoriesOut)
@@ -55,7 +66,7 @@ async def retrieve_category(
     category = await categories_services.get_category(db, category_id, current_user)
     if not category:
         raise CATEGORY_NOT_FOUND
-    return category
+    return CategoriesOut.model_validate(category)
 
 
 @categories.put("/{category_id}", response_model=CategoriesOut)
@@ -87,6 +98,8 @@ async def remove_category(
     db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(auth_services.auth_access_token),
 ):
+    if await categories_services.category_in_use(db, category_id, current_user):
+        raise CATEGORY_IN_USE
     category_to_delete = await categories_services.delete_category(
         db, category_id, current_user
     )
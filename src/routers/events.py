@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from ..events import event_stream
+from ..instrumentation import TimedRoute
+from ..models.user_model import UserModel
+from ..services import auth_services
+
+events = APIRouter(route_class=TimedRoute)
+
+
+@events.get(
+    "/events",
+    response_class=StreamingResponse,
+    summary="Stream balance and transaction updates",
+    description=(
+        "Server-sent events: income.* and expense.* carry the changed row (only the id for deletes), "
+        "balance carries the change to the balance since the last balance event, and resync asks the "
+        "client to refetch because it fell behind."
+    ),
+)
+async def stream_events(current_user: UserModel = Depends(auth_services.auth_access_token)):
+    # The session used for auth is released before the stream starts: an
+    # open stream holds no database connection
+    return StreamingResponse(
+        event_stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict, Any
 from ..services import exchange_services
+from ..instrumentation import TimedRoute
 
-exchange = APIRouter(prefix="/exchange", tags=["Exchange"])
+exchange = APIRouter(prefix="/exchange", tags=["Exchange"], route_class=TimedRoute)
 
 @exchange.get("/", response_model=List[Dict[str, Any]])
 async def get_exchange_rates():
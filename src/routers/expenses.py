@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Header, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List
@@ -12,25 +12,39 @@ from ..exceptions.http_errors import (
     EXPENSE_CREATION_FAILED,
     EXPENSE_UPDATE_FAILED,
 )
-from ..schemas.expenses_schema import ExpenseIn, ExpenseOut
+from ..schemas.expenses_schema import ExpenseIn, ExpenseOut, ExpenseOutList
 from ..models.user_model import UserModel
+from ..conditional import conditional_get
+from ..fields import FIELDS_QUERY, json_response, parse_fields, sparse_response
+from ..idempotency import run_once
+from ..instrumentation import TimedRoute
 
-expenses = APIRouter()
+expenses = APIRouter(route_class=TimedRoute)
 
 
 @expenses.post("/", response_model=ExpenseOut, status_code=status.HTTP_201_CREATED)
 async def add_expense(
     expense: ExpenseIn,
+    request: Request,
+    idempotency_key: str | None = Header(default=None, max_length=255),
     db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(auth_services.auth_access_token),
 ):
+    async def create(commit: bool):
+        return await expenses_services.create_expense(db, expense, current_user, commit=commit)
+
     try:
-        return await expenses_services.create_expense(db, expense, current_user)
+        return await run_once(
+            db, current_user, idempotency_key, request, expense,
+            create, expenses_services.expense_created, ExpenseOut, status.HTTP_201_CREATED,
+        )
     except IntegrityError:
         raise EXPENSE_CREATION_FAILED
 
 
-@expenses.get("/", response_model=List[ExpenseOut])
+@expenses.get(
+    "/", response_model=None, responses={200: {"model": List[ExpenseOut]}}, dependencies=[Depends(conditional_get)]
+)
 @cache(expire=3600)
 async def list_expenses(
     db: AsyncSession = Depends(get_async_db),
@@ -39,10 +53,15 @@ async def list_expenses(
     to_date: date | None = Query(default=None),
     skip: int = 0,
     limit: int = 100,
+    fields: str | None = FIELDS_QUERY,
 ):
-    return await expenses_services.get_expenses(
-        db, current_user, from_date, to_date, skip, limit
+    columns = parse_fields(fields, ExpenseOut)
+    rows = await expenses_services.get_expenses(
+        db, current_user, from_date, to_date, skip, limit, columns
     )
+    if columns:
+        return sparse_response(ExpenseOut, columns, rows)
+    return json_response(ExpenseOutList, rows)
 
 
 @expenses.get("/{expense_id}", response_model=ExpenseOut)
@@ -55,7 +74,7 @@ async def retrieve_expense(
     expense = await expenses_services.get_expense_by_id(db, expense_id, current_user)
     if not expense:
         raise EXPENSE_NOT_FOUND
-    return expense
+    return ExpenseOut.model_validate(expense)
 
 
 @expenses.put("/{expense_id}", response_model=ExpenseOut)
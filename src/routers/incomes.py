@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 from fastapi_cache.decorator import cache
 
-from ..schemas.incomes_schema import IncomeIn, IncomeOut
+from ..schemas.incomes_schema import IncomeIn, IncomeOut, IncomeOutList
 from ..models.user_model import UserModel
 from ..dependencies import get_async_db
 from ..services import auth_services, incomes_services
@@ -13,30 +13,44 @@ from ..exceptions.http_errors import (
     INCOME_UPDATE_FAILED,
     SERVER_ERROR,
 )
+from ..conditional import conditional_get
+from ..fields import FIELDS_QUERY, json_response, parse_fields, sparse_response
+from ..idempotency import run_once
+from ..instrumentation import TimedRoute
 
-incomes = APIRouter()
+incomes = APIRouter(route_class=TimedRoute)
 
 
 @incomes.post("/", response_model=IncomeOut)
 async def create_income(
     income_in: IncomeIn,
+    request: Request,
+    idempotency_key: str | None = Header(default=None, max_length=255),
     current_user: UserModel = Depends(auth_services.auth_access_token),
     db: AsyncSession = Depends(get_async_db),
 ):
-    try:
+    async def create(commit: bool):
         created_income = await incomes_services.create_income(
-            db, income_in, current_user
+            db, income_in, current_user, commit=commit
         )
         if not created_income:
             raise INCOME_CREATION_FAILED
         return created_income
+
+    try:
+        return await run_once(
+            db, current_user, idempotency_key, request, income_in,
+            create, incomes_services.income_created, IncomeOut,
+        )
     except HTTPException as http_exc:
         raise http_exc
     except Exception:
         raise SERVER_ERROR
 
 
-@incomes.get("/", response_model=list[IncomeOut])
+@incomes.get(
+    "/", response_model=None, responses={200: {"model": list[IncomeOut]}}, dependencies=[Depends(conditional_get)]
+)
 @cache(expire=3600)
 async def get_incomes(
     current_user: UserModel = Depends(auth_services.auth_access_token),
@@ -45,11 +59,16 @@ async def get_incomes(
     to_date: date | None = Query(default=None),
     skip: int = 0,
     limit: int = 100,
+    fields: str | None = FIELDS_QUERY,
 ):
+    columns = parse_fields(fields, IncomeOut)
     try:
-        return await incomes_services.get_incomes(
-            db, current_user, from_date, to_date, skip, limit
+        rows = await incomes_services.get_incomes(
+            db, current_user, from_date, to_date, skip, limit, columns
         )
+        if columns:
+            return sparse_response(IncomeOut, columns, rows)
+        return json_response(IncomeOutList, rows)
     except Exception:
         raise SERVER_ERROR
 
@@ -106,7 +125,7 @@ async def get_income_by_id(
         income = await incomes_services.get_income_by_id(db, income_id, current_user)
         if not income:
             raise INCOME_NOT_FOUND
-        return income
+        return IncomeOut.model_validate(income)
     except HTTPException as http_exc:
         raise http_exc
     except Exception:
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .. import metrics as metrics_registry
+from ..instrumentation import TimedRoute
+
+metrics = APIRouter(route_class=TimedRoute)
+
+
+@metrics.get(
+    "",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="Exports request, database, cache and background task metrics in text exposition format.",
+)
+async def export_metrics():
+    return PlainTextResponse(
+        metrics_registry.registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..dependencies import get_async_db
+from ..exceptions.http_errors import INVALID_SYNC_TOKEN
+from ..instrumentation import TimedRoute
+from ..models.user_model import UserModel
+from ..schemas.sync_schema import SyncOut
+from ..services import auth_services, sync_services
+
+sync = APIRouter(route_class=TimedRoute)
+
+
+@sync.get("", response_model=SyncOut, summary="Get changes since the last sync")
+async def get_changes(
+    since: str | None = Query(default=None, description="Token of the previous sync, omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: UserModel = Depends(auth_services.auth_access_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        cursor = sync_services.SyncCursor.decode(since) if since else None
+    except ValueError:
+        raise INVALID_SYNC_TOKEN
+    return await sync_services.get_changes(db, current_user, cursor, limit)
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_cache.decorator import cache
+
+from ..conditional import conditional_get
+from ..dependencies import get_async_db
+from ..fields import json_response
+from ..instrumentation import TimedRoute
+from ..models.user_model import UserModel
+from ..schemas.search_schema import TransactionHit, TransactionHitList
+from ..services import auth_services, search_services
+
+transactions = APIRouter(route_class=TimedRoute)
+
+
+@transactions.get(
+    "/search",
+    response_model=None,
+    responses={200: {"model": list[TransactionHit]}},
+    dependencies=[Depends(conditional_get)],
+    summary="Search incomes and expenses by description",
+    description=(
+        "Every word of `q` must start a word of the description. Results are ranked by relevance, "
+        "best first, and paginated with `skip` and `limit`."
+    ),
+)
+@cache(expire=3600)
+async def search_transactions(
+    q: str = Query(min_length=1, max_length=100),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserModel = Depends(auth_services.auth_access_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    hits = await search_services.search_transactions(db, current_user, q, skip, limit)
+    return json_response(TransactionHitList, hits)
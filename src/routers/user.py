@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import date
 
 from ..schemas.user_schema import UserIn, UserOut, UserUpdateProfile, PasswordChange
-from ..schemas.history_schema import HistoryOut
+from ..schemas.history_schema import HistoryOut, HistoryOutList
 from ..exceptions.http_errors import (
     USER_CREATION_FAILED,
     USER_ALREADY_EXISTS,
@@ -17,12 +17,17 @@ from ..dependencies import get_async_db
 from ..services import auth_services, user_services, history_services
 from ..services.password_services import PasswordService
 from ..models.user_model import UserModel
+from ..conditional import conditional_get
+from ..fields import json_response
+from ..instrumentation import TimedRoute
+from ..ratelimit import rate_limiter
 
-user = APIRouter()
+user = APIRouter(route_class=TimedRoute)
 
 
 @user.post("/register", response_model=UserOut, status_code=201)
-async def register_user(user_in: UserIn, db: AsyncSession = Depends(get_async_db)):
+async def register_user(user_in: UserIn, request: Request, db: AsyncSession = Depends(get_async_db)):
+    await rate_limiter.hit("register", request, user_in.username, user_in.email)
     existing_user = await user_services.get_user(db, user_in.username)
     if existing_user:
         raise USER_ALREADY_EXISTS
@@ -85,9 +90,11 @@ async def get_user_id(
 @user.put("/me/password", status_code=200)
 async def change_password(
     password_change: PasswordChange,
+    request: Request,
     current_user: UserModel = Depends(auth_services.auth_access_token),
     db: AsyncSession = Depends(get_async_db),
 ):
+    await rate_limiter.hit("change_password", request, current_user.username)
     if not PasswordService.verify_password(password_change.old_password, current_user.password):
         raise INVALID_OLD_PASSWORD
 
@@ -98,7 +105,12 @@ async def change_password(
         raise SERVER_ERROR
 
 
-@user.get("/me/history", response_model=List[HistoryOut])
+@user.get(
+    "/me/history",
+    response_model=None,
+    responses={200: {"model": List[HistoryOut]}},
+    dependencies=[Depends(conditional_get)],
+)
 async def get_user_history(
     current_user: UserModel = Depends(auth_services.auth_access_token),
     db: AsyncSession = Depends(get_async_db),
@@ -108,7 +120,8 @@ async def get_user_history(
     limit: int = Query(50, ge=1, le=100)
 ):
     try:
-        return await history_services.get_history_entries(db, current_user,
-                                                          from_date, to_date, skip, limit)
+        entries = await history_services.get_history_entries(db, current_user,
+                                                             from_date, to_date, skip, limit)
+        return json_response(HistoryOutList, entries)
     except Exception:
         raise SERVER_ERROR
\ No newline at end of file
@@ -5,8 +5,10 @@ from fastapi_cache.decorator import cache
 from ..dependencies import get_async_db
 from ..services import auth_services, balance_services
 from ..models.user_model import UserModel
+from ..instrumentation import TimedRoute
+from ..schemas.types import serialize_amount
 
-balance = APIRouter()
+balance = APIRouter(route_class=TimedRoute)
 
 
 @balance.get("/balance", summary="Get total balance")
@@ -16,7 +18,7 @@ async def get_total_balance(
     current_user: UserModel = Depends(auth_services.auth_access_token),
 ):
     balance = await balance_services.get_balance(db, current_user)
-    return {"balance": balance}
+    return {"balance": serialize_amount(balance)}
 
 
 @balance.get("/balance/incomes", summary="Get total incomes")
@@ -26,7 +28,7 @@ async def get_total_incomes(
     current_user: UserModel = Depends(auth_services.auth_access_token),
 ):
     balance_incomes = await balance_services.get_total_incomes(db, current_user)
-    return {"balance": balance_incomes}
+    return {"balance": serialize_amount(balance_incomes)}
 
 
 @balance.get("/balance/expenses", summary="Get total expenses")
@@ -36,5 +38,5 @@ async def get_total_expenses(
     current_user: UserModel = Depends(auth_services.auth_access_token),
 ):
     balance_expenses = await balance_services.get_total_expenses(db, current_user)
-    return {"balance": balance_expenses}
+    return {"balance": serialize_amount(balance_expenses)}
 
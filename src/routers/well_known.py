@@ -0,0 +1,34 @@
+import hashlib
+import json
+from functools import lru_cache
+
+from fastapi import APIRouter, Depends, Request, Response
+
+from ..services.token_services import TokenService, get_token_service
+from ..instrumentation import TimedRoute
+
+well_known = APIRouter(route_class=TimedRoute)
+
+# New keys must be published at least max-age before they start signing
+JWKS_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+
+
+@lru_cache
+def jwks_document(tokens: TokenService) -> tuple[bytes, str]:
+    # Keys only change on restart, so the body and its ETag are built once
+    body = json.dumps(tokens.jwks(), separators=(",", ":")).encode()
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+@well_known.get(
+    "/jwks.json",
+    summary="JSON Web Key Set",
+    description="Public keys that verify the access and refresh tokens, selected by the kid token header.",
+)
+async def get_jwks(request: Request, tokens: TokenService = Depends(get_token_service)):
+    body, etag = jwks_document(tokens)
+    headers = {"Cache-Control": JWKS_CACHE_CONTROL, "ETag": etag}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/jwk-set+json", headers=headers)
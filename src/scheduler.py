@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from .config.redis import get_redis
+from .metrics import background_task_duration_seconds, scheduler_job_runs_total
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Awaitable]
+    every: float
+    jitter: float
+    run_at_startup: bool
+
+
+class Scheduler:
+    """Runs periodic jobs in every worker, but each run is claimed through a
+    per-job lease in Redis that lasts one interval, so across N workers a job
+    still runs once per interval. Without Redis the lease is process-local."""
+
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+        self.owner = uuid.uuid4().hex
+        self._local_leases: dict[str, float] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def job(self, name: str, *, every: float, jitter: float = 30.0, run_at_startup: bool = True):
+        def decorator(func):
+            if name in self.jobs:
+                raise ValueError(f"Job {name} is already registered")
+            self.jobs[name] = Job(name, func, every, jitter, run_at_startup)
+            return func
+        return decorator
+
+    async def acquire_lease(self, job: Job) -> bool:
+        redis = get_redis()
+        if redis is not None:
+            try:
+                ttl = max(1, int(job.every))
+                return bool(await redis.set(f"scheduler:lease:{job.name}", self.owner, nx=True, ex=ttl))
+            except RedisError:
+                logger.warning(f"Could not reach Redis for the {job.name} lease, using a local one", exc_info=True)
+
+        now = time.monotonic()
+        if self._local_leases.get(job.name, 0) > now:
+            return False
+        self._local_leases[job.name] = now + job.every
+        return True
+
+    async def run_job(self, job: Job) -> bool:
+        if not await self.acquire_lease(job):
+            scheduler_job_runs_total.inc(job.name, "skipped")
+            return False
+
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            await job.func()
+            outcome = "success"
+        except Exception:
+            logger.exception(f"Scheduled job {job.name} failed")
+        finally:
+            background_task_duration_seconds.observe(time.perf_counter() - start_time, job.name, outcome)
+            scheduler_job_runs_total.inc(job.name, outcome)
+        return True
+
+    async def _loop(self, job: Job):
+        # Jitter spreads workers (and jobs) so they do not all wake at once
+        delay = random.uniform(0, job.jitter) if job.run_at_startup else job.every
+        while True:
+            await asyncio.sleep(delay)
+            await self.run_job(job)
+            delay = job.every + random.uniform(0, job.jitter)
+
+    def start(self):
+        # Jobs run in the background, startup does not wait for them
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"scheduler:{job.name}"))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+scheduler = Scheduler()
@@ -0,0 +1,24 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+BATCH_MAX_REQUESTS = 10
+
+
+class BatchRequest(BaseModel):
+    method: Literal["GET"] = "GET"
+    path: str = Field(max_length=2048, description="Path and query string, e.g. /incomes/?limit=20")
+
+
+class BatchIn(BaseModel):
+    requests: list[BatchRequest] = Field(min_length=1, max_length=BATCH_MAX_REQUESTS)
+
+
+class BatchResponse(BaseModel):
+    path: str
+    status: int
+    body: Any
+
+
+class BatchOut(BaseModel):
+    responses: list[BatchResponse] = Field(description="In the order of the requests")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from enum import Enum
 
 class CategoryType(str, Enum):
@@ -17,4 +17,8 @@ class CategoriesOut(BaseModel):
     type: CategoryType
     user_id: int
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Validates a whole list of rows in one call
+CategoriesOutList = TypeAdapter(list[CategoriesOut])
@@ -1,8 +1,11 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from datetime import datetime
 
+from .types import Amount
+
 class ExpenseIn(BaseModel):
-    amount: float = Field(gt=0, description="Amount of the expense, must be greater than 0")
+    amount: Amount = Field(gt=0, max_digits=12, decimal_places=2,
+                           description="Amount of the expense, must be greater than 0 with at most 2 decimals")
     description: str | None = Field(max_length=50, description="Description of the expense")
     date: datetime = Field(description="Date of the expense in ISO format (YYYY-MM-DD)")
     category_id: int = Field(description="Category of the expense")
@@ -12,4 +15,8 @@ class ExpenseOut(ExpenseIn):
     user_id: int
     
     model_config = ConfigDict(from_attributes=True)
+
+
+# Validates a whole list of rows in one call
+ExpenseOutList = TypeAdapter(list[ExpenseOut])
     
@@ -1,11 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
 from typing import Literal
 
+from .types import Amount
+
 class HistoryOut(BaseModel):
     type: Literal['income', 'expense']
-    amount: float
+    amount: Amount
     description: str
     date: datetime
     category: str
 
+
+HistoryOutList = TypeAdapter(list[HistoryOut])
@@ -1,8 +1,11 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from datetime import datetime
 
+from .types import Amount
+
 class IncomeIn(BaseModel):
-    amount: float = Field(gt=0, description="Amount of the income, must be greater than 0")
+    amount: Amount = Field(gt=0, max_digits=12, decimal_places=2,
+                           description="Amount of the income, must be greater than 0 with at most 2 decimals")
     description: str | None = Field(max_length=50, description="Description of the income")
     date: datetime = Field(description="Date of the income in ISO format (YYYY-MM-DD)")
     category_id: int = Field(description="Category of the income")
@@ -13,4 +16,8 @@ class IncomeOut(IncomeIn):
     
     model_config = ConfigDict(from_attributes=True)
 
+
+# Validates a whole list of rows in one call
+IncomeOutList = TypeAdapter(list[IncomeOut])
+
     
\ No newline at end of file
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, TypeAdapter
+
+from .types import Amount
+
+
+class TransactionHit(BaseModel):
+    type: Literal["income", "expense"]
+    id: int
+    amount: Amount
+    description: str | None
+    date: datetime
+    category_id: int
+    score: float
+
+
+# Validates a whole page of hits in one call
+TransactionHitList = TypeAdapter(list[TransactionHit])
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+
+from .categories_schema import CategoriesOut
+from .expenses_schema import ExpenseOut
+from .incomes_schema import IncomeOut
+
+
+class SyncDeleted(BaseModel):
+    categories: list[int] = []
+    incomes: list[int] = []
+    expenses: list[int] = []
+
+
+class SyncOut(BaseModel):
+    token: str = Field(description="Pass as `since` on the next sync")
+    has_more: bool = Field(description="More changes are waiting, sync again right away")
+    full: bool = Field(description="A full snapshot: replace the local copy instead of merging")
+    categories: list[CategoriesOut] = []
+    incomes: list[IncomeOut] = []
+    expenses: list[ExpenseOut] = []
+    deleted: SyncDeleted = SyncDeleted()
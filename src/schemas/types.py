@@ -0,0 +1,16 @@
+from decimal import Decimal
+from typing import Annotated
+
+from pydantic import PlainSerializer
+
+
+def serialize_amount(value: Decimal) -> int | str:
+    # JSON has no decimal type. Whole amounts go out as integers; amounts
+    # with cents as decimal strings ("10.50"), which clients can parse
+    # exactly, unlike a float.
+    if value == value.to_integral_value():
+        return int(value)
+    return f"{value:.2f}"
+
+
+Amount = Annotated[Decimal, PlainSerializer(serialize_amount, return_type=int | str, when_used="json")]
@@ -1,33 +1,33 @@
-from fastapi import Depends, BackgroundTasks
+from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from ..schemas.token_schema import TokenData
-from ..exceptions.http_errors import CREDENTIALS_EXCEPTION, INVALID_REFRESH_TOKEN, NOT_FOUND
+from ..exceptions.http_errors import CREDENTIALS_EXCEPTION, INVALID_REFRESH_TOKEN, USER_NOT_FOUND
 from ..services import user_services
 from ..models.token_denylist_model import TokenDenylist
+from ..models.user_model import UserModel
 from ..models.password_reset_token_model import PasswordResetToken
 from ..dependencies import get_async_db
 from ..services.password_services import PasswordService
-from ..tasks import send_password_reset_email
+from ..services.token_services import TokenError, TokenService, get_token_service
+from ..tasks import queue_password_reset_email
+from ..instrumentation import timed
+from ..config.settings import settings
 
 from datetime import timedelta
 from typing import Annotated
-from dotenv import load_dotenv
-import os
 import datetime
+import hashlib
+import hmac
 import uuid
 
-from jose import JWTError, jwt
 
-
-load_dotenv()
-
-SECRET_KEY = os.getenv("JWT_SECRET")
-JWT_ALGORITHM = os.getenv("JWT_ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
-REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
+SECRET_KEY = settings.JWT_SECRET
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
+PASSWORD_RESET_EXPIRE_MINUTES = settings.PASSWORD_RESET_EXPIRE_MINUTES
 
 
 oauth_bearer = OAuth2PasswordBearer(
@@ -35,7 +35,7 @@ oauth_bearer = OAuth2PasswordBearer(
 )
 
 
-def create_access_token(token_data: TokenData) -> str:
+def create_access_token(token_data: TokenData, tokens: TokenService) -> str:
     issued_at = int(token_data.issued_at.timestamp())
     exp = int(
         (
@@ -50,10 +50,10 @@ def create_access_token(token_data: TokenData) -> str:
         "token_type": "access",
         "jti": str(uuid.uuid4()),
     }
-    return jwt.encode(access_token, SECRET_KEY, JWT_ALGORITHM)
+    return tokens.encode(access_token)
 
 
-def create_refresh_token(token_data: TokenData) -> str:
+def create_refresh_token(token_data: TokenData, tokens: TokenService) -> str:
     issued_at = int(token_data.issued_at.timestamp())
     exp = int(
         (token_data.issued_at + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)).timestamp()
@@ -66,19 +66,37 @@ def create_refresh_token(token_data: TokenData) -> str:
         "token_type": "refresh",
         "jti": str(uuid.uuid4()),
     }
-    return jwt.encode(refresh_token, SECRET_KEY, JWT_ALGORITHM)
+    return tokens.encode(refresh_token)
+
+
+def password_fingerprint(password_hash: str) -> str:
+    # Changes with the password, which makes a signed reset token single-use
+    return hmac.new(SECRET_KEY.encode(), password_hash.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def create_password_reset_token(user: UserModel, tokens: TokenService) -> str:
+    issued_at = datetime.datetime.now()
+    reset_token = {
+        "sub": str(user.id),
+        "iat": int(issued_at.timestamp()),
+        "exp": int((issued_at + timedelta(minutes=PASSWORD_RESET_EXPIRE_MINUTES)).timestamp()),
+        "token_type": "password_reset",
+        "pwd": password_fingerprint(user.password),
+    }
+    return tokens.encode(reset_token)
 
 
-def decode_token(token: str):
+def decode_token(token: str, tokens: TokenService):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        with timed("jwt"):
+            payload = tokens.decode(token)
         return payload
-    except JWTError:
+    except TokenError:
         raise CREDENTIALS_EXCEPTION
 
 
-async def add_token_to_denylist(db: AsyncSession, token: str):
-    payload = decode_token(token)
+async def add_token_to_denylist(db: AsyncSession, token: str, tokens: TokenService):
+    payload = decode_token(token, tokens)
     jti = payload.get("jti")
     exp = payload.get("exp")
     denylist_entry = TokenDenylist(jti=jti, exp=exp)
@@ -89,8 +107,9 @@ async def add_token_to_denylist(db: AsyncSession, token: str):
 async def auth_access_token(
     token: Annotated[str, Depends(oauth_bearer)],
     db: AsyncSession = Depends(get_async_db),
+    tokens: TokenService = Depends(get_token_service),
 ):
-    payload = decode_token(token)
+    payload = decode_token(token, tokens)
     username = payload.get("sub")
     token_type = payload.get("token_type")
     jti = payload.get("jti")
@@ -98,12 +117,13 @@ async def auth_access_token(
     if not username or token_type != "access":
         raise CREDENTIALS_EXCEPTION
     
-    # Check if the token has been denylisted    
-    result = await db.execute(select(TokenDenylist).filter(TokenDenylist.jti == jti))
-    if result.scalars().first():
-        raise CREDENTIALS_EXCEPTION # Token is denylisted
+    with timed("auth_db"):
+        # Check if the token has been denylisted
+        result = await db.execute(select(TokenDenylist).filter(TokenDenylist.jti == jti))
+        if result.scalars().first():
+            raise CREDENTIALS_EXCEPTION # Token is denylisted
 
-    user = await user_services.get_user(db, username)
+        user = await user_services.get_user(db, username)
     if not user:
         raise CREDENTIALS_EXCEPTION
     return user
@@ -111,9 +131,10 @@ async def auth_access_token(
 
 async def auth_refresh_token(
     token: str,
-    db: AsyncSession = Depends(get_async_db),
+    db: AsyncSession,
+    tokens: TokenService,
 ):
-    payload = decode_token(token)
+    payload = decode_token(token, tokens)
     username = payload.get("sub")
     token_type = payload.get("token_type")
     jti = payload.get("jti")
@@ -132,44 +153,53 @@ async def auth_refresh_token(
         issued_at=datetime.datetime.now(),
     )
 
-    return create_access_token(new_access_token)
+    return create_access_token(new_access_token, tokens)
 
 
-async def request_password_reset(
-    email: str, background_tasks: BackgroundTasks, db: AsyncSession
-):
+async def request_password_reset(email: str, db: AsyncSession, tokens: TokenService):
     user = await user_services.get_user_by_email(db, email)
     if not user:
-        raise NOT_FOUND("User not found")
-
-    token = str(uuid.uuid4())
-    expires_at = datetime.datetime.now() + datetime.timedelta(minutes=30)
-    
-    reset_token = PasswordResetToken(
-        id=token,
-        user_id=user.id,
-        expires_at=expires_at,
-    )
-    db.add(reset_token)
+        raise USER_NOT_FOUND
+
+    if settings.PASSWORD_RESET_MODE == "jwt":
+        token = create_password_reset_token(user, tokens)
+    else:
+        token = str(uuid.uuid4())
+        expires_at = datetime.datetime.now() + datetime.timedelta(minutes=PASSWORD_RESET_EXPIRE_MINUTES)
+
+        reset_token = PasswordResetToken(
+            id=token,
+            user_id=user.id,
+            expires_at=expires_at,
+        )
+        db.add(reset_token)
+
+    # Sent by the mail worker once this commits
+    queue_password_reset_email(db, email, token)
     await db.commit()
 
-    background_tasks.add_task(
-        send_password_reset_email, email, token
-    )
 
+async def reset_password(token: str, new_password, db: AsyncSession, tokens: TokenService):
+    if settings.PASSWORD_RESET_MODE == "jwt":
+        # Signature and expiry are checked without touching the database
+        payload = decode_token(token, tokens)
+        if payload.get("token_type") != "password_reset":
+            raise CREDENTIALS_EXCEPTION
 
-async def reset_password(token: str, new_password, db: AsyncSession):
-    
-    result = await db.execute(select(PasswordResetToken).filter(PasswordResetToken.id == token))
-    reset_token = result.scalars().first()
-    
-    if not reset_token or reset_token.expires_at < datetime.datetime.now():
-        raise CREDENTIALS_EXCEPTION
+        user = await user_services.get_user_by_id(db, int(payload["sub"]))
+        if not user or not hmac.compare_digest(payload.get("pwd", ""), password_fingerprint(user.password)):
+            raise CREDENTIALS_EXCEPTION
+    else:
+        result = await db.execute(select(PasswordResetToken).filter(PasswordResetToken.id == token))
+        reset_token = result.scalars().first()
 
-    user = await user_services.get_user_by_id(db, reset_token.user_id)
-    if not user:
-        raise NOT_FOUND("User not found")
+        if not reset_token or reset_token.expires_at < datetime.datetime.now():
+            raise CREDENTIALS_EXCEPTION
+
+        user = await user_services.get_user_by_id(db, reset_token.user_id)
+        if not user:
+            raise USER_NOT_FOUND
+        await db.delete(reset_token)
 
-    user.hashed_password = PasswordService.hash_password(new_password)
-    await db.delete(reset_token)
+    user.password = PasswordService.hash_password(new_password)
     await db.commit()
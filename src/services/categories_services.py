@@ -1,9 +1,14 @@
+from sqlalchemy import exists, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 
 
+from ..cache import bump_data_version
 from ..models.categories_model import CategoryModel
+from ..models.expenses_model import ExpenseModel
+from ..models.incomes_model import IncomeModel
+from ..models.types import utcnow
 from ..models.user_model import UserModel
 from ..schemas.categories_schema import CategoriesIn
 
@@ -13,33 +18,54 @@ async def get_category_by_name(
 ) -> CategoryModel | None:
     result = await db.execute(
         select(CategoryModel).where(
-            CategoryModel.name == category_name, CategoryModel.user_id == user.id
+            CategoryModel.name == category_name,
+            CategoryModel.user_id == user.id,
+            CategoryModel.deleted_at.is_(None),
         )
     )
     return result.scalars().first()
 
 
 async def create_category(db: AsyncSession, category: CategoriesIn, user: UserModel):
-    new_category = CategoryModel(**category.model_dump(), user_id=user.id)
-    db.add(new_category)
+    # Names are unique and a deleted category keeps its row as a tombstone,
+    # so creating the same name again brings that row back
+    result = await db.execute(
+        select(CategoryModel).where(
+            CategoryModel.name == category.name,
+            CategoryModel.user_id == user.id,
+            CategoryModel.deleted_at.is_not(None),
+        )
+    )
+    new_category = result.scalars().first()
+    if new_category:
+        new_category.type = category.type
+        new_category.deleted_at = None
+        new_category.updated_at = utcnow()
+    else:
+        new_category = CategoryModel(**category.model_dump(), user_id=user.id)
+        db.add(new_category)
     await db.commit()
+    await bump_data_version(user.id)
     await db.refresh(new_category)
     return new_category
 
 
-async def get_categories(db: AsyncSession, user: UserModel):
-    result = await db.execute(
-        select(CategoryModel)
-        .where(CategoryModel.user_id == user.id)
-        .options(joinedload(CategoryModel.user))
-    )
+async def get_categories(db: AsyncSession, user: UserModel, columns: tuple[str, ...] | None = None):
+    where = (CategoryModel.user_id == user.id, CategoryModel.deleted_at.is_(None))
+    if columns:
+        # Sparse fieldset: only these columns are read, as rows
+        result = await db.execute(select(*(getattr(CategoryModel, name) for name in columns)).where(*where))
+        return result.all()
+    result = await db.execute(select(CategoryModel).where(*where).options(joinedload(CategoryModel.user)))
     return result.scalars().unique().all()
 
 
 async def get_category(db: AsyncSession, category_id: int, user: UserModel):
     result = await db.execute(
         select(CategoryModel).where(
-            CategoryModel.id == category_id, CategoryModel.user_id == user.id
+            CategoryModel.id == category_id,
+            CategoryModel.user_id == user.id,
+            CategoryModel.deleted_at.is_(None),
         )
     )
     return result.scalars().first()
@@ -54,15 +80,29 @@ async def update_category(
 
     for key, value in category_data.model_dump().items():
         setattr(category, key, value)
+    category.updated_at = utcnow()
     await db.commit()
+    await bump_data_version(user.id)
     await db.refresh(category)
     return category
 
 
+async def category_in_use(db: AsyncSession, category_id: int, user: UserModel) -> bool:
+    # Deleted incomes and expenses may keep pointing at it
+    in_use = [
+        exists().where(model.category_id == category_id, model.user_id == user.id, model.deleted_at.is_(None))
+        for model in (IncomeModel, ExpenseModel)
+    ]
+    result = await db.execute(select(or_(*in_use)))
+    return bool(result.scalar())
+
+
 async def delete_category(db: AsyncSession, category_id: int, user: UserModel):
     category = await get_category(db, category_id, user)
     if not category:
         return None
-    await db.delete(category)
+    # A tombstone, so /sync can tell clients about the delete
+    category.deleted_at = category.updated_at = utcnow()
     await db.commit()
+    await bump_data_version(user.id)
     return True
\ No newline at end of file
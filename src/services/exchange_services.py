@@ -1,24 +1,113 @@
+import json
+import logging
+import math
+import time
+from functools import lru_cache
+
 import httpx
 from fastapi import HTTPException
+from fastapi_cache import FastAPICache
+
+from ..circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..config.settings import settings
+from ..metrics import bcra_fetch_duration_seconds
 
-BASE_URL = "https://api.bcra.gob.ar/estadisticascambiarias/v1.0"
+logger = logging.getLogger(__name__)
 
 DESIRED_CURRENCIES = ["Dolar", "Euro", "Real"]
 
-async def get_exchange_rates():
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{BASE_URL}/Cotizaciones")
+# Refreshed every 30 minutes by the scheduler (see jobs.py)
+RATES_TTL = 60 * 60  # 1 hour
+# Served while BCRA is down
+LAST_GOOD_TTL = 60 * 60 * 24 * 7  # 7 days
+
+bcra_breaker = CircuitBreaker("bcra", settings.BCRA_FAILURE_THRESHOLD, settings.BCRA_RESET_TIMEOUT)
+
+
+# One pooled client for every call, so connections and TLS sessions to
+# BCRA are reused; created on first use and closed at shutdown
+@lru_cache
+def get_bcra_client() -> httpx.AsyncClient:
+    timeout = httpx.Timeout(settings.BCRA_READ_TIMEOUT, connect=settings.BCRA_CONNECT_TIMEOUT)
+    return httpx.AsyncClient(timeout=timeout)
+
+
+async def close_bcra_client():
+    if get_bcra_client.cache_info().currsize:
+        await get_bcra_client().aclose()
+        get_bcra_client.cache_clear()
+
+
+def rates_cache_key() -> str:
+    return f"{FastAPICache.get_prefix()}:exchange-rates"
+
+
+def last_good_rates_key() -> str:
+    return f"{FastAPICache.get_prefix()}:exchange-rates:last-good"
+
+
+def is_upstream_failure(exc: Exception) -> bool:
+    # A 4xx means BCRA answered, only our request was wrong
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return True
+
+
+async def fetch_exchange_rates():
+    start_time = time.perf_counter()
+    outcome = "error"
+    try:
+        async with bcra_breaker.call(is_upstream_failure):
+            response = await get_bcra_client().get(f"{settings.BCRA_BASE_URL}/Cotizaciones")
             response.raise_for_status()
             rates = response.json()
-            
-            filtered_rates = [
-                rate for rate in rates
-                if any(currency in rate.get("descripcion", "") for currency in DESIRED_CURRENCIES)
-            ]
-            
-            return filtered_rates
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail="Error getting exchange rates from BCRA")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=500, detail=f"Error connecting to BCRA API: {e}")
\ No newline at end of file
+        outcome = "success"
+
+        filtered_rates = [
+            rate for rate in rates
+            if any(currency in rate.get("descripcion", "") for currency in DESIRED_CURRENCIES)
+        ]
+
+        return filtered_rates
+    except CircuitOpenError as e:
+        outcome = "rejected"
+        raise HTTPException(
+            status_code=503,
+            detail="BCRA API is unavailable",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail="Error getting exchange rates from BCRA")
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="BCRA API timed out")
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=502, detail=f"Error connecting to BCRA API: {e}")
+    except ValueError:
+        # A maintenance page or truncated body instead of JSON
+        raise HTTPException(status_code=502, detail="BCRA API returned an invalid response")
+    finally:
+        bcra_fetch_duration_seconds.observe(time.perf_counter() - start_time, outcome)
+
+
+async def refresh_exchange_rates():
+    rates = await fetch_exchange_rates()
+    body = json.dumps(rates).encode()
+    backend = FastAPICache.get_backend()
+    await backend.set(rates_cache_key(), body, RATES_TTL)
+    await backend.set(last_good_rates_key(), body, LAST_GOOD_TTL)
+    return rates
+
+
+async def get_exchange_rates():
+    backend = FastAPICache.get_backend()
+    cached = await backend.get(rates_cache_key())
+    if cached:
+        return json.loads(cached)
+    try:
+        return await refresh_exchange_rates()
+    except HTTPException as e:
+        last_good = await backend.get(last_good_rates_key())
+        if not last_good:
+            raise
+        logger.warning(f"Serving the last good exchange rates, BCRA failed: {e.detail}")
+        return json.loads(last_good)
@@ -2,24 +2,45 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 
-from datetime import date
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 
 
+from ..cache import bump_data_version
+from ..events import publish_ledger_change
 from ..models.user_model import UserModel
 from ..models.expenses_model import ExpenseModel
-from ..schemas.expenses_schema import ExpenseIn
+from ..models.types import utcnow
+from ..schemas.expenses_schema import ExpenseIn, ExpenseOut
+from .search_services import index_transaction
+
+
+async def publish_expense(expense: ExpenseModel, action: str, balance_delta: Decimal):
+    payload = {"id": expense.id} if action == "deleted" else ExpenseOut.model_validate(expense).model_dump(mode="json")
+    await publish_ledger_change(expense.user_id, f"expense.{action}", payload, balance_delta)
 
 
 async def create_expense(
-    db: AsyncSession, expense: ExpenseIn, user: UserModel
+    db: AsyncSession, expense: ExpenseIn, user: UserModel, commit: bool = True
 ) -> ExpenseModel:
     expenses_db = ExpenseModel(**expense.model_dump(), user_id=user.id)
     db.add(expenses_db)
+    await db.flush()
+    await index_transaction(db, "expense", expenses_db)
+    if not commit:
+        # The caller commits other rows with it, then calls expense_created
+        return expenses_db
     await db.commit()
-    await db.refresh(expenses_db)
+    await expense_created(db, expenses_db)
     return expenses_db
 
 
+async def expense_created(db: AsyncSession, expense: ExpenseModel):
+    await bump_data_version(expense.user_id)
+    await db.refresh(expense)
+    await publish_expense(expense, "created", -expense.amount)
+
+
 async def get_expenses(
     db: AsyncSession,
     user: UserModel,
@@ -27,26 +48,32 @@ async def get_expenses(
     to_date: date | None,
     skip: int = 0,
     limit: int = 100,
+    columns: tuple[str, ...] | None = None,
 ) -> list[ExpenseModel]:
-    query = (
-        select(ExpenseModel)
-        .options(joinedload(ExpenseModel.category))
-        .where(ExpenseModel.user_id == user.id)
-    )
+    if columns:
+        # Sparse fieldset: only these columns are read, as rows
+        query = select(*(getattr(ExpenseModel, name) for name in columns))
+    else:
+        query = select(ExpenseModel).options(joinedload(ExpenseModel.category))
+    query = query.where(ExpenseModel.user_id == user.id, ExpenseModel.deleted_at.is_(None))
+    # Half-open datetime range: to_date includes the whole day and both
+    # bounds compare against the indexed column without conversions
     if from_date:
-        query = query.where(ExpenseModel.date >= from_date)
+        query = query.where(ExpenseModel.date >= datetime.combine(from_date, time.min))
     if to_date:
-        query = query.where(ExpenseModel.date <= to_date)
+        query = query.where(ExpenseModel.date < datetime.combine(to_date + timedelta(days=1), time.min))
 
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return result.all() if columns else result.scalars().all()
 
 
 async def get_expense_by_id(db: AsyncSession, expense_id: int, user: UserModel):
     result = await db.execute(
         select(ExpenseModel).where(
-            ExpenseModel.id == expense_id, ExpenseModel.user_id == user.id
+            ExpenseModel.id == expense_id,
+            ExpenseModel.user_id == user.id,
+            ExpenseModel.deleted_at.is_(None),
         )
     )
     return result.scalars().first()
@@ -58,10 +85,15 @@ async def update_expense(
     expense_db = await get_expense_by_id(db, expense_id, user)
     if not expense_db:
         return None
+    old_amount = expense_db.amount
     for key, value in expense_in.model_dump().items():
         setattr(expense_db, key, value)
+    expense_db.updated_at = utcnow()
+    await index_transaction(db, "expense", expense_db)
     await db.commit()
+    await bump_data_version(user.id)
     await db.refresh(expense_db)
+    await publish_expense(expense_db, "updated", old_amount - expense_db.amount)
     return expense_db
 
 
@@ -69,6 +101,10 @@ async def delete_expense(db: AsyncSession, expense_id: int, user: UserModel):
     expense_db = await get_expense_by_id(db, expense_id, user)
     if not expense_db:
         return None
-    await db.delete(expense_db)
+    # A tombstone, so /sync can tell clients about the delete
+    expense_db.deleted_at = expense_db.updated_at = utcnow()
+    await index_transaction(db, "expense", expense_db)
     await db.commit()
+    await bump_data_version(user.id)
+    await publish_expense(expense_db, "deleted", expense_db.amount)
     return expense_db
\ No newline at end of file
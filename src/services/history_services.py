@@ -2,7 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from datetime import date
 
-from ..schemas.history_schema import HistoryOut
+from ..schemas.history_schema import HistoryOut, HistoryOutList
 from ..models.user_model import UserModel
 from .incomes_services import get_incomes
 from .expenses_services import get_expenses
@@ -19,27 +19,17 @@ async def get_history_entries(
     incomes = await get_incomes(db, user, from_date, to_date)
     expenses = await get_expenses(db, user, from_date, to_date)
 
-    history_data: list[HistoryOut] = []
-
-    for income in incomes:
-        history_data.append(HistoryOut(
-            id=income.id,
-            type="income",
-            amount=income.amount,
-            description=income.description,
-            date=income.date,
-            category=income.category.name if income.category else "Unknown"
-        ))
-
-    for expense in expenses:
-        history_data.append(HistoryOut(
-            id=expense.id,
-            type="expense",
-            amount=expense.amount,
-            description=expense.description,
-            date=expense.date,
-            category=expense.category.name if expense.category else "Unknown"
-        ))
-
-    history_data.sort(key=lambda x: x.date, reverse=True)
-    return history_data[skip : skip + limit]
\ No newline at end of file
+    # Plain dicts validated in one call, instead of a model per row
+    rows = [
+        {
+            "type": kind,
+            "amount": entry.amount,
+            "description": entry.description,
+            "date": entry.date,
+            "category": entry.category.name if entry.category else "Unknown",
+        }
+        for kind, entries in (("income", incomes), ("expense", expenses))
+        for entry in entries
+    ]
+    rows.sort(key=lambda row: row["date"], reverse=True)
+    return HistoryOutList.validate_python(rows[skip : skip + limit])
\ No newline at end of file
@@ -2,23 +2,44 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 
-from datetime import date
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 
+from ..cache import bump_data_version
+from ..events import publish_ledger_change
 from ..models.incomes_model import IncomeModel
+from ..models.types import utcnow
 from ..models.user_model import UserModel
-from ..schemas.incomes_schema import IncomeIn
+from ..schemas.incomes_schema import IncomeIn, IncomeOut
+from .search_services import index_transaction
+
+
+async def publish_income(income: IncomeModel, action: str, balance_delta: Decimal):
+    payload = {"id": income.id} if action == "deleted" else IncomeOut.model_validate(income).model_dump(mode="json")
+    await publish_ledger_change(income.user_id, f"income.{action}", payload, balance_delta)
 
 
 async def create_income(
-    db: AsyncSession, income: IncomeIn, user: UserModel
+    db: AsyncSession, income: IncomeIn, user: UserModel, commit: bool = True
 ) -> IncomeModel:
     income_db = IncomeModel(**income.model_dump(), user_id=user.id)
     db.add(income_db)
+    await db.flush()
+    await index_transaction(db, "income", income_db)
+    if not commit:
+        # The caller commits other rows with it, then calls income_created
+        return income_db
     await db.commit()
-    await db.refresh(income_db)
+    await income_created(db, income_db)
     return income_db
 
 
+async def income_created(db: AsyncSession, income: IncomeModel):
+    await bump_data_version(income.user_id)
+    await db.refresh(income)
+    await publish_income(income, "created", income.amount)
+
+
 async def get_incomes(
     db: AsyncSession,
     user: UserModel,
@@ -26,20 +47,24 @@ async def get_incomes(
     to_date: date | None,
     skip: int = 0,
     limit: int = 100,
+    columns: tuple[str, ...] | None = None,
 ) -> list[IncomeModel]:
-    query = (
-        select(IncomeModel)
-        .options(joinedload(IncomeModel.category))
-        .where(IncomeModel.user_id == user.id)
-    )
+    if columns:
+        # Sparse fieldset: only these columns are read, as rows
+        query = select(*(getattr(IncomeModel, name) for name in columns))
+    else:
+        query = select(IncomeModel).options(joinedload(IncomeModel.category))
+    query = query.where(IncomeModel.user_id == user.id, IncomeModel.deleted_at.is_(None))
+    # Half-open datetime range: to_date includes the whole day and both
+    # bounds compare against the indexed column without conversions
     if from_date:
-        query = query.where(IncomeModel.date >= from_date)
+        query = query.where(IncomeModel.date >= datetime.combine(from_date, time.min))
     if to_date:
-        query = query.where(IncomeModel.date <= to_date)
+        query = query.where(IncomeModel.date < datetime.combine(to_date + timedelta(days=1), time.min))
 
     query = query.offset(skip).limit(limit)
     incomes = await db.execute(query)
-    return incomes.scalars().all()
+    return incomes.all() if columns else incomes.scalars().all()
 
 
 async def get_income_by_id(
@@ -47,7 +72,9 @@ async def get_income_by_id(
 ) -> IncomeModel | None:
     income = await db.execute(
         select(IncomeModel).where(
-            IncomeModel.id == income_id, IncomeModel.user_id == user.id
+            IncomeModel.id == income_id,
+            IncomeModel.user_id == user.id,
+            IncomeModel.deleted_at.is_(None),
         )
     )
     return income.scalar_one_or_none()
@@ -56,16 +83,25 @@ async def get_income_by_id(
 async def update_income(
     db: AsyncSession, income: IncomeModel, income_in: IncomeIn
 ) -> IncomeModel:
+    old_amount = income.amount
     for field, value in income_in.model_dump(exclude_unset=True).items():
         setattr(income, field, value)
+    income.updated_at = utcnow()
 
     db.add(income)
+    await index_transaction(db, "income", income)
     await db.commit()
+    await bump_data_version(income.user_id)
     await db.refresh(income)
+    await publish_income(income, "updated", income.amount - old_amount)
     return income
 
 
 async def delete_income(db: AsyncSession, income: IncomeModel):
-    await db.delete(income)
+    # A tombstone, so /sync can tell clients about the delete
+    income.deleted_at = income.updated_at = utcnow()
+    await index_transaction(db, "income", income)
     await db.commit()
+    await bump_data_version(income.user_id)
+    await publish_income(income, "deleted", -income.amount)
     return None
\ No newline at end of file
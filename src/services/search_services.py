@@ -0,0 +1,201 @@
+import math
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+
+from sqlalchemy import desc, literal, text, union_all
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..cache import get_data_version
+from ..config.settings import settings
+from ..models.expenses_model import ExpenseModel
+from ..models.incomes_model import IncomeModel
+from ..models.search_index import FTS_TABLE, from_fts_rowid, fts5_available, fts_rowid
+from ..models.user_model import UserModel
+from ..schemas.search_schema import TransactionHit, TransactionHitList
+
+SEARCH_MODELS = {"income": IncomeModel, "expense": ExpenseModel}
+SEARCH_MAX_TERMS = 8
+MEMORY_INDEX_CACHE_SIZE = 128  # users whose in-process index is kept
+
+TERM = re.compile(r"\w+")
+
+
+def search_terms(q: str) -> list[str]:
+    # Every term must match, as a prefix of a word in the description
+    return list(dict.fromkeys(TERM.findall(q.lower())))[:SEARCH_MAX_TERMS]
+
+
+# Whether each SQLite engine's database has the FTS5 table. metadata.create_all
+# makes it but the migrations do not, so a migrated database searches in
+# memory. Checked once per engine.
+_fts_tables = {}
+
+
+async def _has_fts_table(db: AsyncSession) -> bool:
+    bind = db.get_bind()
+    if bind not in _fts_tables:
+        result = await db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        )
+        _fts_tables[bind] = result.first() is not None
+    return _fts_tables[bind]
+
+
+async def search_backend(db: AsyncSession) -> str:
+    if settings.SEARCH_BACKEND == "memory":
+        return "memory"
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        return "fulltext"
+    if dialect == "sqlite" and fts5_available() and await _has_fts_table(db):
+        return "fts5"
+    return "memory"
+
+
+# Write side: only the FTS5 table needs maintenance, a FULLTEXT index is
+# kept by MySQL and the in-process index is rebuilt when the data version
+# changes. Called before the write commits, so both land together.
+
+async def index_transaction(db: AsyncSession, kind: str, row):
+    if await search_backend(db) != "fts5":
+        return
+    rowid = fts_rowid(kind, row.id)
+    await db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {"rowid": rowid})
+    if row.deleted_at is None and row.description:
+        await db.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, owner, description) VALUES (:rowid, :owner, :description)"),
+            {"rowid": rowid, "owner": f"u{row.user_id}", "description": row.description},
+        )
+
+
+# Read side: each backend returns one page of (kind, id, score), best first
+
+async def _search_fulltext(db, user, terms, skip, limit):
+    against = " ".join(f"+{term}*" for term in terms)
+    ranked = []
+    for kind, model in SEARCH_MODELS.items():
+        match = mysql.match(model.description, against=against).in_boolean_mode()
+        ranked.append(
+            select(literal(kind).label("kind"), model.id.label("id"), match.label("score"))
+            .where(model.user_id == user.id, model.deleted_at.is_(None), match)
+        )
+    query = union_all(*ranked).subquery()
+    result = await db.execute(
+        select(query.c.kind, query.c.id, query.c.score)
+        .order_by(desc(query.c.score), desc(query.c.id))
+        .offset(skip)
+        .limit(limit)
+    )
+    return [(kind, row_id, float(score)) for kind, row_id, score in result.all()]
+
+
+async def _search_fts5(db, user, terms, skip, limit):
+    prefixes = " AND ".join(f'"{term}" *' for term in terms)
+    expression = f'owner : "u{user.id}" AND description : ({prefixes})'
+    # bm25() is lower for better matches; the owner column does not count
+    result = await db.execute(
+        text(
+            f"SELECT rowid, bm25({FTS_TABLE}, 0.0, 1.0) AS score FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH :expression ORDER BY score, rowid DESC LIMIT :limit OFFSET :skip"
+        ),
+        {"expression": expression, "limit": limit, "skip": skip},
+    )
+    return [(*from_fts_rowid(rowid), -score) for rowid, score in result.all()]
+
+
+class InvertedIndex:
+    """Term -> {(kind, id): term frequency} over one user's descriptions,
+    ranked by tf-idf. The fallback when the database has no full-text
+    index; built per user and data version."""
+
+    def __init__(self, documents: list[tuple[tuple[str, int], str | None]]):
+        self.size = len(documents)
+        self.postings: dict[str, dict[tuple[str, int], int]] = {}
+        for key, description in documents:
+            for term in TERM.findall((description or "").lower()):
+                postings = self.postings.setdefault(term, {})
+                postings[key] = postings.get(key, 0) + 1
+        self.vocabulary = sorted(self.postings)
+
+    def search(self, terms: list[str]) -> list[tuple[tuple[str, int], float]]:
+        scores: dict[tuple[str, int], float] | None = None
+        for term in terms:
+            matches: dict[tuple[str, int], float] = {}
+            position = bisect_left(self.vocabulary, term)
+            while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+                postings = self.postings[self.vocabulary[position]]
+                idf = math.log(1 + self.size / len(postings))
+                for key, frequency in postings.items():
+                    matches[key] = matches.get(key, 0.0) + frequency * idf
+                position += 1
+            if scores is None:
+                scores = matches
+            else:
+                scores = {key: score + matches[key] for key, score in scores.items() if key in matches}
+        return sorted((scores or {}).items(), key=lambda hit: (-hit[1], -hit[0][1]))
+
+
+_memory_indexes: OrderedDict[tuple[int, str], InvertedIndex] = OrderedDict()
+
+
+async def memory_index(db: AsyncSession, user: UserModel) -> InvertedIndex:
+    key = (user.id, await get_data_version(user.id))
+    index = _memory_indexes.get(key)
+    if index is not None:
+        _memory_indexes.move_to_end(key)
+        return index
+
+    documents = []
+    for kind, model in SEARCH_MODELS.items():
+        result = await db.execute(
+            select(model.id, model.description).where(model.user_id == user.id, model.deleted_at.is_(None))
+        )
+        documents.extend(((kind, row_id), description) for row_id, description in result.all())
+    index = InvertedIndex(documents)
+    _memory_indexes[key] = index
+    while len(_memory_indexes) > MEMORY_INDEX_CACHE_SIZE:
+        _memory_indexes.popitem(last=False)
+    return index
+
+
+async def _search_memory(db, user, terms, skip, limit):
+    hits = (await memory_index(db, user)).search(terms)
+    return [(kind, row_id, score) for (kind, row_id), score in hits[skip : skip + limit]]
+
+
+SEARCH_BACKENDS = {"fulltext": _search_fulltext, "fts5": _search_fts5, "memory": _search_memory}
+
+
+async def search_transactions(
+    db: AsyncSession, user: UserModel, q: str, skip: int = 0, limit: int = 20
+) -> list[TransactionHit]:
+    terms = search_terms(q)
+    if not terms:
+        return []
+    ranked = await SEARCH_BACKENDS[await search_backend(db)](db, user, terms, skip, limit)
+
+    rows = {}
+    for kind, model in SEARCH_MODELS.items():
+        ids = [row_id for hit_kind, row_id, _ in ranked if hit_kind == kind]
+        if ids:
+            result = await db.execute(
+                select(model).where(model.id.in_(ids), model.user_id == user.id, model.deleted_at.is_(None))
+            )
+            rows.update(((kind, row.id), row) for row in result.scalars())
+
+    return TransactionHitList.validate_python([
+        {
+            "type": kind,
+            "id": row.id,
+            "amount": row.amount,
+            "description": row.description,
+            "date": row.date,
+            "category_id": row.category_id,
+            "score": score,
+        }
+        for kind, row_id, score in ranked
+        if (row := rows.get((kind, row_id))) is not None
+    ])
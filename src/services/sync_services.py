@@ -0,0 +1,93 @@
+import base64
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..config.settings import settings
+from ..models.categories_model import CategoryModel
+from ..models.expenses_model import ExpenseModel
+from ..models.incomes_model import IncomeModel
+from ..models.types import utcnow
+from ..models.user_model import UserModel
+from ..schemas.sync_schema import SyncOut
+
+# Categories first, so a client never sees a row before its category
+SYNC_MODELS = (("categories", CategoryModel), ("incomes", IncomeModel), ("expenses", ExpenseModel))
+
+# A caught-up token points this far back, so a change whose timestamp was
+# taken before the sync but that committed after it is still picked up (and
+# recent rows are sent twice, which clients apply idempotently)
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+@dataclass(frozen=True, order=True)
+class SyncCursor:
+    """Position in the change stream, ordered by (updated_at, table, id)."""
+
+    updated_at: datetime
+    table: int = 0
+    id: int = 0
+
+    def encode(self) -> str:
+        raw = f"{self.updated_at.isoformat()}~{self.table}~{self.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "SyncCursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+            updated_at, table, row_id = raw.split("~")
+            return cls(datetime.fromisoformat(updated_at), int(table), int(row_id))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError("Invalid sync token") from e
+
+
+def after_cursor(model, table: int, cursor: SyncCursor):
+    # Row-value comparison (updated_at, table, id) > cursor for one table,
+    # written so the (user_id, updated_at) index serves it
+    if table > cursor.table:
+        return model.updated_at >= cursor.updated_at
+    if table < cursor.table:
+        return model.updated_at > cursor.updated_at
+    return or_(
+        model.updated_at > cursor.updated_at,
+        and_(model.updated_at == cursor.updated_at, model.id > cursor.id),
+    )
+
+
+async def get_changes(db: AsyncSession, user: UserModel, since: SyncCursor | None, limit: int) -> SyncOut:
+    now = utcnow()
+    # Tombstones older than the retention may be gone: start over
+    full = since is None or since.updated_at < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    changes = []
+    for table, (name, model) in enumerate(SYNC_MODELS):
+        query = select(model).where(model.user_id == user.id)
+        if full:
+            query = query.where(model.deleted_at.is_(None))
+        else:
+            query = query.where(after_cursor(model, table, since))
+        query = query.order_by(model.updated_at, model.id).limit(limit + 1)
+        rows = (await db.execute(query)).scalars().all()
+        changes.extend((SyncCursor(row.updated_at, table, row.id), name, row) for row in rows)
+
+    changes.sort(key=lambda change: change[0])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    result = {name: [] for name, _ in SYNC_MODELS}
+    deleted = {name: [] for name, _ in SYNC_MODELS}
+    for _, name, row in changes:
+        if row.deleted_at is None:
+            result[name].append(row)
+        else:
+            deleted[name].append(row.id)
+
+    token = changes[-1][0] if has_more else SyncCursor(now - SYNC_OVERLAP)
+    return SyncOut.model_validate(
+        {**result, "deleted": deleted, "token": token.encode(), "has_more": has_more, "full": full},
+        from_attributes=True,
+    )
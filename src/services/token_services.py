@@ -0,0 +1,301 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Protocol
+
+from ..config.settings import settings
+
+
+class TokenError(Exception):
+    pass
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def validate_claims(claims: dict[str, Any], now: float):
+    # Same registered claim checks as python-jose, without leeway
+    exp = claims.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise TokenError("Expiration Time claim (exp) must be a number")
+        if exp < now:
+            raise TokenError("Signature has expired")
+    nbf = claims.get("nbf")
+    if nbf is not None:
+        if not isinstance(nbf, (int, float)):
+            raise TokenError("Not Before claim (nbf) must be a number")
+        if nbf > now:
+            raise TokenError("The token is not yet valid (nbf)")
+    iat = claims.get("iat")
+    if iat is not None and not isinstance(iat, (int, float)):
+        raise TokenError("Issued At claim (iat) must be a number")
+
+
+class JWTBackend(Protocol):
+    algorithm: str
+
+    def encode(self, claims: dict[str, Any]) -> str: ...
+
+    def decode(self, token: str) -> dict[str, Any]: ...
+
+
+class JWSBackend(ABC):
+    """Compact JWS serialization shared by the built-in backends, which only
+    sign and verify. The header segment of issued tokens is built once."""
+
+    algorithm: str
+    _header_segment: str
+
+    def _set_header(self, **fields: str):
+        self._header_segment = b64url_encode(
+            json.dumps({"alg": self.algorithm, "typ": "JWT", **fields}, separators=(",", ":")).encode()
+        )
+
+    @abstractmethod
+    def _sign(self, signing_input: bytes) -> bytes: ...
+
+    @abstractmethod
+    def _verify(self, header: dict[str, Any] | None, signing_input: bytes, signature: bytes) -> bool:
+        # header is None for tokens carrying our current header
+        ...
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        payload_segment = b64url_encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = f"{self._header_segment}.{payload_segment}"
+        return f"{signing_input}.{b64url_encode(self._sign(signing_input.encode('ascii')))}"
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            signing_input, _, signature_segment = token.rpartition(".")
+            header_segment, payload_segment = signing_input.split(".")
+            header = None
+            # Tokens we issued carry exactly our header, skip parsing it
+            if header_segment != self._header_segment:
+                header = json.loads(b64url_decode(header_segment))
+                if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+                    raise TokenError("The specified alg value is not allowed")
+            signature = b64url_decode(signature_segment)
+            if not self._verify(header, signing_input.encode("ascii"), signature):
+                raise TokenError("Signature verification failed")
+            claims = json.loads(b64url_decode(payload_segment))
+        except (ValueError, UnicodeError) as e:
+            raise TokenError("Malformed token") from e
+        if not isinstance(claims, dict):
+            raise TokenError("Invalid payload")
+        validate_claims(claims, time.time())
+        return claims
+
+    def jwks(self) -> list[dict[str, str]]:
+        return []
+
+
+class HMACBackend(JWSBackend):
+    """HS256/384/512 over the standard library. The keyed HMAC object is
+    built once and copied per token."""
+
+    DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def __init__(self, secret: str, algorithm: str):
+        if algorithm not in self.DIGESTS:
+            raise ValueError(f"Unsupported HMAC algorithm {algorithm}")
+        self.algorithm = algorithm
+        self._mac = hmac.new(secret.encode(), digestmod=self.DIGESTS[algorithm])
+        self._set_header()
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def _verify(self, header: dict[str, Any] | None, signing_input: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(signature, self._sign(signing_input))
+
+
+def int_to_b64url(value: int) -> str:
+    return b64url_encode(value.to_bytes((value.bit_length() + 7) // 8, "big"))
+
+
+def public_jwk(public_key: Any) -> dict[str, str]:
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+    if isinstance(public_key, rsa.RSAPublicKey):
+        numbers = public_key.public_numbers()
+        return {"kty": "RSA", "e": int_to_b64url(numbers.e), "n": int_to_b64url(numbers.n)}
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        raw = public_key.public_bytes(Encoding.Raw, PublicFormat.Raw)
+        return {"kty": "OKP", "crv": "Ed25519", "x": b64url_encode(raw)}
+    raise ValueError(f"Unsupported key type {type(public_key).__name__}")
+
+
+def jwk_thumbprint(jwk: dict[str, str]) -> str:
+    # RFC 7638: the required members only, sorted, without whitespace
+    required = ("crv", "kty", "x") if jwk["kty"] == "OKP" else ("e", "kty", "n")
+    canonical = json.dumps({name: jwk[name] for name in required}, separators=(",", ":"), sort_keys=True)
+    return b64url_encode(hashlib.sha256(canonical.encode()).digest())
+
+
+class AsymmetricBackend(JWSBackend):
+    """RS256 and EdDSA (Ed25519) with key rotation. The first private key
+    signs and its kid goes in the header; every key verifies, so tokens
+    signed before a rotation stay valid until the old key is dropped. kid
+    is the RFC 7638 thumbprint of the public key."""
+
+    ALGORITHMS = ("RS256", "EdDSA")
+
+    def __init__(self, private_keys: list[Any], algorithm: str):
+        from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unsupported asymmetric algorithm {algorithm}")
+        if not private_keys:
+            raise ValueError(f"{algorithm} needs at least one private key")
+        key_type = rsa.RSAPrivateKey if algorithm == "RS256" else ed25519.Ed25519PrivateKey
+        for key in private_keys:
+            if not isinstance(key, key_type):
+                raise ValueError(f"{algorithm} needs {key_type.__name__} keys, got {type(key).__name__}")
+
+        self.algorithm = algorithm
+        self._signing_key = private_keys[0]
+        self._public_keys: dict[str, Any] = {}
+        self._jwks: list[dict[str, str]] = []
+        for key in private_keys:
+            jwk = public_jwk(key.public_key())
+            kid = jwk_thumbprint(jwk)
+            self._public_keys[kid] = key.public_key()
+            self._jwks.append({**jwk, "kid": kid, "use": "sig", "alg": algorithm})
+        self.kid = self._jwks[0]["kid"]
+        self._set_header(kid=self.kid)
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        if self.algorithm == "RS256":
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.hazmat.primitives.asymmetric import padding
+
+            return self._signing_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+        return self._signing_key.sign(signing_input)
+
+    def _verify(self, header: dict[str, Any] | None, signing_input: bytes, signature: bytes) -> bool:
+        from cryptography.exceptions import InvalidSignature
+
+        kid = self.kid if header is None else header.get("kid")
+        if kid is None and len(self._public_keys) == 1:
+            kid = self.kid
+        public_key = self._public_keys.get(kid)
+        if public_key is None:
+            return False
+        try:
+            if self.algorithm == "RS256":
+                from cryptography.hazmat.primitives import hashes
+                from cryptography.hazmat.primitives.asymmetric import padding
+
+                public_key.verify(signature, signing_input, padding.PKCS1v15(), hashes.SHA256())
+            else:
+                public_key.verify(signature, signing_input)
+        except InvalidSignature:
+            return False
+        return True
+
+    def jwks(self) -> list[dict[str, str]]:
+        return self._jwks
+
+
+def load_private_keys(paths: list[str]) -> list[Any]:
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    keys = []
+    for path in paths:
+        with open(path, "rb") as key_file:
+            keys.append(load_pem_private_key(key_file.read(), password=None))
+    return keys
+
+
+class JoseBackend:
+    def __init__(self, key: Any, algorithm: str):
+        from jose import jwt
+
+        self._jwt = jwt
+        self.algorithm = algorithm
+        self._key = key
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        return self._jwt.encode(claims, self._key, self.algorithm)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        from jose import JWTError
+
+        try:
+            return self._jwt.decode(token, self._key, algorithms=[self.algorithm])
+        except JWTError as e:
+            raise TokenError(str(e)) from e
+
+
+BACKENDS = {"hmac": HMACBackend, "jose": JoseBackend}
+
+
+def make_backend(name: str, secret: str, algorithm: str, private_key_files: list[str] | None = None) -> JWTBackend:
+    if algorithm in AsymmetricBackend.ALGORITHMS:
+        return AsymmetricBackend(load_private_keys(private_key_files or []), algorithm)
+    if name == "auto":
+        name = "hmac" if algorithm in HMACBackend.DIGESTS else "jose"
+    return BACKENDS[name](secret, algorithm)
+
+
+class TokenService:
+    """Encodes and verifies JWTs through a backend. Tokens verified recently
+    are kept in an LRU with their claims until they expire, so a client
+    repeating its bearer token skips the signature check. The whole token is
+    the key: a signature is only valid together with its payload."""
+
+    def __init__(self, backend: JWTBackend, cache_size: int = 1024):
+        self.backend = backend
+        self.cache_size = cache_size
+        self._verified: OrderedDict[str, tuple[dict[str, Any], float | None]] = OrderedDict()
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        return self.backend.encode(claims)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        cached = self._verified.get(token)
+        if cached is not None:
+            claims, exp = cached
+            if exp is None or exp >= time.time():
+                self._verified.move_to_end(token)
+                return dict(claims)
+            del self._verified[token]
+
+        claims = self.backend.decode(token)
+        if self.cache_size:
+            self._verified[token] = (claims, claims.get("exp"))
+            if len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return dict(claims)
+
+    def clear(self):
+        self._verified.clear()
+
+    def jwks(self) -> dict[str, list[dict[str, str]]]:
+        # Public keys only; empty for the shared-secret HS algorithms
+        jwks = getattr(self.backend, "jwks", None)
+        return {"keys": jwks() if jwks else []}
+
+
+# Built on first use, not at import: the backend reads the private key files.
+# Routes take it with Depends(get_token_service), which tests can override.
+@lru_cache
+def get_token_service() -> TokenService:
+    return TokenService(
+        make_backend(settings.JWT_BACKEND, settings.JWT_SECRET, settings.JWT_ALGORITHM, settings.JWT_PRIVATE_KEY_FILES),
+        cache_size=settings.JWT_VERIFIED_CACHE_SIZE,
+    )
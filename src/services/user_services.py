@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from ..cache import bump_data_version
 from ..models.user_model import UserModel
 from ..schemas.user_schema import UserIn, UserUpdateProfile
 from ..services.password_services import PasswordService
@@ -37,6 +38,7 @@ async def update_user(db: AsyncSession, user: UserModel, user_in: UserUpdateProf
 async def delete_user(db: AsyncSession, user: UserModel) -> None:
     await db.delete(user)
     await db.commit()
+    await bump_data_version(user.id)  # ids can be reused
     return None
 
 
@@ -1,42 +1,81 @@
 from __future__ import annotations
-from sqlalchemy import delete
+from sqlalchemy import and_, delete, select
+from .config.settings import settings
+from .models.categories_model import CategoryModel
+from .models.expenses_model import ExpenseModel
+from .models.idempotency_key_model import IdempotencyKey
+from .models.incomes_model import IncomeModel
 from .models.token_denylist_model import TokenDenylist
+from .models.types import utcnow
 from .dependencies import get_async_db
+from .locks import distributed_lock
+import asyncio
 import datetime
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from .config.settings import settings
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from .mailer import enqueue_email
+
+
+CLEANUP_BATCH_SIZE = 5000
+CLEANUP_LOCK_TIMEOUT = 60 * 10  # 10 minutes
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS
-)
-
-async def cleanup_expired_tokens():
+
+async def _delete_in_batches(model, predicate, batch_size: int) -> int:
+    # Short transactions keep row locks brief on large tables
+    deleted = 0
     async for db in get_async_db():
         async with db as session:
-            await session.execute(
-                delete(TokenDenylist).where(TokenDenylist.exp < datetime.datetime.now())
-            )
-            await session.commit()
+            query = select(model.id).where(predicate).limit(batch_size)
+            while True:
+                expired_ids = (await session.execute(query)).scalars().all()
+                if not expired_ids:
+                    break
+                await session.execute(delete(model).where(model.id.in_(expired_ids)))
+                await session.commit()
+                deleted += len(expired_ids)
+                if len(expired_ids) < batch_size:
+                    break
+                await asyncio.sleep(0)  # let requests run between batches
+    return deleted
+
+
+async def cleanup_expired_tokens(batch_size: int = CLEANUP_BATCH_SIZE) -> int:
+    # Only one worker cleans up; the others skip this run
+    async with distributed_lock("cleanup_expired_tokens", CLEANUP_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            return 0
+        now = int(time.time())  # exp holds epoch seconds
+        return await _delete_in_batches(TokenDenylist, TokenDenylist.exp < now, batch_size)
 
 
-async def send_password_reset_email(email: str, token: str):
+async def purge_idempotency_keys(batch_size: int = CLEANUP_BATCH_SIZE) -> int:
+    async with distributed_lock("purge_idempotency_keys", CLEANUP_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            return 0
+        return await _delete_in_batches(IdempotencyKey, IdempotencyKey.expires_at < utcnow(), batch_size)
+
+
+async def purge_sync_tombstones(batch_size: int = CLEANUP_BATCH_SIZE) -> int:
+    # Deleted rows past the retention; clients syncing from before it get a
+    # full sync instead. Incomes and expenses go first so their categories
+    # are no longer referenced.
+    async with distributed_lock("purge_sync_tombstones", CLEANUP_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            return 0
+
+        cutoff = utcnow() - datetime.timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        referenced = select(IncomeModel.category_id).union(select(ExpenseModel.category_id))
+        deleted = 0
+        for model in (IncomeModel, ExpenseModel, CategoryModel):
+            predicate = model.deleted_at < cutoff
+            if model is CategoryModel:
+                predicate = and_(predicate, model.id.not_in(referenced))
+            deleted += await _delete_in_batches(model, predicate, batch_size)
+        return deleted
+
+
+def queue_password_reset_email(db: AsyncSession, email: str, token: str):
     html = f"""<p>Hi, this is your link to reset your password</p> 
     <p>http://localhost:8080/reset-password?token={token}</p>"""
 
-    message = MessageSchema(
-        subject="Reset your password",
-        recipients=[email],
-        body=html,
-        subtype="html"
-    )
-
-    fm = FastMail(conf)
-    await fm.send_message(message)
\ No newline at end of file
+    enqueue_email(db, email, "Reset your password", html)
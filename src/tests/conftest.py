@@ -10,6 +10,7 @@ from fastapi_cache.backends.inmemory import InMemoryBackend
 from redis import asyncio as aioredis
 import redis
 
+from .. import mailer, tasks
 from ..main import app
 from ..models.user_model import UserModel
 from ..models.incomes_model import IncomeModel
@@ -19,10 +20,14 @@ from ..models.history_model import HistoryModel
 from ..dependencies import get_async_db
 from ..services.password_services import PasswordService
 from ..config.settings import settings
+from ..instrumentation import instrument_engine
+from ..cache import InstrumentedBackend, ORJSONCoder, SingleFlightBackend, user_key_builder
+from ..ratelimit import rate_limiter
 
 
 DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 engine = create_async_engine(DATABASE_URL, echo=True)
+instrument_engine(engine)
 TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -34,15 +39,26 @@ async def initialize_cache():
         if settings.REDIS_URL:
             redis_client = aioredis.from_url(settings.REDIS_URL, encoding="utf8", decode_responses=True)
             await redis_client.ping()
-            FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
+            backend = SingleFlightBackend(RedisBackend(redis_client), redis_client)
         else:
-            FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+            backend = SingleFlightBackend(InMemoryBackend())
     except (redis.exceptions.ConnectionError, ValueError):
-        FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+        backend = SingleFlightBackend(InMemoryBackend())
+    FastAPICache.reset()  # a fresh backend per test, in-flight state is bound to the event loop
+    FastAPICache.init(
+        InstrumentedBackend(backend), prefix="fastapi-cache", coder=ORJSONCoder, key_builder=user_key_builder
+    )
     yield
     await FastAPICache.clear()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def reset_rate_limits():
+    rate_limiter.reset()
+    yield
+    rate_limiter.reset()
+
+
 @pytest.fixture(scope="function")
 async def db_session():
     async with engine.begin() as conn:
@@ -75,6 +91,16 @@ async def async_client(db_session: AsyncSession, initialize_cache):
     app.dependency_overrides.clear() # Clear overrides after test
 
 
+@pytest.fixture(scope="function")
+async def patched_session(db_session: AsyncSession, monkeypatch):
+    # Background jobs open their own sessions, outside the request overrides
+    async def get_test_db():
+        yield db_session
+    monkeypatch.setattr(tasks, "get_async_db", get_test_db)
+    monkeypatch.setattr(mailer, "get_async_db", get_test_db)
+    return db_session
+
+
 @pytest.fixture(scope="function")
 async def test_user(db_session: AsyncSession):
     user = UserModel(
@@ -92,3 +118,12 @@ async def test_user(db_session: AsyncSession):
 async def access_token(async_client: AsyncClient, test_user: UserModel):
     response = await async_client.post("/auth/login", data={"username": "testuser", "password": "password"})
     return response.json()["access_token"]
+
+
+@pytest.fixture(scope="function")
+async def category(db_session: AsyncSession, test_user: UserModel):
+    category = CategoryModel(name="salary", type="income", user_id=test_user.id)
+    db_session.add(category)
+    await db_session.commit()
+    return category
+
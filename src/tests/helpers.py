@@ -0,0 +1,11 @@
+from httpx import AsyncClient
+
+
+async def post_transaction(
+    async_client: AsyncClient, headers: dict, category_id: int, path: str = "/incomes/", **fields
+) -> dict:
+    response = await async_client.post(path, headers=headers, json={
+        "amount": 100, "description": "Salary", "date": "2025-07-21T14:00:00", "category_id": category_id, **fields,
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()
@@ -1,7 +1,10 @@
 import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.user_model import UserModel
+from ..models.outbound_email_model import OutboundEmail
+from ..config.settings import settings
 
 
 @pytest.mark.asyncio
@@ -66,4 +69,49 @@ async def test_logout(async_client, test_user: UserModel, db_session: AsyncSessi
     # Verify that the access token is also invalidated
     me_response = await async_client.get("/user/me", headers=headers)
     assert me_response.status_code == 401
-    assert me_response.json() == {"detail": "Could not validate credentials."}
\ No newline at end of file
+    assert me_response.json() == {"detail": "Could not validate credentials."}
+
+
+@pytest.mark.asyncio
+async def test_forgot_password_queues_email(async_client, test_user: UserModel, db_session: AsyncSession):
+    response = await async_client.post("/auth/forgot-password", json={"email": "testuser@example.com"})
+    assert response.status_code == 200
+
+    result = await db_session.execute(select(OutboundEmail))
+    email = result.scalars().one()
+    assert email.recipient == "testuser@example.com"
+    assert email.status == "pending"
+    assert "reset-password?token=" in email.body
+
+
+async def request_reset_token(async_client, db_session: AsyncSession) -> str:
+    response = await async_client.post("/auth/forgot-password", json={"email": "testuser@example.com"})
+    assert response.status_code == 200
+    result = await db_session.execute(select(OutboundEmail.body).order_by(OutboundEmail.id.desc()))
+    return result.scalars().first().split("reset-password?token=")[1].split("<")[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["table", "jwt"])
+async def test_reset_password(async_client, test_user: UserModel, db_session: AsyncSession, monkeypatch, mode):
+    monkeypatch.setattr(settings, "PASSWORD_RESET_MODE", mode)
+    token = await request_reset_token(async_client, db_session)
+
+    response = await async_client.post("/auth/reset-password", json={"token": token, "new_password": "newpassword"})
+    assert response.status_code == 200
+
+    login_response = await async_client.post("/auth/login", data={"username": "testuser", "password": "newpassword"})
+    assert login_response.status_code == 200
+
+    # Single use: the table row is deleted, the signed token no longer matches the password
+    reuse_response = await async_client.post("/auth/reset-password", json={"token": token, "new_password": "again"})
+    assert reuse_response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_signed_reset_token_is_not_an_access_token(async_client, test_user: UserModel, db_session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_RESET_MODE", "jwt")
+    token = await request_reset_token(async_client, db_session)
+
+    response = await async_client.get("/user/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
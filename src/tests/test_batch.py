@@ -0,0 +1,78 @@
+import pytest
+from httpx import AsyncClient
+
+from ..services import auth_services
+from .helpers import post_transaction
+
+
+async def run_batch(async_client: AsyncClient, access_token: str, *paths: str) -> list[dict]:
+    response = await async_client.post(
+        "/batch",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"requests": [{"path": path} for path in paths]},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["responses"]
+
+
+@pytest.mark.asyncio
+async def test_screen_loads_in_one_request(async_client: AsyncClient, access_token: str, category, monkeypatch):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await post_transaction(async_client, headers, category.id)
+
+    decode_token = auth_services.decode_token
+    calls = []
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args)
+        return decode_token(*args, **kwargs)
+
+    monkeypatch.setattr(auth_services, "decode_token", counting_decode)
+    paths = ["/user/me", "/user/balance", "/categories/", "/user/me/history"]
+    responses = await run_batch(async_client, access_token, *paths)
+
+    assert len(calls) == 1
+    assert [r["path"] for r in responses] == paths
+    assert {r["status"] for r in responses} == {200}
+    me, balance, categories, history = (r["body"] for r in responses)
+    assert me["username"] == "testuser"
+    assert balance == {"balance": 100}
+    assert [c["name"] for c in categories] == ["salary"]
+    assert [h["description"] for h in history] == ["Salary"]
+
+    # Same bodies as the endpoints called one by one
+    for path, response in zip(paths, responses):
+        assert (await async_client.get(path, headers=headers)).json() == response["body"]
+
+
+@pytest.mark.asyncio
+async def test_parameters_are_validated(async_client: AsyncClient, access_token: str, category):
+    ok, bad_query, found, missing = await run_batch(
+        async_client, access_token,
+        "/user/me/history?limit=1", "/user/me/history?limit=500", f"/categories/{category.id}", "/categories/999",
+    )
+    assert ok["status"] == 200
+    assert bad_query["status"] == 422
+    assert found["body"]["name"] == "salary"
+    assert missing["status"] == 404
+
+
+@pytest.mark.asyncio
+async def test_only_whitelisted_reads_run(async_client: AsyncClient, access_token: str):
+    sync, unknown, other_user = await run_batch(async_client, access_token, "/sync", "/nope", "/user/1")
+    assert sync["status"] == 400
+    assert unknown["status"] == 404
+    assert other_user["status"] == 400
+
+    response = await async_client.post(
+        "/batch",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"requests": [{"method": "DELETE", "path": "/user/me"}]},
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_requires_a_token(async_client: AsyncClient):
+    response = await async_client.post("/batch", json={"requests": [{"path": "/user/me"}]})
+    assert response.status_code == 401
@@ -0,0 +1,99 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from httpx import AsyncClient
+
+from ..cache import CACHE_TTL_JITTER, SingleFlightBackend
+from .helpers import post_transaction
+
+
+async def cached(backend: SingleFlightBackend, key: str, compute):
+    _, value = await backend.get_with_ttl(key)
+    if value is None:
+        value = await compute()
+        await backend.set(key, value, 60)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once():
+    backend = SingleFlightBackend(InMemoryBackend())
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return b"value"
+
+    key = f"test:{uuid.uuid4()}"  # the in-memory store is shared by all instances
+    values = await asyncio.gather(*(cached(backend, key, compute) for _ in range(20)))
+    assert values == [b"value"] * 20
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_compute_when_the_first_request_fails():
+    backend = SingleFlightBackend(InMemoryBackend(), timeout=0.1)
+
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("boom")
+
+    async def compute():
+        return b"value"
+
+    key = f"test:{uuid.uuid4()}"
+    first = asyncio.create_task(cached(backend, key, fail))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(cached(backend, key, compute))
+    with pytest.raises(RuntimeError):
+        await first
+    assert await asyncio.wait_for(second, 1) == b"value"
+
+
+@pytest.mark.asyncio
+async def test_ttl_jitter():
+    backend = SingleFlightBackend(InMemoryBackend())
+    ttls = set()
+    for i in range(50):
+        await backend.set(f"test:jitter-{i}", b"value", 1000)
+        ttl, _ = await backend.get_with_ttl(f"test:jitter-{i}")
+        ttls.add(ttl)
+    assert len(ttls) > 1
+    assert all(1000 * (1 - CACHE_TTL_JITTER) - 1 <= ttl <= 1000 * (1 + CACHE_TTL_JITTER) for ttl in ttls)
+
+
+@pytest.mark.asyncio
+async def test_balance_is_cached_per_user_and_invalidated_on_write(
+    async_client: AsyncClient, access_token: str, category
+):
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = await async_client.get("/user/balance", headers=headers)
+    assert response.headers["X-FastAPI-Cache"] == "MISS"
+    response = await async_client.get("/user/balance", headers=headers)
+    assert response.headers["X-FastAPI-Cache"] == "HIT"
+    assert response.json() == {"balance": 0}
+
+    await post_transaction(async_client, headers, category.id)
+
+    response = await async_client.get("/user/balance", headers=headers)
+    assert response.headers["X-FastAPI-Cache"] == "MISS"
+    assert response.json() == {"balance": 100}
+
+
+@pytest.mark.asyncio
+async def test_cached_list_is_served_unchanged(async_client: AsyncClient, access_token: str, category):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for amount in (100, 10.5):
+        await post_transaction(async_client, headers, category.id, amount=amount)
+
+    miss = await async_client.get("/incomes/", headers=headers)
+    hit = await async_client.get("/incomes/", headers=headers)
+    assert (miss.headers["X-FastAPI-Cache"], hit.headers["X-FastAPI-Cache"]) == ("MISS", "HIT")
+    assert hit.content == miss.content
+    assert sorted((income["amount"] for income in hit.json()), key=float) == ["10.50", 100]
+    assert hit.json()[0]["date"] == "2025-07-21T14:00:00"
@@ -1,23 +1,8 @@
 import pytest
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.user_model import UserModel
-from ..services.password_services import PasswordService
-
-
-@pytest.fixture(scope="function")
-async def test_user(db_session: AsyncSession):
-    user = UserModel(
-        username="testuser",
-        full_name="Test User",
-        email="testuser@example.com",
-        password=PasswordService.hash_password("password"),
-    )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
+from .helpers import post_transaction
 
 
 @pytest.mark.asyncio
@@ -81,4 +66,18 @@ async def test_delete_category(async_client: AsyncClient, access_token: str, tes
     assert response.status_code == 204
 
     response = await async_client.get(f"/categories/{category_id}", headers={"Authorization": f"Bearer {access_token}"})
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_delete_category_in_use_is_rejected(async_client: AsyncClient, access_token: str, category):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    income = await post_transaction(async_client, headers, category.id)
+
+    response = await async_client.delete(f"/categories/{category.id}", headers=headers)
+    assert response.status_code == 409
+    assert (await async_client.get(f"/categories/{category.id}", headers=headers)).status_code == 200
+
+    # A deleted income does not hold the category
+    await async_client.delete(f"/incomes/{income['id']}", headers=headers)
+    response = await async_client.delete(f"/categories/{category.id}", headers=headers)
+    assert response.status_code == 204
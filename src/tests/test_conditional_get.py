@@ -0,0 +1,120 @@
+import pytest
+from httpx import AsyncClient
+
+from .. import middleware
+from ..services import incomes_services
+from .helpers import post_transaction
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/incomes/", "/expenses/", "/categories/", "/user/me/history"])
+async def test_list_endpoints_send_a_strong_etag(async_client: AsyncClient, access_token: str, path):
+    response = await async_client.get(path, headers={"Authorization": f"Bearer {access_token}"})
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_list_is_not_modified_without_a_query(
+    async_client: AsyncClient, access_token: str, category, monkeypatch
+):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await post_transaction(async_client, headers, category.id)
+    response = await async_client.get("/incomes/", headers=headers)
+    etag = response.headers["ETag"]
+
+    async def no_query(*args, **kwargs):
+        raise AssertionError("the list was queried")
+
+    monkeypatch.setattr(incomes_services, "get_incomes", no_query)
+    response = await async_client.get("/incomes/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_write_changes_the_etag(async_client: AsyncClient, access_token: str, category):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    etag = (await async_client.get("/incomes/", headers=headers)).headers["ETag"]
+    await post_transaction(async_client, headers, category.id)
+
+    response = await async_client.get("/incomes/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_etag_depends_on_the_query(async_client: AsyncClient, access_token: str):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    first = await async_client.get("/incomes/", headers=headers)
+    second = await async_client.get("/incomes/?limit=5", headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_gzipped(async_client: AsyncClient, access_token: str, category):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for i in range(20):
+        await post_transaction(async_client, headers, category.id, description=f"Salary {i}")
+
+    response = await async_client.get("/incomes/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(response.content)
+    assert len(response.json()) == 20
+
+
+@pytest.mark.asyncio
+async def test_encoded_bodies_get_their_own_etag(async_client: AsyncClient, access_token: str, category):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for i in range(20):
+        await post_transaction(async_client, headers, category.id, description=f"Salary {i}")
+
+    identity = await async_client.get("/incomes/", headers={**headers, "Accept-Encoding": "identity"})
+    gzipped = await async_client.get("/incomes/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] == identity.headers["ETag"][:-1] + '-gzip"'
+
+    response = await async_client.get(
+        "/incomes/", headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == gzipped.headers["ETag"]
+    response = await async_client.get(
+        "/incomes/", headers={**headers, "Accept-Encoding": "identity", "If-None-Match": identity.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == identity.headers["ETag"]
+
+
+@pytest.mark.asyncio
+async def test_brotli_is_preferred(async_client: AsyncClient, access_token: str, category):
+    pytest.importorskip("brotli")
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for i in range(20):
+        await post_transaction(async_client, headers, category.id, description=f"Salary {i}")
+
+    response = await async_client.get("/incomes/", headers={**headers, "Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert len(response.json()) == 20
+
+
+@pytest.mark.asyncio
+async def test_small_responses_are_not_compressed(async_client: AsyncClient):
+    response = await async_client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.json() == {"message": "Hello World"}
+
+
+def test_choose_encoding(monkeypatch):
+    assert middleware.choose_encoding("gzip, deflate") == "gzip"
+    assert middleware.choose_encoding("gzip;q=0, identity") is None
+    assert middleware.choose_encoding("") is None
+    monkeypatch.setattr(middleware, "brotli", None)
+    assert middleware.choose_encoding("br, gzip") == "gzip"
+    assert middleware.choose_encoding("*") == "gzip"
+
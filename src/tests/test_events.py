@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from .. import events
+from ..events import EventHub, Subscriber, event_hub
+from ..main import app
+from .helpers import post_transaction
+
+
+class EventStream:
+    # httpx's ASGITransport reads the whole body before returning, so the
+    # stream is driven through the ASGI interface directly
+    def __init__(self, token: str):
+        self.chunks: asyncio.Queue[bytes] = asyncio.Queue()
+        self.status = None
+        self.headers = {}
+        self.disconnected = asyncio.Event()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/user/events", "raw_path": b"/user/events", "root_path": "",
+            "query_string": b"", "client": ("127.0.0.1", 1234), "server": ("test", 80),
+            "headers": [(b"host", b"test"), (b"authorization", f"Bearer {token}".encode())],
+        }
+        self.task = asyncio.create_task(app(scope, self.receive, self.send))
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = {name.decode(): value.decode() for name, value in message["headers"]}
+        elif message.get("body"):
+            await self.chunks.put(message["body"])
+
+    async def read(self) -> str:
+        return (await asyncio.wait_for(self.chunks.get(), 2)).decode()
+
+    async def close(self):
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 2)
+
+
+def test_balance_deltas_coalesce():
+    subscriber = Subscriber()
+    subscriber.put({"type": "income.created", "data": {"id": 1}})
+    for delta in ("100", "-30.50", "0.25"):
+        subscriber.put({"type": "balance", "delta": delta})
+
+    events = asyncio.run(subscriber.get())
+    assert events == [{"type": "income.created", "data": {"id": 1}}, {"type": "balance", "delta": "69.75"}]
+
+
+def test_slow_subscriber_is_told_to_resync():
+    subscriber = Subscriber(maxsize=3)
+    for i in range(10):
+        subscriber.put({"type": "income.created", "data": {"id": i}})
+        subscriber.put({"type": "balance", "delta": "1"})
+    assert len(subscriber.events) == 0
+
+    assert asyncio.run(subscriber.get()) == [{"type": "resync"}]
+    subscriber.put({"type": "income.created", "data": {"id": 11}})
+    assert asyncio.run(subscriber.get()) == [{"type": "income.created", "data": {"id": 11}}]
+
+
+@pytest.mark.asyncio
+async def test_events_only_reach_their_user(monkeypatch):
+    monkeypatch.setattr(events, "get_redis", lambda: None)
+    hub = EventHub()
+    async with hub.subscribe(1) as mine, hub.subscribe(1) as other_tab, hub.subscribe(2) as theirs:
+        await hub.publish(1, {"type": "balance", "delta": "5"})
+        assert await mine.get() == [{"type": "balance", "delta": 5}]
+        assert await other_tab.get() == [{"type": "balance", "delta": 5}]
+        assert theirs.balance_delta is None
+    assert hub.subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_transactions_and_balance(async_client: AsyncClient, access_token: str, category):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    stream = EventStream(access_token)
+    assert (await stream.read()).startswith("retry:")
+    assert stream.status == 200
+    assert stream.headers["content-type"].startswith("text/event-stream")
+
+    income_id = (await post_transaction(async_client, headers, category.id))["id"]
+    chunk = await stream.read()
+    assert "event: income.created\n" in chunk
+    assert f'"id":{income_id}' in chunk
+    assert 'event: balance\ndata: {"delta":100}\n\n' in chunk
+
+    await async_client.delete(f"/incomes/{income_id}", headers=headers)
+    chunk = await stream.read()
+    assert f'event: income.deleted\ndata: {{"id":{income_id}}}\n\n' in chunk
+    assert 'data: {"delta":-100}' in chunk
+
+    await stream.close()
+    assert event_hub.subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_heartbeats(async_client: AsyncClient, access_token: str, monkeypatch):
+    monkeypatch.setattr(events, "EVENT_HEARTBEAT_INTERVAL", 0.01)
+    stream = EventStream(access_token)
+    await stream.read()
+    assert await stream.read() == ": keep-alive\n\n"
+    await stream.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_requires_a_token(async_client: AsyncClient):
+    response = await async_client.get("/user/events")
+    assert response.status_code == 401
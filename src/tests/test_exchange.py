@@ -0,0 +1,168 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+from fastapi_cache import FastAPICache
+
+from .. import metrics
+from ..circuit_breaker import CircuitBreaker
+from ..config.settings import settings
+from ..services import exchange_services
+
+
+@pytest.mark.asyncio
+async def test_rates_are_served_from_the_refreshed_snapshot(monkeypatch):
+    calls = []
+
+    async def fake_fetch():
+        calls.append(1)
+        return [{"descripcion": "Dolar", "tipoCotizacion": 1000}]
+
+    monkeypatch.setattr(exchange_services, "fetch_exchange_rates", fake_fetch)
+
+    await exchange_services.refresh_exchange_rates()
+    rates = await exchange_services.get_exchange_rates()
+
+    assert rates == [{"descripcion": "Dolar", "tipoCotizacion": 1000}]
+    assert len(calls) == 1
+
+
+class StubBCRA(BaseHTTPRequestHandler):
+    """Fault-injecting stand-in for the BCRA API: `mode` is ok, error
+    (HTTP 500), slow (answers after the read timeout), reset (closes the
+    connection without answering) or html (a 200 that is not JSON)."""
+
+    mode = "ok"
+    hits = 0
+    connections = 0
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+
+    def setup(self):
+        type(self).connections += 1
+        super().setup()
+
+    def do_GET(self):
+        type(self).hits += 1
+        if self.mode == "reset":
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        if self.mode == "slow":
+            time.sleep(0.5)
+        status = 500 if self.mode == "error" else 200
+        body = json.dumps([{"descripcion": "Dolar", "tipoCotizacion": 1000}]).encode()
+        if self.mode == "html":
+            body = b"<html>Servicio en mantenimiento</html>"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+async def bcra_stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBCRA)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    StubBCRA.mode, StubBCRA.hits, StubBCRA.connections = "ok", 0, 0
+    monkeypatch.setattr(settings, "BCRA_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(settings, "BCRA_READ_TIMEOUT", 0.2)
+    monkeypatch.setattr(exchange_services, "bcra_breaker", CircuitBreaker("bcra", failure_threshold=2, reset_timeout=0.3))
+    yield StubBCRA
+    # The pooled client is bound to this test's event loop and timeouts
+    await exchange_services.close_bcra_client()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_calls_reuse_the_pooled_connection(bcra_stub):
+    for _ in range(3):
+        assert await exchange_services.fetch_exchange_rates() == [{"descripcion": "Dolar", "tipoCotizacion": 1000}]
+    assert (bcra_stub.hits, bcra_stub.connections) == (3, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, status", [("error", 500), ("slow", 504), ("reset", 502), ("html", 502)])
+async def test_upstream_failures_are_bounded(bcra_stub, mode, status):
+    bcra_stub.mode = mode
+    start = time.perf_counter()
+    with pytest.raises(HTTPException) as exc_info:
+        await exchange_services.fetch_exchange_rates()
+    assert exc_info.value.status_code == status
+    assert time.perf_counter() - start < 0.45
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_fails_fast_and_recovers(bcra_stub):
+    breaker = exchange_services.bcra_breaker
+    bcra_stub.mode = "error"
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await exchange_services.fetch_exchange_rates()
+    assert breaker.state == "open"
+    assert metrics.circuit_breaker_state.value("bcra") == 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        await exchange_services.fetch_exchange_rates()
+    assert exc_info.value.status_code == 503
+    assert "Retry-After" in exc_info.value.headers
+    assert bcra_stub.hits == 2  # rejected without calling BCRA
+
+    bcra_stub.mode = "ok"
+    await asyncio.sleep(0.3)
+    assert await exchange_services.fetch_exchange_rates() == [{"descripcion": "Dolar", "tipoCotizacion": 1000}]
+    assert breaker.state == "closed"
+    assert metrics.circuit_breaker_state.value("bcra") == 0
+
+
+@pytest.mark.asyncio
+async def test_half_open_failure_reopens(bcra_stub):
+    breaker = exchange_services.bcra_breaker
+    bcra_stub.mode = "error"
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await exchange_services.fetch_exchange_rates()
+    await asyncio.sleep(0.3)
+    with pytest.raises(HTTPException) as exc_info:
+        await exchange_services.fetch_exchange_rates()
+    assert exc_info.value.status_code == 500  # the trial call reached BCRA
+    assert breaker.state == "open"
+    assert bcra_stub.hits == 3
+
+
+@pytest.mark.asyncio
+async def test_last_good_snapshot_is_served_while_bcra_is_down(bcra_stub):
+    await exchange_services.refresh_exchange_rates()
+    await FastAPICache.get_backend().clear(key=exchange_services.rates_cache_key())  # the fresh copy expired
+
+    bcra_stub.mode = "error"
+    for _ in range(3):
+        rates = await exchange_services.get_exchange_rates()
+        assert rates == [{"descripcion": "Dolar", "tipoCotizacion": 1000}]
+    assert exchange_services.bcra_breaker.state == "open"
+    assert bcra_stub.hits == 3  # 1 refresh + 2 failures, then rejected
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_the_breaker(bcra_stub, monkeypatch):
+    def not_found(self):
+        type(self).hits += 1
+        self.send_error(404)
+
+    monkeypatch.setattr(StubBCRA, "do_GET", not_found)
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc_info:
+            await exchange_services.fetch_exchange_rates()
+        assert exc_info.value.status_code == 404
+    assert exchange_services.bcra_breaker.state == "closed"
@@ -0,0 +1,65 @@
+import pytest
+from httpx import AsyncClient
+
+from ..fields import parse_fields
+from ..schemas.incomes_schema import IncomeOut
+from ..services import incomes_services
+from .helpers import post_transaction
+from .test_query_plans import capture_statements
+
+
+@pytest.fixture
+async def headers(async_client: AsyncClient, access_token: str, category):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for path in ("/incomes/", "/expenses/"):
+        await post_transaction(async_client, headers, category.id, path, amount=100.5)
+    return headers
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/incomes/", "/expenses/"])
+async def test_only_requested_fields_are_returned(async_client: AsyncClient, headers, path):
+    full = (await async_client.get(path, headers=headers)).json()
+    response = await async_client.get(path, headers=headers, params={"fields": "date,id,amount"})
+    assert response.status_code == 200
+    assert response.json() == [{"amount": "100.50", "date": "2025-07-21T14:00:00", "id": full[0]["id"]}]
+
+
+@pytest.mark.asyncio
+async def test_query_reads_only_the_requested_columns(db_session, test_user):
+    statements = await capture_statements(
+        lambda: incomes_services.get_incomes(db_session, test_user, None, None, columns=("amount", "id"))
+    )
+    (statement, _), = statements
+    selected = statement.split("FROM")[0]
+    assert "incomes.amount" in selected and "incomes.id" in selected
+    assert "description" not in selected and "categories" not in statement
+
+
+@pytest.mark.asyncio
+async def test_categories_fields(async_client: AsyncClient, headers, category):
+    response = await async_client.get("/categories/", headers=headers, params={"fields": "name"})
+    assert response.json() == [{"name": "salary"}]
+
+
+@pytest.mark.asyncio
+async def test_sparse_lists_are_cached(async_client: AsyncClient, headers):
+    first = await async_client.get("/incomes/", headers=headers, params={"fields": "id"})
+    second = await async_client.get("/incomes/", headers=headers, params={"fields": "id"})
+    assert first.json() == second.json()
+    assert second.headers["content-type"] == "application/json"
+    # The full list is cached under its own key
+    assert len((await async_client.get("/incomes/", headers=headers)).json()[0]) == 6
+
+
+@pytest.mark.asyncio
+async def test_unknown_fields_are_rejected(async_client: AsyncClient, headers):
+    response = await async_client.get("/incomes/", headers=headers, params={"fields": "id,password"})
+    assert response.status_code == 422
+    assert "amount" in response.json()["detail"]
+
+
+def test_parse_fields():
+    assert parse_fields(None, IncomeOut) is None
+    assert parse_fields(" id , amount,id", IncomeOut) == ("amount", "id")
+    assert parse_fields(",".join(IncomeOut.model_fields), IncomeOut) is None
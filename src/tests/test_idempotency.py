@@ -0,0 +1,162 @@
+import asyncio
+import datetime
+from contextlib import asynccontextmanager
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError
+
+from .. import idempotency, tasks
+from ..models.expenses_model import ExpenseModel
+from ..models.idempotency_key_model import IdempotencyKey
+from ..models.incomes_model import IncomeModel
+from ..services import incomes_services
+
+INCOME = {"amount": 100, "description": "Salary", "date": "2025-07-21T14:00:00"}
+
+
+async def count(db_session, model) -> int:
+    return (await db_session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_retry_returns_the_stored_response(
+    async_client: AsyncClient, access_token: str, category, db_session, monkeypatch
+):
+    headers = {"Authorization": f"Bearer {access_token}", "Idempotency-Key": "retry-1"}
+    payload = {**INCOME, "category_id": category.id}
+    first = await async_client.post("/incomes/", headers=headers, json=payload)
+    assert first.status_code == 200
+
+    async def no_write(*args, **kwargs):
+        raise AssertionError("the retry wrote to the ledger")
+
+    monkeypatch.setattr(incomes_services, "create_income", no_write)
+    retry = await async_client.post("/incomes/", headers=headers, json=payload)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert await count(db_session, IncomeModel) == 1
+
+
+@pytest.mark.asyncio
+async def test_expense_retry_keeps_the_created_status(
+    async_client: AsyncClient, access_token: str, category, db_session
+):
+    headers = {"Authorization": f"Bearer {access_token}", "Idempotency-Key": "retry-2"}
+    payload = {**INCOME, "category_id": category.id}
+    first = await async_client.post("/expenses/", headers=headers, json=payload)
+    retry = await async_client.post("/expenses/", headers=headers, json=payload)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert await count(db_session, ExpenseModel) == 1
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_another_request(async_client: AsyncClient, access_token: str, category):
+    headers = {"Authorization": f"Bearer {access_token}", "Idempotency-Key": "reused"}
+    await async_client.post("/incomes/", headers=headers, json={**INCOME, "category_id": category.id})
+    response = await async_client.post(
+        "/incomes/", headers=headers, json={**INCOME, "amount": 200, "category_id": category.id}
+    )
+    assert response.status_code == 422
+    response = await async_client.post("/expenses/", headers=headers, json={**INCOME, "category_id": category.id})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_create_one_row(
+    async_client: AsyncClient, access_token: str, category, db_session, monkeypatch
+):
+    create_income = incomes_services.create_income
+
+    async def slow_create(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await create_income(*args, **kwargs)
+
+    monkeypatch.setattr(incomes_services, "create_income", slow_create)
+    headers = {"Authorization": f"Bearer {access_token}", "Idempotency-Key": "concurrent"}
+    payload = {**INCOME, "category_id": category.id}
+    responses = await asyncio.gather(*(async_client.post("/incomes/", headers=headers, json=payload) for _ in range(3)))
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert await count(db_session, IncomeModel) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_key_write_leaves_no_row(
+    async_client: AsyncClient, access_token: str, category, db_session
+):
+    def fail(*args):
+        raise IntegrityError("UPDATE idempotency_keys", {}, Exception("disk full"))
+
+    headers = {"Authorization": f"Bearer {access_token}", "Idempotency-Key": "atomic"}
+    payload = {**INCOME, "category_id": category.id}
+    event.listen(IdempotencyKey, "before_update", fail)
+    try:
+        response = await async_client.post("/expenses/", headers=headers, json=payload)
+    finally:
+        event.remove(IdempotencyKey, "before_update", fail)
+    assert response.status_code == 422
+    assert await count(db_session, ExpenseModel) == 0
+    assert await count(db_session, IdempotencyKey) == 0
+
+    # Nothing was stored, so the retry creates the row once
+    assert (await async_client.post("/expenses/", headers=headers, json=payload)).status_code == 201
+    assert (await async_client.post("/expenses/", headers=headers, json=payload)).status_code == 201
+    assert await count(db_session, ExpenseModel) == 1
+
+
+@pytest.mark.asyncio
+async def test_without_the_lock_the_unique_key_decides(
+    async_client: AsyncClient, access_token: str, category, db_session, monkeypatch
+):
+    @asynccontextmanager
+    async def unreachable_lock(*args, **kwargs):
+        yield False
+
+    monkeypatch.setattr(idempotency, "distributed_lock", unreachable_lock)
+    headers = {"Authorization": f"Bearer {access_token}", "Idempotency-Key": "no-redis"}
+    payload = {**INCOME, "category_id": category.id}
+    first = await async_client.post("/incomes/", headers=headers, json=payload)
+    assert first.status_code == 200
+
+    # A duplicate that checked before the first committed loses on the insert
+    stored_response = idempotency.stored_response
+    checks = []
+
+    async def raced(*args):
+        checks.append(args)
+        return None if len(checks) == 1 else await stored_response(*args)
+
+    monkeypatch.setattr(idempotency, "stored_response", raced)
+    retry = await async_client.post("/incomes/", headers=headers, json=payload)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert await count(db_session, IncomeModel) == 1
+
+
+@pytest.mark.asyncio
+async def test_without_a_key_every_post_creates(async_client: AsyncClient, access_token: str, category, db_session):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for _ in range(2):
+        await async_client.post("/incomes/", headers=headers, json={**INCOME, "category_id": category.id})
+    assert await count(db_session, IncomeModel) == 2
+    assert await count(db_session, IdempotencyKey) == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_expired_keys(db_session, patched_session, test_user):
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    db_session.add_all([
+        IdempotencyKey(user_id=test_user.id, key=key, request_hash="0" * 64, status_code=200,
+                       response_body="{}", expires_at=expires_at)
+        for key, expires_at in (("old", now - datetime.timedelta(hours=1)), ("live", now + datetime.timedelta(hours=1)))
+    ])
+    await db_session.commit()
+
+    assert await tasks.purge_idempotency_keys() == 1
+    keys = (await db_session.execute(select(IdempotencyKey.key))).scalars().all()
+    assert keys == ["live"]
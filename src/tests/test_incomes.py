@@ -1,52 +1,23 @@
 import pytest
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.user_model import UserModel
 from ..models.categories_model import CategoryModel
-from ..services.password_services import PasswordService
-
-
-@pytest.fixture(scope="function")
-async def test_user(db_session: AsyncSession):
-    user = UserModel(
-        username="testuser",
-        full_name="Test User",
-        email="testuser@example.com",
-        password=PasswordService.hash_password("password"),
-    )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
-
-
-@pytest.fixture(scope="function")
-async def test_category(db_session: AsyncSession, test_user: UserModel):
-    category = CategoryModel(
-        name="Test Category",
-        type="income",
-        user_id=test_user.id
-    )
-    db_session.add(category)
-    await db_session.commit()
-    await db_session.refresh(category)
-    return category
 
 
 @pytest.mark.asyncio
-async def test_create_income(async_client: AsyncClient, access_token: str, test_user: UserModel, test_category: CategoryModel):
-    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": test_category.id})
+async def test_create_income(async_client: AsyncClient, access_token: str, test_user: UserModel, category: CategoryModel):
+    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": category.id})
     assert response.status_code == 200
     data = response.json()
     assert data["amount"] == 100
     assert data["description"] == "Test Income"
     assert data["user_id"] == test_user.id
-    assert data["category_id"] == test_category.id
+    assert data["category_id"] == category.id
 
 @pytest.mark.asyncio
-async def test_get_incomes(async_client: AsyncClient, access_token: str, test_user: UserModel, test_category: CategoryModel):
-    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": test_category.id})
+async def test_get_incomes(async_client: AsyncClient, access_token: str, test_user: UserModel, category: CategoryModel):
+    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": category.id})
     assert response.status_code == 200
 
     response = await async_client.get("/incomes/", headers={"Authorization": f"Bearer {access_token}"})
@@ -56,12 +27,12 @@ async def test_get_incomes(async_client: AsyncClient, access_token: str, test_us
     assert data[0]["amount"] == 100
     assert data[0]["description"] == "Test Income"
     assert data[0]["user_id"] == test_user.id
-    assert data[0]["category_id"] == test_category.id
+    assert data[0]["category_id"] == category.id
 
 
 @pytest.mark.asyncio
-async def test_get_income_by_id(async_client: AsyncClient, access_token: str, test_user: UserModel, test_category: CategoryModel):
-    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": test_category.id})
+async def test_get_income_by_id(async_client: AsyncClient, access_token: str, test_user: UserModel, category: CategoryModel):
+    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": category.id})
     assert response.status_code == 200
     income_id = response.json()["id"]
 
@@ -71,16 +42,16 @@ async def test_get_income_by_id(async_client: AsyncClient, access_token: str, te
     assert data["amount"] == 100
     assert data["description"] == "Test Income"
     assert data["user_id"] == test_user.id
-    assert data["category_id"] == test_category.id
+    assert data["category_id"] == category.id
 
 
 @pytest.mark.asyncio
-async def test_update_income(async_client: AsyncClient, access_token: str, test_user: UserModel, test_category: CategoryModel):
-    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": test_category.id})
+async def test_update_income(async_client: AsyncClient, access_token: str, test_user: UserModel, category: CategoryModel):
+    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": category.id})
     assert response.status_code == 200
     income_id = response.json()["id"]
 
-    response = await async_client.put(f"/incomes/{income_id}", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 200, "description": "Updated Income", "date": "2025-07-21T14:00:00", "category_id": test_category.id})
+    response = await async_client.put(f"/incomes/{income_id}", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 200, "description": "Updated Income", "date": "2025-07-21T14:00:00", "category_id": category.id})
     assert response.status_code == 200
     data = response.json()
     assert data["amount"] == 200
@@ -88,8 +59,8 @@ async def test_update_income(async_client: AsyncClient, access_token: str, test_
 
 
 @pytest.mark.asyncio
-async def test_delete_income(async_client: AsyncClient, access_token: str, test_user: UserModel, test_category: CategoryModel):
-    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": test_category.id})
+async def test_delete_income(async_client: AsyncClient, access_token: str, test_user: UserModel, category: CategoryModel):
+    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 100, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": category.id})
     assert response.status_code == 200
     income_id = response.json()["id"]
 
@@ -98,3 +69,34 @@ async def test_delete_income(async_client: AsyncClient, access_token: str, test_
 
     response = await async_client.get(f"/incomes/{income_id}", headers={"Authorization": f"Bearer {access_token}"})
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_income_amount_keeps_cents(async_client: AsyncClient, access_token: str, category: CategoryModel):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for amount, sent in ((0.1, "0.10"), (0.2, "0.20")):
+        response = await async_client.post("/incomes/", headers=headers, json={"amount": amount, "description": "Cents", "date": "2025-07-21T14:00:00", "category_id": category.id})
+        assert response.status_code == 200
+        assert response.json()["amount"] == sent
+
+    response = await async_client.get("/user/balance/incomes", headers=headers)
+    assert response.json() == {"balance": "0.30"}
+
+
+@pytest.mark.asyncio
+async def test_income_amount_rejects_sub_cent_values(async_client: AsyncClient, access_token: str, category: CategoryModel):
+    response = await async_client.post("/incomes/", headers={"Authorization": f"Bearer {access_token}"}, json={"amount": 10.005, "description": "Test Income", "date": "2025-07-21T14:00:00", "category_id": category.id})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_incomes_to_date_includes_whole_day(async_client: AsyncClient, access_token: str, category: CategoryModel):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = await async_client.post("/incomes/", headers=headers, json={"amount": 100, "description": "Afternoon", "date": "2025-07-21T14:00:00", "category_id": category.id})
+    assert response.status_code == 200
+
+    response = await async_client.get("/incomes/", headers=headers, params={"from_date": "2025-07-21", "to_date": "2025-07-21"})
+    assert [income["description"] for income in response.json()] == ["Afternoon"]
+
+    response = await async_client.get("/incomes/", headers=headers, params={"to_date": "2025-07-20"})
+    assert response.json() == []
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from httpx import AsyncClient
+
+from ..main import app
+from ..services.token_services import AsymmetricBackend, TokenError, TokenService, b64url_decode, get_token_service
+
+
+def new_key(algorithm: str):
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+def token_header(token: str) -> dict:
+    return json.loads(b64url_decode(token.split(".")[0]))
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_tokens_carry_kid_and_survive_key_rotation(algorithm):
+    old_key, new_key_ = new_key(algorithm), new_key(algorithm)
+    before = AsymmetricBackend([old_key], algorithm)
+    token = before.encode({"sub": "testuser"})
+    assert token_header(token) == {"alg": algorithm, "typ": "JWT", "kid": before.kid}
+
+    # Rotated: the new key signs, the old one still verifies
+    rotated = AsymmetricBackend([new_key_, old_key], algorithm)
+    assert rotated.decode(token) == {"sub": "testuser"}
+    assert token_header(rotated.encode({"sub": "testuser"}))["kid"] != before.kid
+
+    # Old key retired
+    with pytest.raises(TokenError):
+        AsymmetricBackend([new_key_], algorithm).decode(token)
+
+
+def test_jwk_verifies_tokens_without_the_private_key():
+    backend = AsymmetricBackend([new_key("RS256")], "RS256")
+    token = backend.encode({"sub": "testuser"})
+    jwk = backend.jwks()[0]
+    assert jwk["kid"] == token_header(token)["kid"]
+
+    public_key = RSAPublicNumbers(
+        int.from_bytes(b64url_decode(jwk["e"]), "big"), int.from_bytes(b64url_decode(jwk["n"]), "big")
+    ).public_key()
+    signing_input, _, signature = token.rpartition(".")
+    public_key.verify(b64url_decode(signature), signing_input.encode(), padding.PKCS1v15(), hashes.SHA256())
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint_is_cacheable(async_client: AsyncClient):
+    backend = AsymmetricBackend([new_key("EdDSA")], "EdDSA")
+    service = TokenService(backend)
+    app.dependency_overrides[get_token_service] = lambda: service
+
+    response = await async_client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": backend.jwks()}
+    assert "max-age=3600" in response.headers["cache-control"]
+
+    etag = response.headers["etag"]
+    not_modified = await async_client.get("/.well-known/jwks.json", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_jwks_is_empty_for_shared_secret_tokens(async_client: AsyncClient):
+    response = await async_client.get("/.well-known/jwks.json")
+    assert response.json() == {"keys": []}
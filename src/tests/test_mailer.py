@@ -0,0 +1,82 @@
+import datetime
+import socket
+
+import pytest
+from sqlalchemy import select
+
+from .. import mailer, metrics
+from ..config.settings import settings
+from ..models.outbound_email_model import OutboundEmail
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class SinkHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = SinkHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(settings, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_PORT", port)
+    monkeypatch.setattr(settings, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(settings, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(settings, "USE_CREDENTIALS", False)
+    yield handler
+    controller.stop()
+
+
+@pytest.mark.asyncio
+async def test_queued_emails_are_sent_in_batches_over_pooled_connections(smtp_sink, patched_session):
+    for i in range(5):
+        mailer.enqueue_email(patched_session, f"user{i}@example.com", "Hello", "<p>Hi</p>")
+    await patched_session.commit()
+
+    pool = mailer.SMTPPool(size=1)
+    assert await mailer.send_pending_emails(pool=pool, batch_size=2) == 5
+    await pool.close()
+
+    assert sorted(m.rcpt_tos[0] for m in smtp_sink.messages) == [f"user{i}@example.com" for i in range(5)]
+    assert smtp_sink.sessions == 1  # one connection for all three batches
+    statuses = (await patched_session.execute(select(OutboundEmail.status))).scalars().all()
+    assert statuses == ["sent"] * 5
+    assert metrics.outbound_email_queue_depth.value() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_sends_are_retried_with_backoff(patched_session, monkeypatch):
+    monkeypatch.setattr(settings, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_PORT", 1)  # nothing listens there
+    mailer.enqueue_email(patched_session, "user@example.com", "Hello", "<p>Hi</p>")
+    await patched_session.commit()
+
+    assert await mailer.send_pending_emails(pool=mailer.SMTPPool()) == 0
+
+    email = (await patched_session.execute(select(OutboundEmail))).scalars().one()
+    assert email.status == "pending"
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > datetime.datetime.now() + datetime.timedelta(seconds=20)
+    assert metrics.outbound_email_queue_depth.value() == 1
+
+    # Not due yet, so the next run leaves it alone
+    assert await mailer.send_pending_emails(pool=mailer.SMTPPool()) == 0
+    email = (await patched_session.execute(select(OutboundEmail))).scalars().one()
+    assert email.attempts == 1
@@ -0,0 +1,49 @@
+import pytest
+from httpx import AsyncClient
+
+from .. import metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_latency_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.1, "/a")
+    histogram.observe(5.0, "/a")
+    assert list(histogram.samples()) == [
+        'test_latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'test_latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'test_latency_seconds_sum{route="/a"} 5.15',
+        'test_latency_seconds_count{route="/a"} 3',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template(async_client: AsyncClient, access_token: str):
+    before = metrics.http_requests_total.value("GET", "/categories/{category_id}", "404")
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = await async_client.get("/categories/12345", headers=headers)
+    assert response.status_code == 404
+    assert metrics.http_requests_total.value("GET", "/categories/{category_id}", "404") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_db_and_cache_metrics(async_client: AsyncClient, access_token: str):
+    queries_before = metrics.http_request_db_queries.count("GET", "/categories/")
+    misses_before = metrics.cache_requests_total.value("/categories/", "miss")
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = await async_client.get("/categories/", headers=headers)
+    assert response.status_code == 200
+    assert metrics.http_request_db_queries.count("GET", "/categories/") == queries_before + 1
+    assert metrics.cache_requests_total.value("/categories/", "miss") == misses_before + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposition(async_client: AsyncClient):
+    await async_client.get("/")
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in body
@@ -0,0 +1,74 @@
+import os
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from ..config.settings import settings
+from ..profiling import StackSampler
+
+
+@pytest.fixture(scope="function")
+def profiling_token(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "profile-secret")
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "PROFILING_OUTPUT_DIR", None)
+    return "profile-secret"
+
+
+@pytest.mark.asyncio
+async def test_profile_breakdown_header(async_client: AsyncClient, access_token: str, profiling_token: str):
+    headers = {"Authorization": f"Bearer {access_token}", "X-Profile-Token": profiling_token}
+    response = await async_client.get("/user/me/history", headers=headers)
+    assert response.status_code == 200
+    breakdown = dict(part.split("=") for part in response.headers["X-Profile"].split("; "))
+    assert int(breakdown["queries"]) >= 3
+    assert breakdown["db"].endswith("ms")
+
+
+@pytest.mark.asyncio
+async def test_profile_counts_cache_status(async_client: AsyncClient, access_token: str, profiling_token: str):
+    headers = {"Authorization": f"Bearer {access_token}", "X-Profile-Token": profiling_token}
+    response = await async_client.get("/categories/", headers=headers)
+    assert response.status_code == 200
+    assert "cache_misses=1" in response.headers["X-Profile"]
+
+
+@pytest.mark.asyncio
+async def test_profile_wrong_token_is_ignored(async_client: AsyncClient, access_token: str, profiling_token: str):
+    headers = {"Authorization": f"Bearer {access_token}", "X-Profile-Token": "wrong"}
+    response = await async_client.get("/user/me/history", headers=headers)
+    assert response.status_code == 200
+    assert "X-Profile" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_profile_writes_flamegraph_artifact(
+    async_client: AsyncClient, access_token: str, profiling_token: str, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "PROFILING_OUTPUT_DIR", str(tmp_path))
+    headers = {"Authorization": f"Bearer {access_token}", "X-Profile-Token": profiling_token}
+    response = await async_client.get("/user/me/history", headers=headers)
+    assert response.status_code == 200
+    artifact = response.headers["X-Profile-Artifact"]
+    assert artifact.endswith("-get-user_me_history.folded")
+    assert os.path.exists(tmp_path / artifact)
+
+
+@pytest.mark.asyncio
+async def test_profile_artifact_is_written_off_the_event_loop(
+    async_client: AsyncClient, access_token: str, profiling_token: str, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "PROFILING_OUTPUT_DIR", str(tmp_path))
+    dump = StackSampler.dump
+    threads = []
+
+    def recording_dump(self, *args):
+        threads.append(threading.get_ident())
+        return dump(self, *args)
+
+    monkeypatch.setattr(StackSampler, "dump", recording_dump)
+    headers = {"Authorization": f"Bearer {access_token}", "X-Profile-Token": profiling_token}
+    response = await async_client.get("/user/me/history", headers=headers)
+    assert response.status_code == 200
+    assert threads and threads[0] != threading.get_ident()
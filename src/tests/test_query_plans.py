@@ -0,0 +1,73 @@
+import datetime
+import re
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.user_model import UserModel
+from ..services import balance_services, expenses_services, history_services, incomes_services
+from .conftest import engine
+
+# A plan step that reads a whole ledger table (or a whole index of it)
+# instead of searching it by user_id.
+FULL_SCAN = re.compile(r"^SCAN (incomes|expenses)\b")
+
+
+async def capture_statements(coroutine_factory) -> list[tuple[str, tuple]]:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await coroutine_factory()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    return statements
+
+
+async def query_plan(db: AsyncSession, statement: str, parameters: tuple) -> list[str]:
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[-1] for row in result]
+
+
+HOT_QUERIES = {
+    "incomes list": lambda db, user: incomes_services.get_incomes(db, user, None, None),
+    "incomes by date": lambda db, user: incomes_services.get_incomes(
+        db, user, datetime.date(2025, 1, 1), datetime.date(2025, 12, 31)
+    ),
+    "incomes sparse fields": lambda db, user: incomes_services.get_incomes(
+        db, user, None, None, columns=("id", "amount", "date")
+    ),
+    "expenses list": lambda db, user: expenses_services.get_expenses(db, user, None, None),
+    "expenses by date": lambda db, user: expenses_services.get_expenses(
+        db, user, datetime.date(2025, 1, 1), datetime.date(2025, 12, 31)
+    ),
+    "balance": lambda db, user: balance_services.get_balance(db, user),
+    "history": lambda db, user: history_services.get_history_entries(
+        db, user, datetime.date(2025, 1, 1), None
+    ),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", HOT_QUERIES)
+async def test_hot_queries_use_indexes(name: str, db_session: AsyncSession, test_user: UserModel):
+    statements = await capture_statements(lambda: HOT_QUERIES[name](db_session, test_user))
+    assert statements
+    for statement, parameters in statements:
+        plan = await query_plan(db_session, statement, parameters)
+        full_scans = [step for step in plan if FULL_SCAN.match(step)]
+        assert not full_scans, f"{name} regressed to a full scan: {plan}\n{statement}"
+
+
+@pytest.mark.asyncio
+async def test_balance_sum_is_index_only(db_session: AsyncSession, test_user: UserModel):
+    statements = await capture_statements(lambda: balance_services.get_total_incomes(db_session, test_user))
+    (statement, parameters), = statements
+    plan = await query_plan(db_session, statement, parameters)
+    assert any("COVERING INDEX ix_incomes_user_id_date" in step for step in plan), plan
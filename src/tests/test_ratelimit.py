@@ -0,0 +1,86 @@
+import pytest
+from httpx import AsyncClient
+
+from ..config.settings import settings
+from ..ratelimit import MemoryBackend, Rate
+
+
+@pytest.fixture
+def strict_limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(settings, "RATE_LIMITS", {**settings.RATE_LIMITS, "login": "2/minute"})
+
+
+def test_rate_parsing():
+    assert Rate.parse("5/minute") == Rate(5, 5 / 60)
+    assert Rate.parse("100/hour").capacity == 100
+
+
+@pytest.mark.asyncio
+async def test_memory_bucket_refills_over_time(monkeypatch):
+    import time
+
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    backend = MemoryBackend()
+    rate = Rate.parse("2/minute")
+
+    assert await backend.acquire("key", rate) == 0
+    assert await backend.acquire("key", rate) == 0
+    assert await backend.acquire("key", rate) == pytest.approx(30)
+
+    clock[0] += 30
+    assert await backend.acquire("key", rate) == 0
+
+
+@pytest.mark.asyncio
+async def test_login_is_limited_per_username(async_client: AsyncClient, test_user, strict_limits):
+    for _ in range(2):
+        response = await async_client.post("/auth/login", data={"username": "testuser", "password": "wrong"})
+        assert response.status_code == 401
+
+    response = await async_client.post("/auth/login", data={"username": "testuser", "password": "password"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_login_is_limited_per_ip_across_usernames(async_client: AsyncClient, db_session, strict_limits):
+    statuses = [
+        (await async_client.post("/auth/login", data={"username": f"user{i}", "password": "x"})).status_code
+        for i in range(3)
+    ]
+    assert statuses == [404, 404, 429]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiting_can_be_disabled(async_client: AsyncClient, db_session, strict_limits, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    for i in range(3):
+        response = await async_client.post("/auth/login", data={"username": f"user{i}", "password": "x"})
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_redis_bucket_is_shared_and_refills():
+    if not settings.REDIS_URL:
+        pytest.skip("REDIS_URL is not set")
+    import uuid
+    from redis import asyncio as aioredis
+    from ..ratelimit import RedisBackend
+
+    redis = aioredis.from_url(settings.REDIS_URL)
+    try:
+        await redis.ping()
+    except Exception:
+        pytest.skip("Redis is not reachable")
+    backend = RedisBackend(redis, MemoryBackend())
+    other_worker = RedisBackend(redis, MemoryBackend())
+    key, rate = f"ratelimit:test:{uuid.uuid4()}", Rate.parse("2/minute")
+
+    assert await backend.acquire(key, rate) == 0
+    assert await other_worker.acquire(key, rate) == 0
+    assert await backend.acquire(key, rate) == pytest.approx(30, abs=1)
+    await redis.delete(key)
+    await redis.close()
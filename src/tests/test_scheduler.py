@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from .. import metrics, scheduler as scheduler_module
+from ..scheduler import Scheduler
+
+
+@pytest.fixture(autouse=True)
+def local_leases(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "get_redis", lambda: None)
+
+
+@pytest.mark.asyncio
+async def test_lease_allows_one_run_per_interval():
+    scheduler = Scheduler()
+    runs = []
+
+    @scheduler.job("test_lease", every=60)
+    async def job():
+        runs.append(1)
+
+    assert await scheduler.run_job(scheduler.jobs["test_lease"]) is True
+    assert await scheduler.run_job(scheduler.jobs["test_lease"]) is False
+    assert len(runs) == 1
+    assert metrics.scheduler_job_runs_total.value("test_lease", "skipped") >= 1
+
+
+@pytest.mark.asyncio
+async def test_failing_job_is_recorded_and_does_not_raise():
+    scheduler = Scheduler()
+
+    @scheduler.job("test_failing", every=60)
+    async def job():
+        raise RuntimeError("boom")
+
+    before = metrics.scheduler_job_runs_total.value("test_failing", "error")
+    assert await scheduler.run_job(scheduler.jobs["test_failing"]) is True
+    assert metrics.scheduler_job_runs_total.value("test_failing", "error") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_start_runs_jobs_in_background():
+    scheduler = Scheduler()
+    started = asyncio.Event()
+
+    @scheduler.job("test_background", every=60, jitter=0)
+    async def job():
+        started.set()
+
+    scheduler.start()  # returns without waiting for the job
+    assert not started.is_set()
+    await asyncio.wait_for(started.wait(), timeout=1)
+    await scheduler.stop()
+
+
+def test_duplicate_job_names_are_rejected():
+    scheduler = Scheduler()
+    scheduler.job("test_duplicate", every=60)(lambda: None)
+    with pytest.raises(ValueError):
+        scheduler.job("test_duplicate", every=60)(lambda: None)
@@ -0,0 +1,143 @@
+import datetime
+
+import pytest
+from httpx import AsyncClient
+
+from ..config.database import base
+from ..config.settings import settings
+from ..models.incomes_model import IncomeModel
+from ..services import search_services
+from ..services.search_services import InvertedIndex
+from .conftest import engine
+from .helpers import post_transaction
+from .test_query_plans import capture_statements
+
+
+@pytest.fixture(params=["auto", "memory"])
+def search_backend(request, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", request.param)
+    return request.param
+
+
+async def search(async_client: AsyncClient, headers: dict, q: str, **params) -> list[dict]:
+    response = await async_client.get("/transactions/search", headers=headers, params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_search_finds_incomes_and_expenses(
+    async_client: AsyncClient, access_token: str, category, search_backend
+):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    salary = await post_transaction(async_client, headers, category.id, description="Salary July")
+    coffee = await post_transaction(async_client, headers, category.id, "/expenses/", description="Coffee with Ana")
+    coffee_beans = await post_transaction(
+        async_client, headers, category.id, "/expenses/", description="Coffee beans, coffee filters"
+    )
+    await post_transaction(async_client, headers, category.id, "/expenses/", description="Rent")
+
+    hits = await search(async_client, headers, "coff")
+    assert [(h["type"], h["id"]) for h in hits] == [("expense", coffee_beans["id"]), ("expense", coffee["id"])]
+    assert hits[0]["score"] > hits[1]["score"]
+
+    assert [h["id"] for h in await search(async_client, headers, "COFFEE ana")] == [coffee["id"]]
+    assert [(h["type"], h["id"], h["amount"]) for h in await search(async_client, headers, "salary")] == [
+        ("income", salary["id"], 100)
+    ]
+    assert await search(async_client, headers, "groceries") == []
+
+    page = await search(async_client, headers, "coffee", skip=1, limit=1)
+    assert [h["id"] for h in page] == [coffee["id"]]
+
+
+@pytest.mark.asyncio
+async def test_updates_and_deletes_reach_the_index(
+    async_client: AsyncClient, access_token: str, category, search_backend
+):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    income = await post_transaction(async_client, headers, category.id, description="Freelance invoice")
+    await async_client.put(f"/incomes/{income['id']}", headers=headers, json={
+        "amount": 100, "description": "Consulting invoice", "date": "2025-07-21T14:00:00", "category_id": category.id,
+    })
+    assert await search(async_client, headers, "freelance") == []
+    assert [h["id"] for h in await search(async_client, headers, "consulting")] == [income["id"]]
+
+    await async_client.delete(f"/incomes/{income['id']}", headers=headers)
+    assert await search(async_client, headers, "invoice") == []
+
+
+@pytest.mark.asyncio
+async def test_search_is_scoped_to_the_user(async_client: AsyncClient, access_token: str, category, db_session):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await post_transaction(async_client, headers, category.id, description="Salary")
+
+    other = {"username": "other", "full_name": "Other", "email": "other@example.com", "password": "Password1!"}
+    assert (await async_client.post("/user/register", json=other)).status_code == 201
+    login = await async_client.post("/auth/login", data={"username": "other", "password": "Password1!"})
+    other_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert await search(async_client, other_headers, "salary") == []
+
+
+@pytest.mark.asyncio
+async def test_fts5_search_is_one_indexed_query(db_session, test_user):
+    assert await search_services.search_backend(db_session) == "fts5"  # checks for the table once
+    statements = await capture_statements(
+        lambda: search_services.search_transactions(db_session, test_user, "coffee")
+    )
+    assert len(statements) == 1  # no matches, so no rows to load
+    assert "transactions_fts MATCH" in statements[0][0]
+
+
+@pytest.mark.asyncio
+async def test_new_fts5_table_indexes_existing_rows(db_session, test_user, category):
+    date = datetime.datetime(2025, 7, 21)
+    db_session.add_all([
+        IncomeModel(amount=1, description="Yearly bonus", date=date, category_id=category.id, user_id=test_user.id),
+        IncomeModel(amount=1, description="Deleted bonus", date=date, category_id=category.id, user_id=test_user.id,
+                    deleted_at=date),
+    ])
+    await db_session.commit()
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("DROP TABLE transactions_fts")
+        await conn.run_sync(base.metadata.create_all)
+
+    hits = await search_services.search_transactions(db_session, test_user, "bonus")
+    assert [hit.description for hit in hits] == ["Yearly bonus"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_without_the_fts5_table_searches_in_memory(db_session, test_user, category, monkeypatch):
+    # As in a database created by the migrations rather than metadata.create_all
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("DROP TABLE transactions_fts")
+    monkeypatch.setattr(search_services, "_fts_tables", {})
+    db_session.add(IncomeModel(
+        amount=1, description="Yearly bonus", date=datetime.datetime(2025, 7, 21),
+        category_id=category.id, user_id=test_user.id,
+    ))
+    await db_session.commit()
+
+    assert await search_services.search_backend(db_session) == "memory"
+    hits = await search_services.search_transactions(db_session, test_user, "bonus")
+    assert [hit.description for hit in hits] == ["Yearly bonus"]
+
+
+@pytest.mark.asyncio
+async def test_search_needs_a_query(async_client: AsyncClient, access_token: str):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = await async_client.get("/transactions/search", headers=headers, params={"q": ""})
+    assert response.status_code == 422
+    assert await search(async_client, headers, "!!!") == []
+
+
+def test_inverted_index_ranks_by_tf_idf():
+    index = InvertedIndex([
+        (("expense", 1), "Coffee"),
+        (("expense", 2), "Coffee coffee"),
+        (("income", 3), "Salary"),
+        (("expense", 4), None),
+    ])
+    assert [key for key, _ in index.search(["coffee"])] == [("expense", 2), ("expense", 1)]
+    assert [key for key, _ in index.search(["co", "sal"])] == []
+    assert [key for key, _ in index.search(["sal"])] == [("income", 3)]
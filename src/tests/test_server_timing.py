@@ -0,0 +1,52 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from ..instrumentation import RequestStats, current_stats
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    timings = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        duration = next(param for param in params if param.startswith("dur="))
+        timings[name] = float(duration[len("dur="):])
+    return timings
+
+
+@pytest.mark.asyncio
+async def test_server_timing_phases(async_client: AsyncClient, access_token: str):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = await async_client.get("/categories/", headers=headers)
+    assert response.status_code == 200
+    timings = parse_server_timing(response.headers["Server-Timing"])
+    assert {"jwt", "auth_db", "cache", "db", "serialize", "total"} <= timings.keys()
+    assert timings["total"] >= timings["auth_db"]
+    assert 'desc="' in response.headers["Server-Timing"]
+
+
+@pytest.mark.asyncio
+async def test_server_timing_unauthenticated(async_client: AsyncClient):
+    response = await async_client.get("/")
+    timings = parse_server_timing(response.headers["Server-Timing"])
+    assert "jwt" not in timings
+    assert "total" in timings
+    assert float(response.headers["X-Process-Time"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_query_is_not_timed(db_session):
+    stats = RequestStats()
+    token = current_stats.set(stats)
+    try:
+        with pytest.raises(OperationalError):
+            await db_session.execute(text("SELECT * FROM missing_table"))
+        # Nothing of the failed statement stays on the pooled connection
+        assert "query_start_time" not in (await db_session.connection()).info
+        await db_session.rollback()
+        await db_session.execute(text("SELECT 1"))
+    finally:
+        current_stats.reset(token)
+    assert stats.db_queries == 1
+    assert 0 < stats.db_time_ns < 10**9
@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+CHECK = """
+import sys
+import src.main
+from src.config.database import get_async_engine
+assert get_async_engine.cache_info().currsize == 0, "engine created at import"
+assert "aiosmtplib" not in sys.modules, "aiosmtplib imported at import"
+"""
+
+
+def test_importing_the_app_does_not_initialize_heavy_dependencies():
+    # A fresh interpreter, the test session has already imported everything
+    result = subprocess.run([sys.executable, "-c", CHECK], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,139 @@
+import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from .. import tasks
+from ..models.categories_model import CategoryModel
+from ..models.incomes_model import IncomeModel
+from ..services.sync_services import SyncCursor
+
+
+async def create(async_client: AsyncClient, headers: dict, path: str, payload: dict) -> dict:
+    response = await async_client.post(path, headers=headers, json=payload)
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+async def income(async_client: AsyncClient, headers: dict, category_id: int, description: str) -> dict:
+    return await create(async_client, headers, "/incomes/", {
+        "amount": 100, "description": description, "date": "2025-07-21T14:00:00", "category_id": category_id,
+    })
+
+
+async def sync(async_client: AsyncClient, headers: dict, **params) -> dict:
+    response = await async_client.get("/sync", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_full_then_delta_sync(async_client: AsyncClient, access_token: str):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    category = await create(async_client, headers, "/categories/", {"name": "salary", "type": "income"})
+    first = await income(async_client, headers, category["id"], "first")
+    second = await income(async_client, headers, category["id"], "second")
+
+    snapshot = await sync(async_client, headers)
+    assert snapshot["full"] is True
+    assert snapshot["has_more"] is False
+    assert [c["id"] for c in snapshot["categories"]] == [category["id"]]
+    assert {i["id"] for i in snapshot["incomes"]} == {first["id"], second["id"]}
+
+    # Nothing changed: only rows inside the overlap window come back
+    unchanged = await sync(async_client, headers, since=snapshot["token"])
+    assert unchanged["full"] is False
+
+    await async_client.put(f"/incomes/{first['id']}", headers=headers, json={
+        "amount": 150, "description": "first", "date": "2025-07-21T14:00:00", "category_id": category["id"],
+    })
+    await async_client.delete(f"/incomes/{second['id']}", headers=headers)
+
+    delta = await sync(async_client, headers, since=snapshot["token"])
+    assert delta["full"] is False
+    assert [i["amount"] for i in delta["incomes"] if i["id"] == first["id"]] == [150]
+    assert delta["deleted"]["incomes"] == [second["id"]]
+
+
+@pytest.mark.asyncio
+async def test_deleted_rows_are_hidden(async_client: AsyncClient, access_token: str):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    category = await create(async_client, headers, "/categories/", {"name": "salary", "type": "income"})
+    kept = await income(async_client, headers, category["id"], "kept")
+    removed = await income(async_client, headers, category["id"], "removed")
+
+    response = await async_client.delete(f"/incomes/{removed['id']}", headers=headers)
+    assert response.status_code == 200
+
+    assert [i["id"] for i in (await async_client.get("/incomes/", headers=headers)).json()] == [kept["id"]]
+    assert (await async_client.get(f"/incomes/{removed['id']}", headers=headers)).status_code == 404
+    assert (await async_client.get("/user/balance", headers=headers)).json() == {"balance": 100}
+    assert (await async_client.delete(f"/incomes/{removed['id']}", headers=headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_deleted_category_name_can_be_reused(async_client: AsyncClient, access_token: str):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    category = await create(async_client, headers, "/categories/", {"name": "salary", "type": "income"})
+    await async_client.delete(f"/categories/{category['id']}", headers=headers)
+    assert (await async_client.get("/categories/", headers=headers)).json() == []
+
+    again = await create(async_client, headers, "/categories/", {"name": "salary", "type": "expense"})
+    assert again["id"] == category["id"]
+    assert again["type"] == "expense"
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_through_changes(async_client: AsyncClient, access_token: str):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    category = await create(async_client, headers, "/categories/", {"name": "salary", "type": "income"})
+    created = {(await income(async_client, headers, category["id"], str(i)))["id"] for i in range(5)}
+
+    seen, token, pages = set(), None, 0
+    while True:
+        page = await sync(async_client, headers, limit=2, **({"since": token} if token else {}))
+        pages += 1
+        seen |= {i["id"] for i in page["incomes"]}
+        token = page["token"]
+        if not page["has_more"]:
+            break
+    assert seen == created
+    assert pages == 3  # 6 rows, 2 per page
+
+
+@pytest.mark.asyncio
+async def test_invalid_and_expired_tokens(async_client: AsyncClient, access_token: str):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = await async_client.get("/sync", headers=headers, params={"since": "not a token"})
+    assert response.status_code == 400
+
+    expired = SyncCursor(datetime.datetime(2000, 1, 1)).encode()
+    assert (await sync(async_client, headers, since=expired))["full"] is True
+
+
+def test_cursor_round_trips():
+    cursor = SyncCursor(datetime.datetime(2025, 7, 21, 14, 0, 0, 123456), 2, 42)
+    assert SyncCursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_old_tombstones(db_session, patched_session, test_user):
+    long_ago = datetime.datetime(2000, 1, 1)
+    old_category = CategoryModel(name="old", type="income", user_id=test_user.id, deleted_at=long_ago)
+    used_category = CategoryModel(name="used", type="income", user_id=test_user.id, deleted_at=long_ago)
+    db_session.add_all([old_category, used_category])
+    await db_session.flush()
+    db_session.add_all([
+        IncomeModel(amount=1, description="old", date=long_ago, category_id=used_category.id,
+                    user_id=test_user.id, deleted_at=long_ago),
+        IncomeModel(amount=1, description="live", date=long_ago, category_id=used_category.id,
+                    user_id=test_user.id),
+    ])
+    await db_session.commit()
+
+    assert await tasks.purge_sync_tombstones() == 2
+    descriptions = (await db_session.execute(select(IncomeModel.description))).scalars().all()
+    assert descriptions == ["live"]
+    names = (await db_session.execute(select(CategoryModel.name))).scalars().all()
+    assert names == ["used"]  # still referenced
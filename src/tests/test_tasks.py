@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select
+
+from .. import tasks
+from ..models.token_denylist_model import TokenDenylist
+
+
+async def add_tokens(session, count: int, exp: int, prefix: str):
+    session.add_all(TokenDenylist(jti=f"{prefix}-{i}", exp=exp) for i in range(count))
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_deletes_only_expired_tokens_in_batches(patched_session):
+    now = int(time.time())
+    await add_tokens(patched_session, 12, now - 60, "expired")
+    await add_tokens(patched_session, 3, now + 3600, "active")
+
+    deleted = await tasks.cleanup_expired_tokens(batch_size=5)
+
+    assert deleted == 12
+    remaining = (await patched_session.execute(select(TokenDenylist.jti))).scalars().all()
+    assert sorted(remaining) == ["active-0", "active-1", "active-2"]
+
+
+@pytest.mark.asyncio
+async def test_cleanup_runs_once_at_a_time(patched_session):
+    await add_tokens(patched_session, 4, int(time.time()) - 60, "expired")
+
+    results = await asyncio.gather(
+        tasks.cleanup_expired_tokens(batch_size=2),
+        tasks.cleanup_expired_tokens(batch_size=2),
+    )
+
+    assert sorted(results) == [0, 4]
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+from jose import jwt
+
+from ..services.token_services import HMACBackend, TokenError, TokenService
+
+SECRET = "test-secret"
+
+
+def test_hmac_backend_interoperates_with_jose():
+    backend = HMACBackend(SECRET, "HS256")
+    claims = {"sub": "testuser", "exp": int(time.time()) + 60}
+
+    assert jwt.decode(backend.encode(claims), SECRET, algorithms=["HS256"]) == claims
+    assert backend.decode(jwt.encode(claims, SECRET, "HS256")) == claims
+
+
+@pytest.mark.parametrize("token", [
+    "not-a-token",
+    jwt.encode({"sub": "testuser"}, "other-secret", "HS256"),
+    jwt.encode({"sub": "testuser"}, SECRET, "HS512"),
+    jwt.encode({"sub": "testuser", "exp": int(time.time()) - 1}, SECRET, "HS256"),
+])
+def test_hmac_backend_rejects_invalid_tokens(token):
+    with pytest.raises(TokenError):
+        HMACBackend(SECRET, "HS256").decode(token)
+
+
+def test_hmac_backend_rejects_tampered_payload():
+    backend = HMACBackend(SECRET, "HS256")
+    header, _, signature = backend.encode({"sub": "testuser"}).split(".")
+    forged_payload = backend.encode({"sub": "admin"}).split(".")[1]
+    with pytest.raises(TokenError):
+        backend.decode(f"{header}.{forged_payload}.{signature}")
+
+
+class CountingBackend(HMACBackend):
+    def __init__(self):
+        super().__init__(SECRET, "HS256")
+        self.decodes = 0
+
+    def decode(self, token):
+        self.decodes += 1
+        return super().decode(token)
+
+
+def test_verified_tokens_are_cached_until_they_expire(monkeypatch):
+    backend = CountingBackend()
+    service = TokenService(backend)
+    token = service.encode({"sub": "testuser", "exp": int(time.time()) + 60})
+
+    assert service.decode(token) == service.decode(token)
+    assert backend.decodes == 1
+
+    monkeypatch.setattr(time, "time", lambda: 2 ** 40)
+    with pytest.raises(TokenError):
+        service.decode(token)
+    assert backend.decodes == 2
+
+
+def test_verified_token_cache_is_bounded():
+    backend = CountingBackend()
+    service = TokenService(backend, cache_size=2)
+    tokens = [service.encode({"sub": f"user{i}"}) for i in range(3)]
+    for token in tokens:
+        service.decode(token)
+
+    service.decode(tokens[0])  # evicted by the third token
+    assert backend.decodes == 4